@@ -6,11 +6,89 @@ LOG_DIR = "logs"
 SCHEDULE_EVERY_DAYS = 2
 
 # Scraping Settings
-REQUEST_DELAY = 2  # seconds between requests
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 5  # seconds
+RETRY_MAX_DELAY = 60  # cap for the jittered exponential backoff (see utils/retry.py)
+BREAKER_FAILURES = 5  # consecutive timeouts/network errors/5xx/block pages that open a host's breaker
+BREAKER_COOLDOWN = 30  # seconds an open breaker sheds requests before letting one probe through
+BREAKER_MAX_COOLDOWN = 600  # the cooldown doubles after each failed probe, up to this
+RETRY_METRICS_FILE = "logs/retry_metrics.jsonl"  # retry counts and time lost, one line per scraper run
 TIMEOUT = 30  # seconds
 HEADLESS = True
+READINESS_TIMEOUT = 15  # seconds to wait for a page's readiness predicate
+FETCH_MODE = "auto"  # browser | http | auto (HTTP first, browser when needs_javascript())
+
+# Browser page pool
+PAGE_POOL_SIZE = 4  # warm contexts/pages kept per scraper
+CONTEXT_MAX_NAVIGATIONS = 50  # recycle a context after this many navigations
+
+# Async crawling
+ASYNC_CONCURRENCY = 12  # concurrent pages per async scraper
+PER_HOST_CONCURRENCY = 8  # politeness cap on simultaneous pages per host
+PARSE_WORKERS = 0  # parse-stage processes (0 = one per core, 1 = parse inline)
+FARM_WORKERS = 1  # browser farm processes per crawl (see scrapers/farm.py); main.py --workers
+
+# Adaptive per-host rate limit (see utils/rate_limiter.py): token buckets that speed up
+# while a host answers quickly and back off on 429/5xx, errors, slow responses and Retry-After
+RATE_LIMIT_INITIAL_RPS = 1.0  # requests/second for a host we have not talked to yet
+RATE_LIMIT_MIN_RPS = 0.1
+RATE_LIMIT_MAX_RPS = 8.0
+RATE_LIMIT_BURST = 2  # back-to-back requests allowed after a host was idle
+RATE_LIMIT_INCREASE = 0.25  # req/s added per healthy response
+RATE_LIMIT_DECREASE = 0.5  # rate multiplier on throttling, errors or slow responses
+RATE_LIMIT_SLOW_MS = 5000  # responses slower than this count as overload
+RATE_LIMIT_HOSTS = {}  # per-host ceilings, e.g. {"api.apollo.io": 1.0}
+
+# Persistent crawl frontier (see scrapers/frontier.py): crawls resume after a crash
+FRONTIER = True
+FRONTIER_DIR = "data/raw/frontier"
+FRONTIER_MAX_ATTEMPTS = 3  # leases per URL before it is marked failed
+FRONTIER_LEASE_SECONDS = 600  # a leased URL is handed out again after this long
+
+# Lead warehouse (see utils/warehouse.py): leads, brands, tradeshows, exhibitors and events,
+# upserted by the scrapers; the CSVs in data/processed/ are exports of it
+WAREHOUSE_DB = "data/warehouse.sqlite3"
+
+# Fuzzy deduplication of leads and brands (see utils/fuzzy_dedupe.py)
+FUZZY_DEDUPE = True
+FUZZY_NAME_THRESHOLD = 0.8  # IDF-weighted token-set similarity for a match on the name alone
+FUZZY_LINK_THRESHOLD = 0.5  # when the website/email domain or the phone match as well
+FUZZY_MAX_BLOCK = 200  # candidate blocks larger than this are skipped (key too common)
+
+# Incremental store (see utils/incremental.py)
+INCREMENTAL_TTL_HOURS = None  # re-fetch URLs last fetched longer ago (None = never)
+INCREMENTAL_BATCH_SIZE = 500  # buffered URL writes per commit
+
+# Persistent browser storage state (cookies/localStorage per host, see scrapers/storage_cache.py)
+STORAGE_STATE_DIR = "data/raw/storage_state"
+STORAGE_STATE_TTL_HOURS = 24
+HTTP_DISK_CACHE = False  # also cache scripts/stylesheets on disk
+
+# On-disk page cache (see scrapers/page_cache.py); archived seasons never expire
+PAGE_CACHE = True
+PAGE_CACHE_DIR = "data/raw/page_cache"
+PAGE_CACHE_TTL_HOURS = 12
+OFFLINE = False  # serve pages only from the page cache
+
+# Record/replay (see scrapers/replay.py and scripts/bench_crawl.py); both bypass the caches
+RECORD_ARCHIVE = None  # directory to record every response into
+REPLAY_SERVER = None  # base URL of a running ReplayServer to send all requests to
+
+# Request interception (scrapers can block more via block_* class attributes)
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+BLOCKED_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "facebook.net", "hotjar.com", "scorecardresearch.com", "quantserve.com",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com",
+    "amazon-adsystem.com", "adnxs.com", "pinimg.com",
+]
+BLOCKED_URL_PATTERNS = [r"/(?:collect|pixel|beacon)(?:[/?]|$)"]
+# Typical transfer sizes used to estimate bytes saved by blocked requests
+BLOCKED_BYTES_ESTIMATE = {
+    "image": 40_000, "media": 500_000, "font": 35_000, "stylesheet": 25_000,
+    "script": 40_000, "other": 5_000,
+}
 
 # Geographic Filters
 ASIA_COUNTRIES = [
@@ -39,6 +117,8 @@ TARGET_REGIONS = ["Asia", "Europe"]
 # CSV Export Settings
 
 CSV_ENCODING = "utf-8-sig"  # UTF-8 with BOM for Excel
+CSV_SINK_FLUSH_ROWS = 500  # buffered rows per write of a CsvSink (see utils/csv_sink.py)
+CSV_SINK_FLUSH_SECONDS = 5  # and at least this often while records arrive
 
 CSV_DATE_FORMAT = "%Y-%m-%d"
 
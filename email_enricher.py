@@ -11,6 +11,9 @@ from tqdm import tqdm
 from pathlib import Path
 from dotenv import load_dotenv
 
+from utils.rate_limiter import host_of, shared_limiter
+from utils.retry import Retrier, classify, raise_for_response, shared_breakers
+
 # Load environment variables (for API key)
 load_dotenv()
 APOLLO_API_KEY = os.environ.get('APOLLO_API_KEY')
@@ -28,6 +31,34 @@ APOLLO_HEADERS = {
     'X-Api-Key': APOLLO_API_KEY,
     'Content-Type': 'application/json'
 }
+APOLLO_HOST = host_of(APOLLO_ENDPOINT)
+
+# Adaptive per-host rate limit (RATE_LIMIT_* in config/settings.py) instead of a fixed 1 req/s
+limiter = shared_limiter()
+# Throttled (429), 5xx and timed-out calls are retried with backoff (Retry-After is honored);
+# the breaker stops the run from waiting out timeouts when the API is down
+retrier = Retrier(breakers=shared_breakers())
+
+
+def post_apollo(payload):
+    """One Apollo search call, paced by the rate limiter; raises on 429/5xx for the retrier."""
+    limiter.acquire(APOLLO_HOST)
+    start = time.monotonic()
+    try:
+        response = requests.post(
+            APOLLO_ENDPOINT,
+            headers=APOLLO_HEADERS,
+            json=payload,
+            timeout=10
+        )
+    except requests.exceptions.RequestException:
+        limiter.record(APOLLO_HOST, error=True)
+        raise
+    retry_after = response.headers.get('Retry-After')
+    limiter.record(APOLLO_HOST, response.status_code, (time.monotonic() - start) * 1000, retry_after)
+    raise_for_response(response.status_code, APOLLO_ENDPOINT, retry_after=retry_after, client_errors=False)
+    return response
+
 
 def find_contact(company_name):
     """
@@ -62,12 +93,7 @@ def find_contact(company_name):
     
     try:
         # Send POST request to Apollo API
-        response = requests.post(
-            APOLLO_ENDPOINT,
-            headers=APOLLO_HEADERS,
-            json=payload,
-            timeout=10
-        )
+        response = retrier.call(APOLLO_HOST, post_apollo, payload)
         
         # Check if request was successful
         if response.status_code == 200:
@@ -92,12 +118,6 @@ def find_contact(company_name):
                     if email:
                         return email
         
-        elif response.status_code == 429:
-            # Rate limit exceeded
-            print(f"\n[WARN] Rate limit exceeded. Waiting 60 seconds...")
-            time.sleep(60)
-            return None
-        
         else:
             # Other error
             print(f"\n[WARN] API error for {company_name}: {response.status_code}")
@@ -108,7 +128,7 @@ def find_contact(company_name):
         return None
     
     except Exception as e:
-        print(f"\n[WARN] Error for {company_name}: {str(e)}")
+        print(f"\n[WARN] Error for {company_name} ({classify(e)}): {str(e)}")
         return None
     
     return None
@@ -176,8 +196,8 @@ def enrich_emails(input_file='data/processed/master_leads.csv',
     
     print(f"\nStarting email enrichment via Apollo.io API...")
     print(f"Target: {len(df)} companies")
-    print(f"Rate limit: 1 request per second")
-    print(f"Estimated time: ~{len(df) // 60} minutes\n")
+    print(f"Rate limit: adaptive, starting at {limiter.initial_rps:g} requests per second")
+    print(f"Estimated time: ~{len(df) // 60} minutes or less\n")
     
     # Track statistics
     emails_found = 0
@@ -200,9 +220,6 @@ def enrich_emails(input_file='data/processed/master_leads.csv',
             emails_found += 1
             print(f"\n✓ Found email for {company_name}: {email}")
         
-        # Rate limiting: 1 request per second
-        time.sleep(1)
-        
         return email if email else 'N/A'
     
     # Apply enrichment to each row
@@ -222,6 +239,8 @@ def enrich_emails(input_file='data/processed/master_leads.csv',
     print("=" * 80)
     print(f"Total leads processed: {len(df)}")
     print(f"API calls made: {api_calls}")
+    print(f"Rate limit:\n{limiter.report()}")
+    print(f"Retries: {retrier.metrics.summary()}")
     print(f"New emails found: {emails_found}")
     print(f"Success rate: {(emails_found / api_calls * 100) if api_calls > 0 else 0:.1f}%")
     
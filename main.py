@@ -1,14 +1,18 @@
 import argparse
 import sys
-from config.settings import BASE_URL, SCHEDULE_EVERY_DAYS
+from config.settings import BASE_URL, SCHEDULE_EVERY_DAYS, FETCH_MODE, FARM_WORKERS
 from scrapers.fashion_weeks import FashionWeeksScraper
 from scrapers.showrooms import ShowroomsScraper
+from scrapers.tradeshows import TradeshowsScraper
+from scrapers.designer_showrooms import DesignerShowroomsScraper
 from utils.logger import setup_logger
 
 # A mapping of section names to scraper classes
 SCRAPER_CLASSES = {
     'fashion_weeks': FashionWeeksScraper,
     'showrooms': ShowroomsScraper,
+    'tradeshows': TradeshowsScraper,
+    'designer_showrooms': DesignerShowroomsScraper,
     # Add other scrapers here as they are implemented
     # 'brands': BrandsScraper,
     # 'stores': StoresScraper,
@@ -24,6 +28,16 @@ def main():
     )
     parser.add_argument('--headless', action='store_true', help='Run browser in headless mode')
     parser.set_defaults(headless=True) # Headless by default
+    parser.add_argument(
+        '--fetch-mode',
+        choices=['browser', 'http', 'auto'],
+        default=FETCH_MODE,
+        help='browser: always Playwright; http: plain HTTP only; auto: HTTP first, browser when a page needs JavaScript'
+    )
+    parser.add_argument('--offline', action='store_true',
+                        help='Serve pages only from the on-disk page cache (no network)')
+    parser.add_argument('--workers', type=int, default=FARM_WORKERS,
+                        help='Crawl with N worker processes, each with its own browser (see scrapers/farm.py)')
     args = parser.parse_args()
 
     main_logger = setup_logger('main')
@@ -41,7 +55,12 @@ def main():
         
         try:
             scraper = ScraperClass(headless=args.headless)
+            scraper.fetch_mode = args.fetch_mode
+            scraper.offline = args.offline
+            scraper.workers = args.workers
             scraper.scrape()
+            paths = ', '.join(f'{path}={count}' for path, count in sorted(scraper.fetch_stats.items()))
+            main_logger.info(f'Pages by fetch path for "{section}": {paths or "none"}')
             main_logger.info(f'Successfully finished scraping section: "{section}"')
         except Exception as e:
             main_logger.error(f'An error occurred during scraping of section "{section}": {e}', exc_info=True)
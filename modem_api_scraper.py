@@ -18,6 +18,8 @@ from pathlib import Path
 import csv
 from datetime import datetime
 
+from utils.rate_limiter import host_of, shared_limiter
+
 class ModemAPIClient:
     """Client for accessing ModemOnline's internal JSON API"""
     
@@ -29,7 +31,9 @@ class ModemAPIClient:
             'Accept': 'application/json',
             'Referer': 'https://www.modemonline.com/'
         }
-        self.delay = 1  # 1 second politeness delay between requests
+        # Politeness: adaptive per-host rate limit instead of a fixed delay between requests
+        self.limiter = shared_limiter()
+        self.host = host_of(self.base_url)
         
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
         """Make an API request with error handling"""
@@ -40,12 +44,20 @@ class ModemAPIClient:
             if params:
                 print(f"  Params: {params}")
             
-            response = requests.get(
-                url,
-                params=params,
-                headers=self.headers,
-                timeout=30
-            )
+            self.limiter.acquire(self.host)
+            start = time.monotonic()
+            try:
+                response = requests.get(
+                    url,
+                    params=params,
+                    headers=self.headers,
+                    timeout=30
+                )
+            except requests.exceptions.RequestException:
+                self.limiter.record(self.host, error=True)
+                raise
+            self.limiter.record(self.host, response.status_code, (time.monotonic() - start) * 1000,
+                                response.headers.get('Retry-After'))
             
             print(f"  Status: {response.status_code}")
             
@@ -73,8 +85,6 @@ class ModemAPIClient:
         except json.JSONDecodeError:
             print(f"  JSON decode error")
             return None
-        finally:
-            time.sleep(self.delay)  # Politeness delay
     
     def get_brands_by_letter(self, letter: str, per_page: int = 10000) -> Optional[List[Dict]]:
         """
@@ -0,0 +1,330 @@
+"""
+Pipeline runner: scrape -> merge -> enrich as a DAG of stages.
+
+Each stage is a command (a module run with `python -m`, or main.py for the
+scrapers without an entry point of their own) with the files it reads and
+writes. A stage depends on every other stage that writes one of its inputs;
+stages whose dependencies are done run in parallel processes (--jobs).
+
+A stage is skipped when the content hashes of its inputs and of its own code
+are the same as on its last successful run and its outputs are still there, so
+a nightly run only redoes what changed downstream of the scrapers. CSV inputs
+are hashed without their run timestamps (scraped_date, scraped_at, merged_at),
+so a re-scrape that found the same rows does not count as a change. Stages with
+no input files (the scrapers, whose input is the website) always run unless
+--no-scrape is given. State is kept in data/raw/pipeline_state.json and each
+stage's output goes to logs/pipeline/<stage>.log.
+
+    python pipeline.py                   # run what changed
+    python pipeline.py --dry-run         # show the plan
+    python pipeline.py --no-scrape       # reuse the scraped CSVs, redo merge/enrich if they changed
+    python pipeline.py --stages pr_contacts,merge_leads --force
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from config import settings
+
+ROOT = Path(__file__).resolve().parent
+STATE_FILE = ROOT / 'data' / 'raw' / 'pipeline_state.json'
+LOG_DIR = ROOT / getattr(settings, 'LOG_DIR', 'logs') / 'pipeline'
+PROCESSED = 'data/processed'
+# Columns that change on every run without the data changing
+VOLATILE_COLUMNS = {'scraped_date', 'scraped_at', 'merged_at'}
+
+
+class Stage:
+    """One pipeline step.
+
+    Args:
+        name: stage name
+        argv: arguments after the python executable, e.g. ['-m', 'scrapers.tradeshows']
+        inputs / outputs: files (relative to the repo root) the stage reads and writes
+        code: source files whose changes invalidate the stage (defaults to the -m module)
+        after: extra stages to wait for besides the producers of its inputs
+        requires_env: environment variables (or .env entries) the stage cannot run without
+    """
+
+    def __init__(self, name: str, argv: Sequence[str], inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+                 code: Optional[Sequence[str]] = None, after: Sequence[str] = (),
+                 requires_env: Sequence[str] = ()):
+        self.name = name
+        self.argv = list(argv)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        if code is None:
+            code = [argv[1].replace('.', '/') + '.py'] if argv[:1] == ['-m'] else [argv[0]]
+        self.code = list(code)
+        self.after = list(after)
+        self.requires_env = list(requires_env)
+
+    def __repr__(self):
+        return f'Stage({self.name!r})'
+
+
+STAGES = [
+    Stage('tradeshows', ['-m', 'scrapers.tradeshows'], outputs=[f'{PROCESSED}/tradeshows.csv']),
+    Stage('exhibitors', ['-m', 'scrapers.exhibitors'],
+          inputs=[f'{PROCESSED}/tradeshows.csv'], outputs=[f'{PROCESSED}/exhibitors.csv']),
+    Stage('designer_showrooms', ['-m', 'scrapers.designer_showrooms'],
+          outputs=[f'{PROCESSED}/designer_showrooms.csv']),
+    Stage('showrooms', ['main.py', '--sections', 'showrooms'],
+          outputs=[f'{PROCESSED}/master_leads.csv'], code=['scrapers/showrooms.py']),
+    Stage('fashion_weeks', ['main.py', '--sections', 'fashion_weeks'],
+          outputs=[f'{PROCESSED}/events_calendar.csv'], code=['scrapers/fashion_weeks.py']),
+    Stage('pr_contacts', ['-m', 'scrapers.pr_contacts'],
+          inputs=[f'{PROCESSED}/designer_showrooms.csv'], outputs=[f'{PROCESSED}/pr_contacts.csv']),
+    # Rewrites master_leads.csv in place (showrooms + designer showrooms, deduplicated)
+    Stage('merge_leads', ['-m', 'utils.merge_leads'],
+          inputs=[f'{PROCESSED}/master_leads.csv', f'{PROCESSED}/designer_showrooms.csv'],
+          outputs=[f'{PROCESSED}/master_leads.csv']),
+    Stage('extract_brands', ['-m', 'utils.extract_brands'],
+          inputs=[f'{PROCESSED}/designer_showrooms.csv', f'{PROCESSED}/master_leads.csv'],
+          outputs=[f'{PROCESSED}/brands.csv']),
+    Stage('email_enricher', ['email_enricher.py'],
+          inputs=[f'{PROCESSED}/master_leads.csv'], outputs=['data/enriched/master_leads_enriched.csv'],
+          requires_env=['APOLLO_API_KEY']),
+]
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """sha256 of a file's content (CSV: without VOLATILE_COLUMNS), or None if it does not exist."""
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    if path.suffix.lower() == '.csv':
+        with path.open(encoding='utf-8-sig', errors='replace', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            keep = [i for i, column in enumerate(header) if column.strip() not in VOLATILE_COLUMNS]
+            for row in itertools.chain([header], reader):
+                digest.update('\x1f'.join(row[i] for i in keep if i < len(row)).encode('utf-8'))
+                digest.update(b'\x1e')
+        return digest.hexdigest()
+    with path.open('rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """Stage name -> names of the stages it waits for; raises ValueError on a cycle."""
+    producers: Dict[str, List[str]] = {}
+    for stage in stages:
+        for path in stage.outputs:
+            producers.setdefault(path, []).append(stage.name)
+    names = {stage.name for stage in stages}
+    deps = {}
+    for stage in stages:
+        wanted = [p for path in stage.inputs for p in producers.get(path, []) if p != stage.name]
+        wanted += [name for name in stage.after if name in names]
+        deps[stage.name] = list(dict.fromkeys(wanted))
+
+    # Depth-first search for cycles, so a bad declaration fails before anything runs
+    visiting, done = set(), set()
+
+    def visit(name, path):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError('Pipeline cycle: ' + ' -> '.join(path + [name]))
+        visiting.add(name)
+        for dep in deps[name]:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in deps:
+        visit(name, [])
+    return deps
+
+
+def missing_env(stage: Stage) -> List[str]:
+    missing = [var for var in stage.requires_env if not os.environ.get(var)]
+    if missing and (ROOT / '.env').is_file():
+        try:
+            from dotenv import dotenv_values
+            dotenv = dotenv_values(ROOT / '.env')
+            missing = [var for var in missing if not dotenv.get(var)]
+        except ImportError:
+            pass
+    return missing
+
+
+class Pipeline:
+    """Runs stages in dependency order, in parallel where possible, skipping unchanged ones.
+
+    Args:
+        stages: the DAG (default STAGES)
+        jobs: stages run at once
+        force: run every selected stage even if its inputs are unchanged
+        scrape: run the source stages (no inputs); False reuses their existing outputs
+        state_file: where input hashes of successful runs are kept
+    """
+
+    def __init__(self, stages: Optional[List[Stage]] = None, jobs: int = 2, force: bool = False,
+                 scrape: bool = True, state_file: Path = STATE_FILE, log_dir: Path = LOG_DIR):
+        self.stages = {stage.name: stage for stage in (stages or STAGES)}
+        self.deps = dependencies(list(self.stages.values()))
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.scrape = scrape
+        self.state_file = Path(state_file)
+        self.log_dir = Path(log_dir)
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.state_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.state_file)
+
+    def fingerprint(self, stage: Stage) -> Dict[str, Optional[str]]:
+        """Content hashes of the stage's inputs and code."""
+        return {path: file_hash(ROOT / path) for path in stage.inputs + stage.code}
+
+    def skip_reason(self, stage: Stage) -> Optional[str]:
+        """Why the stage does not need to run now, or None if it does."""
+        missing = missing_env(stage)
+        if missing:
+            return f"{', '.join(missing)} not set"
+        if self.force:
+            return None
+        if not stage.inputs:
+            return None if self.scrape else 'scraper stage, --no-scrape'
+        last = self.state.get(stage.name)
+        if not last:
+            return None
+        if any(not (ROOT / path).is_file() for path in stage.outputs):
+            return None
+        if last.get('fingerprint') != self.fingerprint(stage):
+            return None
+        return f"inputs unchanged since {last.get('finished_at', '?')}"
+
+    def select(self, names: Optional[List[str]]) -> List[str]:
+        """The stages to consider, in declaration order (all by default)."""
+        if not names:
+            return list(self.stages)
+        unknown = [name for name in names if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Available: {', '.join(self.stages)}")
+        return [name for name in self.stages if name in names]
+
+    def _run_stage(self, stage: Stage) -> int:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        with (self.log_dir / f'{stage.name}.log').open('w', encoding='utf-8') as log:
+            log.write(f"$ python {' '.join(stage.argv)}  ({datetime.now().isoformat(timespec='seconds')})\n")
+            log.flush()
+            env = {**os.environ, 'PYTHONUNBUFFERED': '1', 'PYTHONIOENCODING': 'utf-8'}
+            return subprocess.run([sys.executable] + stage.argv, cwd=ROOT, stdout=log,
+                                  stderr=subprocess.STDOUT, env=env).returncode
+
+    def run(self, names: Optional[List[str]] = None, dry_run: bool = False) -> Dict[str, str]:
+        """Run the selected stages; returns stage name -> ran/skipped/failed/blocked
+        (would run instead of ran with dry_run)."""
+        selected = self.select(names)
+        outcome: Dict[str, str] = {}
+        pending = list(selected)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for name in list(pending):
+                    # Dependencies outside the selection count as done
+                    deps = [d for d in self.deps[name] if d in selected]
+                    if any(d not in outcome for d in deps):
+                        continue
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    if any(outcome[d] in ('failed', 'blocked') for d in deps):
+                        outcome[name] = 'blocked'
+                        print(f"[WARN] {name}: not run, an upstream stage failed")
+                        continue
+                    if dry_run and any(outcome[d] == 'would run' for d in deps):
+                        # Its inputs are not rewritten in a dry run, so they cannot be compared yet
+                        outcome[name] = 'would run'
+                        print(f"[INFO] {name}: would run if {', '.join(deps)} change its inputs")
+                        continue
+                    reason = self.skip_reason(stage)
+                    if reason:
+                        outcome[name] = 'skipped'
+                        print(f"[INFO] {name}: skipped ({reason})")
+                        continue
+                    if dry_run:
+                        outcome[name] = 'would run'
+                        print(f"[INFO] {name}: would run `python {' '.join(stage.argv)}`")
+                        continue
+                    print(f"[INFO] {name}: running `python {' '.join(stage.argv)}`")
+                    running[pool.submit(self._run_stage, stage)] = (name, time.monotonic())
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, started = running.pop(future)
+                    try:
+                        code = future.result()
+                    except OSError as e:
+                        print(f"[ERROR] {name}: could not start: {e}")
+                        code = -1
+                    elapsed = time.monotonic() - started
+                    if code == 0:
+                        outcome[name] = 'ran'
+                        # Hashed after the run: a stage that rewrites its own input (merge_leads)
+                        # must not look changed next time
+                        self.state[name] = {'fingerprint': self.fingerprint(self.stages[name]),
+                                            'finished_at': datetime.now().isoformat(timespec='seconds'),
+                                            'seconds': round(elapsed, 1)}
+                        self._save_state()
+                        print(f"[OK] {name}: done in {elapsed:.0f}s")
+                    else:
+                        outcome[name] = 'failed'
+                        print(f"[ERROR] {name}: exit code {code} after {elapsed:.0f}s, "
+                              f"see {self.log_dir / (name + '.log')}")
+        return outcome
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Run the scrape -> merge -> enrich pipeline')
+    parser.add_argument('--stages', default='', help='comma-separated stages to consider (default: all)')
+    parser.add_argument('--jobs', type=int, default=2, help='stages run in parallel')
+    parser.add_argument('--force', action='store_true', help='run stages even if their inputs are unchanged')
+    parser.add_argument('--no-scrape', dest='scrape', action='store_false',
+                        help='skip the scraper stages and work from the existing CSVs')
+    parser.add_argument('--dry-run', action='store_true', help='print what would run')
+    parser.add_argument('--list', action='store_true', help='list the stages and their dependencies')
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(jobs=args.jobs, force=args.force, scrape=args.scrape)
+    if args.list:
+        for name, stage in pipeline.stages.items():
+            deps = ', '.join(pipeline.deps[name]) or '-'
+            print(f"{name:20} after: {deps:35} writes: {', '.join(stage.outputs)}")
+        return
+    names = [s.strip() for s in args.stages.split(',') if s.strip()]
+    outcome = pipeline.run(names, dry_run=args.dry_run)
+    counts = {}
+    for result in outcome.values():
+        counts[result] = counts.get(result, 0) + 1
+    print('Pipeline: ' + ', '.join(f'{k} {v}' for k, v in sorted(counts.items())))
+    if counts.get('failed') or counts.get('blocked'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
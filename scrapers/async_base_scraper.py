@@ -0,0 +1,578 @@
+"""
+Asyncio counterpart of BaseScraper.
+
+List and detail pages are visited concurrently on a pool of warm pages, bounded by a
+global concurrency limit and a per-host politeness cap.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, Page, BrowserContext
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from scrapers.base_scraper import BaseScraper, _PoolSlot
+from scrapers.consent import CONSENT_SCRIPT, CONSENT_SCRIPT_ARGS
+from scrapers.farm import BrowserFarm
+from scrapers.readiness import compile_readiness
+from scrapers.replay import replay_url
+from utils.rate_limiter import host_of
+from utils.retry import classify, detect_block, raise_for_response
+from config import settings
+
+
+class AsyncPagePool:
+    """Async version of PagePool: acquire() waits for a free page instead of failing."""
+
+    def __init__(self, context_factory: Callable[[], Awaitable[BrowserContext]], size: int = 8,
+                 max_navigations: int = 50):
+        self.context_factory = context_factory
+        self.size = max(1, size)
+        self.max_navigations = max(1, max_navigations)
+        self._idle: List[_PoolSlot] = []
+        self._busy: Dict[int, _PoolSlot] = {}
+        self._free = asyncio.Semaphore(self.size)
+        self.contexts_created = 0
+
+    async def _new_slot(self) -> _PoolSlot:
+        context = await self.context_factory()
+        page = await context.new_page()
+        slot = _PoolSlot(context, page)
+
+        def on_navigated(frame):
+            if frame == page.main_frame and frame.url != 'about:blank':
+                slot.navigations += 1
+
+        page.on('framenavigated', on_navigated)
+        self.contexts_created += 1
+        return slot
+
+    async def _close_slot(self, slot: _PoolSlot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+
+    async def acquire(self) -> Page:
+        await self._free.acquire()
+        try:
+            slot = self._idle.pop() if self._idle else await self._new_slot()
+        except Exception:
+            self._free.release()
+            raise
+        self._busy[id(slot.page)] = slot
+        return slot.page
+
+    async def release(self, page: Page):
+        slot = self._busy.pop(id(page), None)
+        if slot is None:
+            return
+        try:
+            if page.is_closed() or slot.navigations >= self.max_navigations:
+                await self._close_slot(slot)
+                return
+            try:
+                await page.goto('about:blank')
+                self._idle.append(slot)
+            except Exception:
+                await self._close_slot(slot)
+        finally:
+            self._free.release()
+
+    def contexts(self) -> List[BrowserContext]:
+        return [slot.context for slot in self._idle + list(self._busy.values())]
+
+    async def close(self):
+        for slot in self._idle + list(self._busy.values()):
+            await self._close_slot(slot)
+        self._idle = []
+        self._busy = {}
+
+
+class AsyncBaseScraper(BaseScraper):
+    """Base class for asyncio scrapers.
+
+    Subclasses implement async `scrape_list_page(page, url)` and, when
+    `follow_detail_pages` is set, async `scrape_detail_page(page, item)`. `crawl()`
+    schedules both over at most `concurrency` pages with no more than
+    `per_host_concurrency` pages open against one host. http_capable scrapers also
+    implement `scrape_list_html(url, html)` / `scrape_detail_html(item, html)`, which
+    crawl() uses instead of a browser page whenever fetch_html() returns HTML; the
+    browser is then only launched if some page needs it. Scrapers that set
+    `parse_in_pool` instead split list pages into a fetch stage,
+    `snapshot_list_page(page, url)`, and a pure classmethod
+    `parse_list_snapshot(url, snapshot)` that runs in the parse process pool after
+    the page has been released. With `workers` > 1 (main.py --workers N), crawl()
+    runs on a multi-process browser farm (see scrapers/farm.py). The synchronous `scrape()`
+    entry point runs `scrape_async()` in a fresh event loop so callers such as
+    main.py do not need to know the scraper is async.
+    """
+
+    follow_detail_pages = False
+    parse_in_pool = False
+
+    def __init__(self, region_filter: List[str] = ["Asia", "Europe"], headless: bool = True,
+                 concurrency: Optional[int] = None):
+        super().__init__(region_filter=region_filter, headless=headless)
+        self.concurrency = concurrency or getattr(settings, 'ASYNC_CONCURRENCY', 12)
+        self.per_host_concurrency = getattr(settings, 'PER_HOST_CONCURRENCY', 8)
+        # One warm page per concurrent worker
+        self.page_pool_size = self.concurrency
+        # Browser farm processes for crawl(); 1 crawls in this process
+        self.workers = getattr(settings, 'FARM_WORKERS', 1)
+        # Run parse_async() functions in this process instead of the parse pool
+        self.parse_inline = False
+        self._loop = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._browser_lock: Optional[asyncio.Lock] = None
+
+    # ----------------
+    # Methods to implement in subclasses
+    # ----------------
+    async def scrape_list_page(self, page: Page, url: str) -> List[Dict[str, Any]]:
+        """Scrape items (detail page URLs or brief records) from a list page."""
+        raise NotImplementedError()
+
+    async def scrape_detail_page(self, page: Page, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Scrape the detail page for an item returned by scrape_list_page."""
+        raise NotImplementedError()
+
+    def scrape_list_html(self, url: str, html: str) -> List[Dict[str, Any]]:
+        """Parse a list page fetched over HTTP (http_capable scrapers only)."""
+        raise NotImplementedError()
+
+    def scrape_detail_html(self, item: Dict[str, Any], html: str) -> Dict[str, Any]:
+        """Parse a detail page fetched over HTTP (http_capable scrapers only)."""
+        raise NotImplementedError()
+
+    async def snapshot_list_page(self, page: Page, url: str) -> Any:
+        """Fetch stage (parse_in_pool scrapers): load url and return a picklable snapshot."""
+        await self.navigate(page, url)
+        await self.handle_cookie_consent(page)
+        return await page.content()
+
+    @classmethod
+    def parse_list_snapshot(cls, url: str, snapshot: Any) -> List[Dict[str, Any]]:
+        """Parse stage (parse_in_pool scrapers): pure, runs in a worker process.
+
+        snapshot is the HTML when the page came over HTTP, else what snapshot_list_page() returned.
+        """
+        raise NotImplementedError()
+
+    async def scrape_async(self):
+        """Async orchestration; usually crawl(), save, stop_browser()."""
+        raise NotImplementedError()
+
+    # ----------------
+    # Browser lifecycle / helpers
+    # ----------------
+    def _bind_loop(self):
+        """asyncio primitives are bound to the loop that first uses them; reset them per loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._host_slots = {}
+            self._browser_lock = asyncio.Lock()
+
+    async def start_browser(self):
+        if self._browser:
+            return
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+
+    async def save_storage_state(self):
+        """Async version of BaseScraper.save_storage_state."""
+        states = []
+        for context in list(self._contexts):
+            try:
+                states.append(await context.storage_state())
+            except Exception:
+                continue
+        self._write_storage_state(states)
+
+    async def stop_browser(self):
+        self.log_fetch_stats()
+        self.log_page_cache_stats()
+        self.log_rate_limit_stats()
+        self.log_retry_stats()
+        if self._http:
+            self._http.close()
+            self._http = None
+        if self._parse_pool:
+            self._parse_pool.close()
+            self._parse_pool = None
+        await self.save_storage_state()
+        if self.recorder:
+            self.recorder.save()
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+            self.log_interception_stats()
+            self.log_readiness_stats()
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def new_context(self, **kwargs) -> BrowserContext:
+        if not self._browser:
+            # Launched on first use; concurrent workers must not launch twice
+            self._bind_loop()
+            async with self._browser_lock:
+                await self.start_browser()
+        assert self._browser is not None, 'Browser not started'
+        if 'storage_state' not in kwargs and self.consent.storage_state():
+            kwargs['storage_state'] = self.consent.storage_state()
+        context = await self._browser.new_context(**kwargs)
+        if self.replay_server:
+            await context.route('**/*', self._route_replay_async)
+        elif self.recorder:
+            await context.route('**/*', self._route_record_async)
+        if self.asset_cache:
+            await context.route('**/*', self.asset_cache.handle_route_async)
+        if self.page_cache:
+            await context.route('**/*', self._route_page_cache_async)
+        if self.interception.active:
+            await context.route('**/*', self.interception.handle_route_async)
+            context.on('response', self.interception.on_response)
+        self._track_context(context)
+        return context
+
+    async def _route_replay_async(self, route):
+        """Async version of BaseScraper._route_replay."""
+        response = await route.fetch(url=replay_url(self.replay_server, route.request.url))
+        await route.fulfill(response=response)
+
+    async def _route_record_async(self, route):
+        """Async version of BaseScraper._route_record."""
+        request = route.request
+        response = await route.fetch()
+        body = await response.body()
+        self.recorder.add(request.url, response.status, response.headers, body, request.method)
+        await route.fulfill(response=response, body=body)
+
+    async def _route_page_cache_async(self, route):
+        """Async version of BaseScraper._route_page_cache."""
+        request = route.request
+        if request.resource_type != 'document' or request.method != 'GET':
+            if self.offline:
+                await route.abort('internetdisconnected')
+            else:
+                await route.fallback()
+            return
+        cached, servable = self._cached_page(request.url)
+        if servable:
+            await route.fulfill(status=cached.status, content_type=cached.content_type, body=cached.body)
+            return
+        if self.offline:
+            await route.abort('internetdisconnected')
+            return
+        headers = {**request.headers, **cached.conditional_headers()} if cached else None
+        response = await route.fetch(headers=headers)
+        if response.status == 304 and cached:
+            self.page_cache.mark_validated(request.url)
+            self.page_cache.counts['revalidated'] += 1
+            await route.fulfill(status=cached.status, content_type=cached.content_type, body=cached.body)
+            return
+        body = await response.body()
+        if response.status == 200:
+            self.page_cache.put(request.url, body, 200, response.headers)
+            self.page_cache.counts['stored'] += 1
+        await route.fulfill(response=response, body=body)
+
+    async def new_page(self, **kwargs) -> Page:
+        context = await self.new_context(**kwargs)
+        page = await context.new_page()
+        page.on('close', lambda _: asyncio.ensure_future(context.close()))
+        return page
+
+    @property
+    def page_pool(self) -> AsyncPagePool:
+        if self._pool is None:
+            self._pool = AsyncPagePool(self.new_context, size=self.page_pool_size,
+                                       max_navigations=self.context_max_navigations)
+        return self._pool
+
+    @asynccontextmanager
+    async def pooled_page(self):
+        page = await self.page_pool.acquire()
+        try:
+            yield page
+        finally:
+            await self.page_pool.release(page)
+
+    async def navigate(self, page: Page, url: str, readiness=None, timeout: Optional[int] = None,
+                       legacy_wait_ms: Optional[int] = None):
+        """Async version of BaseScraper.navigate."""
+        timeout = timeout or getattr(settings, 'TIMEOUT', 30) * 1000
+        self._visited_hosts.add(urlparse(url).hostname or '')
+        host = host_of(url)
+        if not self.offline:
+            self.breakers.check(host)
+            # Paced per target host here, so every navigation of a visit counts, not just the first
+            await self.rate_limiter.acquire_async(host)
+        self.fetch_stats['browser'] += 1
+        start = time.monotonic()
+        try:
+            response = await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+        except Exception as e:
+            self.record_error(host, e)
+            raise
+        loaded = time.monotonic()
+        status = response.status if response else None
+        retry_after = response.headers.get('retry-after') if response else None
+        html = await page.content() if status and status >= 400 else None
+        self.record_response(host, status, (loaded - start) * 1000, retry_after, detect_block(html))
+        raise_for_response(status, url, html, retry_after, client_errors=False)
+        timed_out = False
+        try:
+            await page.wait_for_function(compile_readiness(readiness or self.readiness),
+                                         timeout=self.readiness_wait(timeout, legacy_wait_ms))
+        except Exception as e:
+            timed_out = True
+            print(f"[WARN] Readiness not reached for {url}: {e}")
+        ready = time.monotonic()
+        self.readiness_timer.record(url, (loaded - start) * 1000, (ready - loaded) * 1000,
+                                    timed_out=timed_out, legacy_wait_ms=legacy_wait_ms)
+        self.page_latencies_ms.append((ready - start) * 1000)
+        return response
+
+    async def _with_retries(self, fn, *args, **kwargs):
+        """Async version of BaseScraper._with_retries."""
+        return await self.retrier.call_async(None, fn, *args, **kwargs)
+
+    async def handle_cookie_consent(self, page: Page, timeout: int = 0) -> bool:
+        """Async version of BaseScraper.handle_cookie_consent."""
+        host = urlparse(page.url).hostname or ''
+        self._visited_hosts.add(host)
+        if self.consent.has(host):
+            return False
+        try:
+            if timeout:
+                handle = await page.wait_for_function(CONSENT_SCRIPT, arg=CONSENT_SCRIPT_ARGS, timeout=timeout)
+                clicked = await handle.json_value()
+            else:
+                clicked = await page.evaluate(CONSENT_SCRIPT, CONSENT_SCRIPT_ARGS)
+        except PlaywrightTimeoutError:
+            return False
+        except Exception as e:
+            print(f"[WARN] Cookie consent handling failed: {e}")
+            return False
+        if not clicked:
+            return False
+        await asyncio.sleep(0.5)
+        await self.remember_consent(page.context, host)
+        return True
+
+    async def remember_consent(self, context: BrowserContext, host: str):
+        """Async version of BaseScraper.remember_consent."""
+        try:
+            state = await context.storage_state()
+            self.consent.record(host, state)
+            self.storage_cache.save(host, state, consented=True)
+            if self._pool:
+                for other in self._pool.contexts():
+                    if other is not context:
+                        await other.add_cookies(state.get('cookies', []))
+        except Exception as e:
+            print(f"[WARN] Could not save consent state for {host}: {e}")
+
+    # ----------------
+    # Scheduling
+    # ----------------
+    def _host_slot(self, host: str) -> asyncio.Semaphore:
+        self._bind_loop()
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_slots[host]
+
+    async def visit(self, url: str, fn: Callable[[Page], Awaitable[Any]]) -> Any:
+        """Run fn(page) on a pooled page while holding a politeness slot for url's host.
+
+        navigate() checks the target host's circuit breaker, waits for its adaptive
+        rate limiter and feeds the response back to both.
+        """
+        host = host_of(url)
+        async with self._host_slot(host):
+            async with self.pooled_page() as page:
+                return await fn(page)
+
+    async def fetch_html_async(self, url: str) -> Optional[str]:
+        """fetch_html() in a worker thread, under the same per-host politeness as visit().
+
+        Pages served from the page cache skip the host slot and the rate limiter.
+        """
+        if self.fetch_mode == 'browser' or not self.http_capable:
+            return None
+        self._visited_hosts.add(urlparse(url).hostname or '')
+        cached, servable = await asyncio.to_thread(self._cached_page, url)
+        if servable or self.offline:
+            return await asyncio.to_thread(self._fetch_html, url, cached, servable)
+        host = host_of(url)
+        self.breakers.check(host)
+        async with self._host_slot(host):
+            await self.rate_limiter.acquire_async(host)
+            return await asyncio.to_thread(self._fetch_html, url, cached, servable, False)
+
+    async def parse_async(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a pure parse function in the parse pool without blocking the event loop.
+
+        With parse_inline (browser farm workers) it runs right here instead.
+        """
+        if self.parse_inline:
+            return fn(*args)
+        return await asyncio.wrap_future(self.parse_pool.submit(fn, *args))
+
+    async def _crawl_list_page(self, url: str) -> List[Dict[str, Any]]:
+        return await self.retrier.call_async(url, self._load_list_page, url)
+
+    async def _crawl_detail_page(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.retrier.call_async(item['url'], self._load_detail_page, item)
+
+    async def _load_list_page(self, url: str) -> List[Dict[str, Any]]:
+        html = await self.fetch_html_async(url)
+        if self.parse_in_pool:
+            snapshot = html if html is not None else await self.visit(
+                url, lambda page: self.snapshot_list_page(page, url))
+            return await self.parse_async(self.parse_list_snapshot, url, snapshot)
+        if html is not None:
+            return self.scrape_list_html(url, html)
+        return await self.visit(url, lambda page: self.scrape_list_page(page, url))
+
+    async def _load_detail_page(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        html = await self.fetch_html_async(item['url'])
+        if html is not None:
+            return self.scrape_detail_html(item, html)
+        return await self.visit(item['url'], lambda page: self.scrape_detail_page(page, item))
+
+    async def run_bounded(self, items: Iterable[Any], worker: Callable[[Any], Awaitable[Any]]) -> List[Any]:
+        """Run worker over items with at most `concurrency` in flight; results keep input order.
+
+        A worker that raises is logged and yields None so one bad URL does not abort the crawl.
+        """
+        gate = asyncio.Semaphore(self.concurrency)
+
+        async def run_one(item):
+            async with gate:
+                try:
+                    return await worker(item)
+                except Exception as e:
+                    print(f"[WARN] {type(self).__name__}: failed on {item}: {e}")
+                    return None
+
+        return await asyncio.gather(*(run_one(item) for item in items))
+
+    async def crawl(self, list_urls: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Visit list pages (and detail pages if follow_detail_pages) concurrently."""
+        if list_urls is None:
+            list_urls = self.get_list_page_urls()
+        if self.workers > 1:
+            # The farm's workers share the frontier, so it is used even without FRONTIER
+            return await asyncio.to_thread(BrowserFarm(self).crawl, list_urls)
+        if self.use_frontier:
+            return await self._crawl_frontier(list_urls)
+        batches = await self.run_bounded(list_urls, self._crawl_list_page)
+        items = [item for batch in batches if batch for item in batch]
+        if not self.follow_detail_pages:
+            return items
+        details = await self.run_bounded(items, self._crawl_detail_page)
+        return [d for d in details if d]
+
+    async def _crawl_frontier(self, list_urls: List[str]) -> List[Dict[str, Any]]:
+        """crawl() through the persistent frontier: every finished page is stored as it completes.
+
+        List pages and the detail pages they yield are leased by `concurrency`
+        workers; detail pages go first so started records are finished before new
+        list pages are opened. After a crash, the next crawl() resumes with the
+        pages that were not done and returns the stored results with the new ones.
+        """
+        frontier = self.frontier
+        if frontier.begin():
+            print(f"[INFO] {type(self).__name__}: resuming crawl, {frontier.remaining()} URLs left")
+        frontier.enqueue_many(list_urls, kind='list', priority=0, depth=0)
+        await self._drain_frontier(frontier)
+        frontier.finish()
+        return self.frontier_results(frontier)
+
+    def frontier_results(self, frontier) -> List[Dict[str, Any]]:
+        """What crawl() returns, read back from a finished frontier."""
+        if self.follow_detail_pages:
+            return [d for d in frontier.results('detail') if d]
+        return [item for batch in frontier.results('list') if batch for item in batch]
+
+    async def _drain_frontier(self, frontier, poll: Optional[float] = None) -> int:
+        """Lease and process frontier URLs on `concurrency` workers until none are left.
+
+        With poll, other processes work on the same frontier (see scrapers/farm.py):
+        an idle worker looks again every poll seconds until no URL is pending or
+        leased anywhere, since a page still running elsewhere may enqueue detail
+        pages. Returns the number of pages processed here.
+        """
+        in_flight = 0
+        processed = 0
+        changed = asyncio.Event()
+
+        async def process(item):
+            if item.kind == 'list':
+                records = await self._crawl_list_page(item.url)
+                if self.follow_detail_pages and records:
+                    frontier.enqueue_many([r['url'] for r in records], kind='detail', priority=1,
+                                          depth=item.depth + 1, payloads=records)
+                frontier.ack(item.url, records)
+            else:
+                frontier.ack(item.url, await self._crawl_detail_page(item.payload))
+
+        async def worker():
+            nonlocal in_flight, processed
+            while True:
+                leased = frontier.lease(1)
+                if not leased:
+                    if in_flight == 0 and (poll is None or frontier.remaining() == 0):
+                        changed.set()
+                        return
+                    # Running pages may still enqueue detail pages
+                    changed.clear()
+                    try:
+                        await asyncio.wait_for(changed.wait(), poll)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                item = leased[0]
+                in_flight += 1
+                try:
+                    await process(item)
+                except Exception as e:
+                    print(f"[WARN] {type(self).__name__}: failed on {item.url} ({classify(e)}): {e}")
+                    # Already retried by _crawl_*_page; the next crawl starts over and tries it again
+                    frontier.nack(item.url, str(e), retry=False)
+                finally:
+                    in_flight -= 1
+                    processed += 1
+                    changed.set()
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return processed
+
+    async def work_farm(self, workers: int) -> int:
+        """Body of one browser farm worker process (see scrapers/farm.py).
+
+        Crawls from the frontier the parent filled, with 1/workers of the per-host
+        concurrency, until it is empty. Returns the number of pages processed.
+        """
+        self.per_host_concurrency = max(1, -(-self.per_host_concurrency // workers))
+        # The farm already uses the cores; a parse pool per worker would oversubscribe them
+        self.parse_inline = True
+        try:
+            return await self._drain_frontier(self.frontier, poll=0.5)
+        finally:
+            await self.stop_browser()
+
+    # ----------------
+    # Orchestration
+    # ----------------
+    def scrape(self):
+        """Synchronous entry point that runs scrape_async() to completion."""
+        return asyncio.run(self.scrape_async())
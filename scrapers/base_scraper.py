@@ -1,31 +1,177 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Set
 import time
-import csv
+import threading
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
-from pathlib import Path
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
-from playwright.sync_api import sync_playwright, Page, Browser
+from urllib.parse import urlparse
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from config import settings
+from scrapers.consent import CONSENT_SCRIPT, CONSENT_SCRIPT_ARGS, ConsentStore
+from scrapers.frontier import Frontier
+from scrapers.http_fetch import HttpFetcher
+from scrapers.page_cache import PageCache, season_is_archived
+from scrapers.replay import ReplayArchive, replay_url
+from scrapers.interception import InterceptionPolicy
+from scrapers.readiness import ReadinessTimer, compile_readiness
+from scrapers.storage_cache import AssetCache, StorageStateCache, merge_states
+from utils.parse_pool import ParsePool
+from utils.rate_limiter import HostRateLimiter, host_of, shared_limiter
+from utils.csv_sink import CsvSink
+from utils.warehouse import Warehouse
+from utils.retry import (BLOCKED, SERVER, BreakerBoard, CircuitOpenError, Retrier, classify, detect_block,
+                         raise_for_response, shared_breakers)
+
+
+class _PoolSlot:
+    """One warm context/page pair owned by a PagePool."""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.navigations = 0
+
+
+class PagePool:
+    """Fixed-size pool of warm browser contexts and pages.
+
+    Pages are checked out with acquire(), reset to about:blank on release() and
+    their context is closed and replaced once it has served `max_navigations`
+    navigations, so a long crawl keeps a flat memory profile.
+    """
+
+    def __init__(self, context_factory: Callable[[], BrowserContext], size: int = 4,
+                 max_navigations: int = 50):
+        self.context_factory = context_factory
+        self.size = max(1, size)
+        self.max_navigations = max(1, max_navigations)
+        self._idle: List[_PoolSlot] = []
+        self._busy: Dict[int, _PoolSlot] = {}
+        self.contexts_created = 0
+
+    def _new_slot(self) -> _PoolSlot:
+        context = self.context_factory()
+        page = context.new_page()
+        slot = _PoolSlot(context, page)
+
+        def on_navigated(frame):
+            if frame == page.main_frame and frame.url != 'about:blank':
+                slot.navigations += 1
+
+        page.on('framenavigated', on_navigated)
+        self.contexts_created += 1
+        return slot
+
+    def _close_slot(self, slot: _PoolSlot):
+        try:
+            slot.context.close()
+        except Exception:
+            pass
+
+    def acquire(self) -> Page:
+        """Check out a ready page, creating or recycling a context when needed."""
+        slot = self._idle.pop() if self._idle else None
+        if slot is None:
+            if len(self._busy) >= self.size:
+                raise RuntimeError(f'Page pool exhausted ({self.size} pages checked out)')
+            slot = self._new_slot()
+        self._busy[id(slot.page)] = slot
+        return slot.page
+
+    def release(self, page: Page):
+        """Return a page to the pool, resetting it or recycling its context."""
+        slot = self._busy.pop(id(page), None)
+        if slot is None:
+            return
+        if page.is_closed() or slot.navigations >= self.max_navigations:
+            self._close_slot(slot)
+            return
+        try:
+            page.goto('about:blank')
+        except Exception:
+            self._close_slot(slot)
+            return
+        self._idle.append(slot)
+
+    def contexts(self) -> List[BrowserContext]:
+        return [slot.context for slot in self._idle + list(self._busy.values())]
+
+    def close(self):
+        for slot in self._idle + list(self._busy.values()):
+            self._close_slot(slot)
+        self._idle = []
+        self._busy = {}
 
 
 class BaseScraper:
     """Base class for scrapers. Concrete scrapers should inherit and implement required methods.
 
-    This implementation provides Playwright browser lifecycle helpers, simple retry/backoff,
-    CSV saving helper and a small sleep delay between requests.
+    This implementation provides Playwright browser lifecycle helpers, a bounded page pool,
+    request interception (see block_* attributes), readiness-based navigation (see
+    `readiness`), HTTP-first fetching (see `fetch_mode`), classified retries with per-host
+    circuit breakers (see utils/retry.py), CSV saving helper and adaptive per-host rate
+    limiting (see utils/rate_limiter.py).
     """
 
+    # Request interception: blocked in addition to settings.BLOCKED_* for this scraper
+    block_resource_types: tuple = ()
+    block_domains: tuple = ()
+    block_url_patterns: tuple = ()
+
+    # What "ready" means for this scraper's pages (see scrapers/readiness.py) and the
+    # fixed wait it replaces, used to report wall-clock saved per page
+    readiness = ('dom_stable', 300)
+    legacy_wait_ms = 0
+
+    # Scrapers that can parse their pages from server HTML set this and override
+    # needs_javascript(); the others always use the browser
+    http_capable = False
+
     def __init__(self, region_filter: List[str] = ["Asia", "Europe"], headless: bool = True):
         self.region_filter = region_filter
-        self.delay = getattr(settings, 'REQUEST_DELAY', 2)
+        # Shared by every scraper in the process so hosts see one request rate
+        self.rate_limiter: HostRateLimiter = shared_limiter()
         self.retry_attempts = getattr(settings, 'RETRY_ATTEMPTS', 3)
         self.retry_delay = getattr(settings, 'RETRY_DELAY', 5)
+        # Breakers are shared like the rate limiter; retry metrics are per scraper
+        self.breakers: BreakerBoard = shared_breakers()
+        self.retrier = Retrier(self.retry_attempts, self.retry_delay)
         self.headless = headless
+        self.page_pool_size = getattr(settings, 'PAGE_POOL_SIZE', 4)
+        self.context_max_navigations = getattr(settings, 'CONTEXT_MAX_NAVIGATIONS', 50)
         self._playwright = None
         self._browser: Optional[Browser] = None
+        self._pool: Optional[PagePool] = None
+        self.interception = InterceptionPolicy.from_settings().extend(
+            self.block_resource_types, self.block_domains, self.block_url_patterns)
+        self.readiness_timeout = int(getattr(settings, 'READINESS_TIMEOUT', 15) * 1000)
+        self.readiness_timer = ReadinessTimer(self.legacy_wait_ms)
+        self.consent = ConsentStore()
+        self.storage_cache = StorageStateCache()
+        # Record/replay (see scrapers/replay.py) must see every response, so they bypass the caches
+        record_dir = getattr(settings, 'RECORD_ARCHIVE', None)
+        self.recorder = ReplayArchive(record_dir) if record_dir else None
+        self.replay_server = getattr(settings, 'REPLAY_SERVER', None)
+        self.asset_cache = (AssetCache() if getattr(settings, 'HTTP_DISK_CACHE', False)
+                            and not (self.recorder or self.replay_server) else None)
+        self.page_latencies_ms: List[float] = []
+        self._contexts: List[BrowserContext] = []
+        self._visited_hosts: Set[str] = set()
+        self.fetch_mode = getattr(settings, 'FETCH_MODE', 'auto')
+        self.fetch_stats = Counter()
+        self._http: Optional[HttpFetcher] = None
+        self.offline = getattr(settings, 'OFFLINE', False)
+        self.page_cache_ttl = getattr(settings, 'PAGE_CACHE_TTL_HOURS', 12) * 3600
+        self._page_cache: Optional[PageCache] = None
+        self._page_cache_lock = threading.Lock()
+        self._parse_pool: Optional[ParsePool] = None
+        # Resumable crawls (see scrapers/frontier.py)
+        self.use_frontier = getattr(settings, 'FRONTIER', True)
+        self._frontier: Optional[Frontier] = None
+        # Lead warehouse (see utils/warehouse.py)
+        self._warehouse: Optional[Warehouse] = None
+        self._load_storage_cache()
 
     # ----------------
     # Methods to implement in subclasses
@@ -55,83 +201,486 @@ class BaseScraper:
         self._playwright = sync_playwright().start()
         self._browser = self._playwright.chromium.launch(headless=self.headless)
 
+    def _load_storage_cache(self):
+        """Seed the consent store with unexpired storage state from previous runs."""
+        entries = self.storage_cache.load_all()
+        for host, entry in entries.items():
+            self.consent.record(host, entry['state'], consented=entry.get('consented', False))
+        if entries:
+            print(f"[INFO] Loaded cached storage state for {', '.join(sorted(entries))}")
+
+    def _track_context(self, context: BrowserContext):
+        self._contexts.append(context)
+        context.on('close', lambda _: self._contexts.remove(context) if context in self._contexts else None)
+
+    def save_storage_state(self):
+        """Write the live contexts' cookies/localStorage for every host visited this run."""
+        states = []
+        for context in list(self._contexts):
+            try:
+                states.append(context.storage_state())
+            except Exception:
+                continue
+        self._write_storage_state(states)
+
+    def _write_storage_state(self, states: List[Dict[str, Any]]):
+        if not states or not self._visited_hosts:
+            return
+        merged = merge_states(states)
+        for host in sorted(self._visited_hosts):
+            try:
+                self.storage_cache.save(host, merged, consented=self.consent.has(host))
+            except OSError as e:
+                print(f"[WARN] Could not save storage state for {host}: {e}")
+        if self.asset_cache:
+            print(f"[INFO] {type(self).__name__} asset cache: {self.asset_cache.hits} hits, {self.asset_cache.misses} misses")
+
     def stop_browser(self):
+        self.log_fetch_stats()
+        self.log_page_cache_stats()
+        self.log_rate_limit_stats()
+        self.log_retry_stats()
+        if self._http:
+            self._http.close()
+            self._http = None
+        if self._parse_pool:
+            self._parse_pool.close()
+            self._parse_pool = None
+        self.save_storage_state()
+        if self.recorder:
+            self.recorder.save()
+        if self._pool:
+            self._pool.close()
+            self._pool = None
         if self._browser:
             self._browser.close()
             self._browser = None
+            self.log_interception_stats()
+            self.log_readiness_stats()
         if self._playwright:
             self._playwright.stop()
             self._playwright = None
 
-    def new_page(self, **kwargs) -> Page:
+    def log_interception_stats(self):
+        if self.interception.active:
+            print(f"[INFO] {type(self).__name__} interception: {self.interception.stats.summary()}")
+
+    def log_fetch_stats(self):
+        if self.fetch_stats:
+            paths = ', '.join(f'{path}={count}' for path, count in sorted(self.fetch_stats.items()))
+            print(f"[INFO] {type(self).__name__} pages by fetch path: {paths}")
+
+    def log_page_cache_stats(self):
+        if self._page_cache and self._page_cache.counts:
+            counts = ', '.join(f'{k}={v}' for k, v in sorted(self._page_cache.counts.items()))
+            print(f"[INFO] {type(self).__name__} page cache: {counts}")
+
+    def log_rate_limit_stats(self):
+        stats = {host: s for host, s in self.rate_limiter.stats().items()
+                 if host.split(':')[0] in self._visited_hosts}
+        if stats:
+            rates = ', '.join(f"{host}={s['rps']}/s" for host, s in sorted(stats.items()))
+            print(f"[INFO] {type(self).__name__} rate limit: {rates}")
+
+    def log_retry_stats(self):
+        metrics = self.retrier.metrics
+        if metrics.failed:
+            print(f"[INFO] {type(self).__name__} retries: {metrics.summary()}")
+        breakers = {host: s for host, s in self.breakers.states().items()
+                    if host.split(':')[0] in self._visited_hosts}
+        for host, state in sorted(breakers.items()):
+            print(f"[INFO] {type(self).__name__} breaker {host}: {state['state']}, opened {state['opens']}x, "
+                  f"{state['shed']} requests shed")
+        if metrics.calls or metrics.failed:
+            try:
+                metrics.export(scraper=type(self).__name__, breakers=breakers)
+            except OSError as e:
+                print(f"[WARN] Could not export retry metrics: {e}")
+
+    def log_readiness_stats(self):
+        if self.readiness_timer.samples:
+            print(f"[INFO] {type(self).__name__} readiness: {self.readiness_timer.summary()}")
+
+    def new_context(self, **kwargs) -> BrowserContext:
+        """Create a browser context. Subclasses can override to customise every context."""
         if not self._browser:
             self.start_browser()
         assert self._browser is not None, 'Browser not started'
+        if 'storage_state' not in kwargs and self.consent.storage_state():
+            # Start with consent already given on hosts accepted earlier in this run
+            kwargs['storage_state'] = self.consent.storage_state()
         context = self._browser.new_context(**kwargs)
-        return context.new_page()
+        # Route handlers run last-registered first: interception, then the page cache,
+        # then the asset cache (or record/replay)
+        if self.replay_server:
+            context.route('**/*', self._route_replay)
+        elif self.recorder:
+            context.route('**/*', self._route_record)
+        if self.asset_cache:
+            context.route('**/*', self.asset_cache.handle_route)
+        if self.page_cache:
+            context.route('**/*', self._route_page_cache)
+        if self.interception.active:
+            context.route('**/*', self.interception.handle_route)
+            context.on('response', self.interception.on_response)
+        self._track_context(context)
+        return context
 
-    def _with_retries(self, fn, *args, **kwargs):
-        attempts = 0
-        delay = self.retry_delay
-        while attempts < self.retry_attempts:
+    def new_page(self, **kwargs) -> Page:
+        """Create a standalone page in its own context; closing the page closes the context.
+
+        Prefer pooled_page() for crawling loops.
+        """
+        context = self.new_context(**kwargs)
+        page = context.new_page()
+
+        def on_close(_):
+            try:
+                context.close()
+            except Exception:
+                pass
+
+        page.on('close', on_close)
+        return page
+
+    @property
+    def page_pool(self) -> PagePool:
+        if self._pool is None:
+            self._pool = PagePool(self.new_context, size=self.page_pool_size,
+                                  max_navigations=self.context_max_navigations)
+        return self._pool
+
+    @contextmanager
+    def pooled_page(self):
+        """Check out a warm page from the pool for the duration of a `with` block."""
+        page = self.page_pool.acquire()
+        try:
+            yield page
+        finally:
+            self.page_pool.release(page)
+
+    @property
+    def http(self) -> HttpFetcher:
+        if self._http is None:
+            self._http = HttpFetcher(pool_size=self.page_pool_size)
+            self._http.add_cookies(self.consent.cookies())
+        return self._http
+
+    @property
+    def parse_pool(self) -> ParsePool:
+        """Worker processes for pure parse functions (started on first use)."""
+        if self._parse_pool is None:
+            self._parse_pool = ParsePool()
+        return self._parse_pool
+
+    @property
+    def frontier(self) -> Frontier:
+        """This scraper's persistent crawl frontier (opened on first use)."""
+        if self._frontier is None:
+            self._frontier = Frontier(type(self).__name__)
+        return self._frontier
+
+    @property
+    def warehouse(self) -> Warehouse:
+        """The lead warehouse that scrapers upsert their records into (opened on first use)."""
+        if self._warehouse is None:
+            self._warehouse = Warehouse()
+        return self._warehouse
+
+    def crawl_resumable(self, urls: List[str], fn: Callable[[str], Any]) -> List[Any]:
+        """Run fn(url) over urls through the frontier; results come back in url order.
+
+        Each result is stored as soon as its URL is done, so a crawl that is killed
+        resumes with the URLs it had not finished. fn raising gives the URL back for
+        another attempt (up to FRONTIER_MAX_ATTEMPTS). Without FRONTIER this is a
+        plain loop; a URL that still fails is logged and left out, as with the frontier.
+        Pacing is left to the rate limiter in navigate()/fetch_html(), and
+        transient failures (timeouts, 5xx, ...) are retried with backoff by `retrier`
+        before a URL counts as failed.
+        """
+        if not self.use_frontier:
+            results = []
+            for url in urls:
+                try:
+                    results.append(self.retrier.call(url, fn, url))
+                except Exception as e:
+                    print(f"[WARN] {type(self).__name__}: failed on {url} ({classify(e)}): {e}")
+            return results
+        frontier = self.frontier
+        if frontier.begin():
+            print(f"[INFO] {type(self).__name__}: resuming crawl, {frontier.remaining()} URLs left")
+        frontier.enqueue_many(urls)
+        while True:
+            leased = frontier.lease(1)
+            if not leased:
+                break
+            item = leased[0]
             try:
-                return fn(*args, **kwargs)
+                frontier.ack(item.url, self.retrier.call(item.url, fn, item.url))
             except Exception as e:
-                attempts += 1
-                if attempts >= self.retry_attempts:
+                print(f"[WARN] {type(self).__name__}: failed on {item.url} ({classify(e)}): {e}")
+                # Already retried; the next crawl starts over and tries it again
+                frontier.nack(item.url, str(e), retry=False)
+        results = frontier.results()
+        frontier.finish()
+        return results
+
+    @property
+    def page_cache(self) -> Optional[PageCache]:
+        """The on-disk page cache, or None if PAGE_CACHE is off and we are not offline."""
+        if self.recorder or self.replay_server:
+            return None
+        if self._page_cache is None and (getattr(settings, 'PAGE_CACHE', True) or self.offline):
+            with self._page_cache_lock:
+                if self._page_cache is None:
+                    self._page_cache = PageCache(ttl_for=self.cache_ttl)
+        return self._page_cache
+
+    def cache_ttl(self, url: str) -> Optional[float]:
+        """Seconds a cached copy of url stays fresh; None caches it forever (archived seasons)."""
+        if season_is_archived(url):
+            return None
+        return self.page_cache_ttl
+
+    def _cached_page(self, url: str):
+        """Return (entry, servable): servable when fresh, or whenever we are offline."""
+        cached = self.page_cache.get(url) if self.page_cache else None
+        servable = bool(cached) and (self.offline or self.page_cache.is_fresh(cached))
+        if servable:
+            self.page_cache.counts['hit'] += 1
+        elif self.offline:
+            self.page_cache.counts['offline_miss'] += 1
+        return cached, servable
+
+    def _route_page_cache(self, route):
+        """Route handler serving document requests from the page cache."""
+        request = route.request
+        if request.resource_type != 'document' or request.method != 'GET':
+            if self.offline:
+                route.abort('internetdisconnected')
+            else:
+                route.fallback()
+            return
+        cached, servable = self._cached_page(request.url)
+        if servable:
+            route.fulfill(status=cached.status, content_type=cached.content_type, body=cached.body)
+            return
+        if self.offline:
+            route.abort('internetdisconnected')
+            return
+        headers = {**request.headers, **cached.conditional_headers()} if cached else None
+        response = route.fetch(headers=headers)
+        if response.status == 304 and cached:
+            self.page_cache.mark_validated(request.url)
+            self.page_cache.counts['revalidated'] += 1
+            route.fulfill(status=cached.status, content_type=cached.content_type, body=cached.body)
+            return
+        body = response.body()
+        if response.status == 200:
+            self.page_cache.put(request.url, body, 200, response.headers)
+            self.page_cache.counts['stored'] += 1
+        route.fulfill(response=response, body=body)
+
+    def _route_replay(self, route):
+        """Route handler answering every request from the local replay server."""
+        response = route.fetch(url=replay_url(self.replay_server, route.request.url))
+        route.fulfill(response=response)
+
+    def _route_record(self, route):
+        """Route handler fetching from the network and recording the response."""
+        request = route.request
+        response = route.fetch()
+        body = response.body()
+        self.recorder.add(request.url, response.status, response.headers, body, request.method)
+        route.fulfill(response=response, body=body)
+
+    def needs_javascript(self, url: str, html: str) -> bool:
+        """Return True if html fetched over HTTP lacks content that only the browser renders."""
+        return False
+
+    def fetch_html(self, url: str) -> Optional[str]:
+        """Fetch url over HTTP according to fetch_mode.
+
+        Fresh page-cache entries are served without a request and stale ones are
+        revalidated with ETag/Last-Modified. Returns the HTML, or None when the caller
+        should load the page in the browser: fetch_mode is 'browser', the scraper is not
+        http_capable, the request failed (in 'auto' mode), the page is not cached while
+        offline, or needs_javascript() says the HTML is incomplete.
+        """
+        if self.fetch_mode == 'browser' or not self.http_capable:
+            return None
+        self._visited_hosts.add(urlparse(url).hostname or '')
+        return self._fetch_html(url, *self._cached_page(url))
+
+    def _fetch_html(self, url: str, cached, servable: bool, pace: bool = True) -> Optional[str]:
+        """fetch_html() after the cache lookup.
+
+        pace=False when the caller already checked the host's breaker and waited for the rate limiter.
+        """
+        if servable:
+            html, path = cached.text, 'cache'
+        elif self.offline:
+            return None
+        else:
+            host = host_of(url)
+            try:
+                fetch_url = replay_url(self.replay_server, url) if self.replay_server else url
+                if pace:
+                    self.breakers.check(host)
+                    self.rate_limiter.acquire(host)
+                try:
+                    result = self.http.fetch(fetch_url, headers=cached.conditional_headers() if cached else None)
+                except Exception as e:
+                    self.record_error(host, e)
                     raise
-                time.sleep(delay)
-                delay *= 2
+                retry_after = result.headers.get('Retry-After')
+                blocked = result.status != 304 and detect_block(result.text)
+                self.record_response(host, result.status, result.elapsed_ms, retry_after, blocked)
+                self.page_latencies_ms.append(result.elapsed_ms)
+                if self.recorder and result.ok:
+                    self.recorder.add(url, result.status, result.headers, result.content)
+                if result.status == 304 and cached:
+                    self.page_cache.mark_validated(url)
+                    self.page_cache.counts['revalidated'] += 1
+                    html, path = cached.text, 'cache'
+                else:
+                    raise_for_response(result.status, url, result.text if blocked else None, retry_after)
+                    html, path = result.text, 'http'
+                    if self.page_cache and result.status == 200:
+                        self.page_cache.put(url, html.encode('utf-8'), 200,
+                                            {**result.headers, 'Content-Type': 'text/html; charset=utf-8'})
+                        self.page_cache.counts['stored'] += 1
+            except Exception as e:
+                if self.fetch_mode == 'http' or isinstance(e, CircuitOpenError):
+                    raise
+                self.fetch_stats['http_failed'] += 1
+                print(f"[WARN] HTTP fetch failed for {url} ({e}); using the browser")
+                return None
+        if self.fetch_mode == 'auto' and self.needs_javascript(url, html):
+            self.fetch_stats['needs_javascript'] += 1
+            return None
+        self.fetch_stats[path] += 1
+        return html
+
+    def readiness_wait(self, timeout: int, legacy_wait_ms: Optional[int] = None) -> int:
+        """Milliseconds navigate() polls the readiness predicate: READINESS_TIMEOUT capped by
+        the navigation timeout and, when given, the fixed wait the predicate replaced (a page
+        that never settles then costs no more than the old sleep did)."""
+        return min(self.readiness_timeout, timeout, legacy_wait_ms or timeout)
 
-    def handle_cookie_consent(self, page: Page, timeout: int = 5000) -> bool:
+    def navigate(self, page: Page, url: str, readiness=None, timeout: Optional[int] = None,
+                 legacy_wait_ms: Optional[int] = None):
+        """Go to url and return as soon as the readiness predicate holds.
+
+        Waits for DOMContentLoaded only, then polls `readiness` (default: the scraper's
+        `readiness` spec) in the page for at most readiness_wait(timeout, legacy_wait_ms)
+        milliseconds. A readiness timeout is logged, not raised, so the
+        caller still extracts whatever rendered. Raises CircuitOpenError without loading
+        when the host's breaker is open, and HttpStatusError/BlockedError for 429/5xx
+        responses and bot-protection pages; other 4xx pages are returned as before.
+        """
+        timeout = timeout or getattr(settings, 'TIMEOUT', 30) * 1000
+        self._visited_hosts.add(urlparse(url).hostname or '')
+        host = host_of(url)
+        if not self.offline:
+            self.breakers.check(host)
+            self.rate_limiter.acquire(host)
+        self.fetch_stats['browser'] += 1
+        start = time.monotonic()
+        try:
+            response = page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+        except Exception as e:
+            self.record_error(host, e)
+            raise
+        loaded = time.monotonic()
+        status = response.status if response else None
+        retry_after = response.headers.get('retry-after') if response else None
+        # Only error pages are checked for bot protection; reading the DOM costs a round trip
+        html = page.content() if status and status >= 400 else None
+        self.record_response(host, status, (loaded - start) * 1000, retry_after, detect_block(html))
+        raise_for_response(status, url, html, retry_after, client_errors=False)
+        timed_out = False
+        try:
+            page.wait_for_function(compile_readiness(readiness or self.readiness),
+                                   timeout=self.readiness_wait(timeout, legacy_wait_ms))
+        except Exception as e:
+            timed_out = True
+            print(f"[WARN] Readiness not reached for {url}: {e}")
+        ready = time.monotonic()
+        self.readiness_timer.record(url, (loaded - start) * 1000, (ready - loaded) * 1000,
+                                    timed_out=timed_out, legacy_wait_ms=legacy_wait_ms)
+        self.page_latencies_ms.append((ready - start) * 1000)
+        return response
+
+    def record_response(self, host: str, status: Optional[int], elapsed_ms: float,
+                        retry_after: Optional[str] = None, blocked: bool = False):
+        """Feed one response (status None for same-document navigations) to the rate limiter and breaker."""
+        self.rate_limiter.record(host, status, elapsed_ms, retry_after, error=blocked)
+        if blocked:
+            self.breakers.failure(host, BLOCKED)
+        elif status is not None and status >= 500:
+            self.breakers.failure(host, SERVER)
+        else:
+            self.breakers.success(host)
+
+    def record_error(self, host: str, exc: Exception):
+        """Feed a request that got no response (timeout, network error, ...) to the rate limiter and breaker."""
+        self.rate_limiter.record(host, error=True)
+        self.breakers.failure(host, classify(exc))
+
+    def _with_retries(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) with classified retries and jittered backoff (see utils/retry.py)."""
+        return self.retrier.call(None, fn, *args, **kwargs)
+
+    def handle_cookie_consent(self, page: Page, timeout: int = 0) -> bool:
         """Detect and accept cookie consent dialogs (Cookiebot, OneTrust, etc.).
-        
+
+        All known consent buttons are checked in one in-page evaluation. Hosts that
+        were already accepted in this run are skipped, since their contexts carry the
+        consent cookies.
+
         Args:
             page: Playwright Page instance
-            timeout: Milliseconds to wait for consent dialog (default 5000ms)
-            
+            timeout: Milliseconds to keep polling for a late dialog (default 0: check once)
+
         Returns:
             True if consent was handled, False if no dialog found
         """
+        host = urlparse(page.url).hostname or ''
+        self._visited_hosts.add(host)
+        if self.consent.has(host):
+            return False
         try:
-            # Common consent dialog selectors (in priority order)
-            consent_selectors = [
-                # Cookiebot
-                '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
-                '#CybotCookiebotDialogBodyButtonAccept',
-                'a#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
-                
-                # OneTrust
-                '#onetrust-accept-btn-handler',
-                'button#onetrust-accept-btn-handler',
-                
-                # Generic patterns
-                'button:has-text("Accept")',
-                'button:has-text("Accept All")',
-                'button:has-text("I Accept")',
-                'button:has-text("Agree")',
-                'button:has-text("Allow All")',
-                'a:has-text("Accept All Cookies")',
-            ]
-            
-            for selector in consent_selectors:
-                try:
-                    # Check if element exists and is visible
-                    element = page.locator(selector).first
-                    if element.is_visible(timeout=timeout):
-                        element.click()
-                        # Wait a moment for dialog to close
-                        time.sleep(0.5)
-                        return True
-                except Exception:
-                    # Try next selector
-                    continue
-            
+            if timeout:
+                clicked = page.wait_for_function(CONSENT_SCRIPT, arg=CONSENT_SCRIPT_ARGS,
+                                                 timeout=timeout).json_value()
+            else:
+                clicked = page.evaluate(CONSENT_SCRIPT, CONSENT_SCRIPT_ARGS)
+        except PlaywrightTimeoutError:
             return False
         except Exception as e:
             # Log but don't fail - consent handling is best-effort
             print(f"[WARN] Cookie consent handling failed: {e}")
             return False
+        if not clicked:
+            return False
+        # Wait a moment for the dialog to close and write its cookies
+        time.sleep(0.5)
+        self.remember_consent(page.context, host)
+        return True
+
+    def remember_consent(self, context: BrowserContext, host: str):
+        """Keep the consent storage state and share its cookies with the pooled contexts."""
+        try:
+            state = context.storage_state()
+            self.consent.record(host, state)
+            self.storage_cache.save(host, state, consented=True)
+            if self._pool:
+                for other in self._pool.contexts():
+                    if other is not context:
+                        other.add_cookies(state.get('cookies', []))
+        except Exception as e:
+            print(f"[WARN] Could not save consent state for {host}: {e}")
 
     # ----------------
     # Orchestration
@@ -147,32 +696,17 @@ class BaseScraper:
     # ----------------
     # Persistence helpers
     # ----------------
-    def save_to_csv(self, data: List[Dict[str, Any]], filename: str, mode: str = 'w'):
+    def save_to_csv(self, data: Iterable[Dict[str, Any]], filename: str, mode: str = 'w'):
+        """Write records to filename through a CsvSink (utf-8-sig for Excel).
+
+        mode='a' appends; records with new fields widen the header instead of being
+        written under the wrong columns.
+        """
         if not data:
-            return
-        
-        # Ensure parent directory exists
-        Path(filename).parent.mkdir(parents=True, exist_ok=True)
-        
-        if pd is not None:
-            # Use pandas if available
-            df = pd.DataFrame(data)
-            if mode == 'a' and Path(filename).exists():
-                df.to_csv(filename, mode='a', index=False, header=False, encoding=getattr(settings, 'CSV_ENCODING', 'utf-8-sig'))
-            else:
-                df.to_csv(filename, index=False, encoding=getattr(settings, 'CSV_ENCODING', 'utf-8-sig'))
-        else:
-            # Fallback to standard library csv module
-            encoding = getattr(settings, 'CSV_ENCODING', 'utf-8-sig')
-            keys = list(data[0].keys())
-            file_exists = Path(filename).exists()
-            
-            with open(filename, mode, encoding=encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=keys)
-                if mode == 'w' or not file_exists:
-                    writer.writeheader()
-                for row in data:
-                    writer.writerow(row)
+            return 0
+        with CsvSink(filename, mode=mode) as sink:
+            sink.write_many(data)
+        return sink.rows_written
 
     def timestamp(self) -> str:
         return datetime.utcnow().strftime(getattr(settings, 'CSV_DATETIME_FORMAT', '%Y-%m-%d %H:%M:%S'))
@@ -4,16 +4,25 @@ Extracts fashion brand information with descriptions.
 Priority 1B - Tier 1 Lead Generation
 """
 import re
-import time
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
+from scrapers.extraction import page_links
 from config.settings import REGION_MAPPING, TARGET_REGIONS
 from utils.data_cleaner import clean_text
+from utils.retry import is_transient
 
 
 class BrandsScraper(BaseScraper):
     """Scraper for fashion brands directory"""
     
+    # Letter pages: ready once brand links have rendered
+    readiness = ('any',
+                 ('all', ('selector', 'a[href*="/fashion/brands/"]'), ('dom_stable', 300)),
+                 ('dom_stable', 2000))
+    legacy_wait_ms = 3000
+    # Brand pages: ready once the heading exists and the DOM has settled
+    detail_readiness = ('any', ('all', ('selector', 'h1'), ('dom_stable', 300)), ('dom_stable', 1500))
+    
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.modemonline.com/fashion/brands/letter"
@@ -34,59 +43,53 @@ class BrandsScraper(BaseScraper):
         print('='*80)
         
         try:
-            page = self.new_page()
-            page.goto(url, wait_until='networkidle', timeout=60000)
-            time.sleep(3)
+            with self.pooled_page() as page:
+                self.navigate(page, url, timeout=60000)
             
-            brands = []
+                brands = []
             
-            # Find all brand links - they usually have a specific pattern
-            # Try to find links in a brands list or directory
-            brand_links = page.locator('a[href*="/fashion/brands/"]').all()
-            print(f"Found {len(brand_links)} potential brand links")
+                # Find all brand links - they usually have a specific pattern
+                # Try to find links in a brands list or directory
+                brand_links = page_links(page, 'a[href*="/fashion/brands/"]')
+                print(f"Found {len(brand_links)} potential brand links")
             
-            # Get unique brand pages
-            brand_urls = set()
-            for link in brand_links[:100]:  # Limit to avoid timeout
-                try:
-                    href = link.get_attribute('href')
+                # Get unique brand pages
+                brand_urls = set()
+                for link in brand_links[:100]:  # Limit to avoid timeout
+                    href = link['href']
                     if href and '/brands/letter/' not in href and href.count('/') > 3:
                         brand_urls.add(href)
-                except:
-                    continue
             
-            print(f"Extracted {len(brand_urls)} unique brand URLs")
+                print(f"Extracted {len(brand_urls)} unique brand URLs")
             
-            # Visit each brand page to get details
-            for idx, brand_url in enumerate(list(brand_urls)[:20]):  # Limit to 20 per letter for now
-                try:
-                    if not brand_url.startswith('http'):
-                        brand_url = 'https://www.modemonline.com' + brand_url
-                    
-                    brand_data = self.scrape_brand_detail(brand_url, page)
-                    if brand_data:
-                        brands.append(brand_data)
-                        if idx < 3:
-                            print(f"  [+] {brand_data['company_name']} - {brand_data['city']}, {brand_data['country']}")
+                # Visit each brand page to get details
+                for idx, brand_url in enumerate(list(brand_urls)[:20]):  # Limit to 20 per letter for now
+                    try:
+                        if not brand_url.startswith('http'):
+                            brand_url = 'https://www.modemonline.com' + brand_url
                     
-                    time.sleep(1)  # Rate limiting between brand pages
-                except Exception as e:
-                    print(f"  Error scraping brand {brand_url}: {e}")
-                    continue
+                        brand_data = self.retrier.call(brand_url, self.scrape_brand_detail, brand_url, page)
+                        if brand_data:
+                            brands.append(brand_data)
+                            if idx < 3:
+                                print(f"  [+] {brand_data['company_name']} - {brand_data['city']}, {brand_data['country']}")
+                    except Exception as e:
+                        print(f"  Error scraping brand {brand_url}: {e}")
+                        continue
             
-            page.close()
             print(f"\n[OK] Extracted {len(brands)} brands for letter '{letter}'")
             return brands
             
         except Exception as e:
+            if is_transient(e):
+                raise  # retried with backoff by crawl_resumable()
             print(f"\n[ERROR] Error scraping {url}: {str(e)}")
             return []
     
     def scrape_brand_detail(self, url, page):
         """Scrape individual brand page for detailed information"""
         try:
-            page.goto(url, wait_until='networkidle', timeout=30000)
-            time.sleep(2)
+            self.navigate(page, url, readiness=self.detail_readiness, timeout=30000, legacy_wait_ms=2000)
             
             # Extract brand name
             brand_name = "Unknown"
@@ -173,6 +176,8 @@ class BrandsScraper(BaseScraper):
             }
             
         except Exception as e:
+            if is_transient(e):
+                raise  # retried by the caller
             return None
     
     def extract_city(self, text):
@@ -242,11 +247,14 @@ class BrandsScraper(BaseScraper):
         # Test with just a few letters first
         test_letters = ['A', 'B', 'C']  # Start with A, B, C
         
-        for letter in test_letters:
-            url = f"{self.base_url}/{letter.lower()}"
-            brands = self.scrape_brands_page(url, letter)
-            all_brands.extend(brands)
-            time.sleep(3)  # Rate limiting between letters
+        try:
+            urls = [f"{self.base_url}/{letter.lower()}" for letter in test_letters]
+            # Letters done by an interrupted run are not scraped again
+            for brands in self.crawl_resumable(
+                    urls, lambda url: self.scrape_brands_page(url, url.rsplit('/', 1)[-1].upper())):
+                all_brands.extend(brands)
+        finally:
+            self.stop_browser()
         
         self.save_to_csv(all_brands)
         print(f"\nBrands scraping complete. Total: {len(all_brands)}")
@@ -4,16 +4,50 @@ Extracts fashion brand information using Mini Website pattern.
 Priority 1B - Tier 1 Lead Generation
 """
 import re
-import time
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
+from scrapers.readiness import MINI_WEBSITE_LIST
+from scrapers.extraction import mini_website_rows, page_mini_website_rows
 from config.settings import REGION_MAPPING, TARGET_REGIONS
+from utils.contact_extractor import first_contact
 from utils.data_cleaner import clean_text
+from utils.retry import is_transient
 
 
 class BrandsScraper(BaseScraper):
     """Scraper for fashion brands using Mini Website pattern"""
     
+    readiness = MINI_WEBSITE_LIST
+    legacy_wait_ms = 3000
+    # mini-web-sites pages are server-rendered; see needs_javascript()
+    http_capable = True
+    
+    # Known cities for location extraction
+    known_cities = {
+        'Milan', 'Paris', 'London', 'New York', 'Tokyo', 'Shanghai', 
+        'Hong Kong', 'Seoul', 'Singapore', 'Mumbai', 'Dubai', 'Bangkok',
+        'Berlin', 'Madrid', 'Barcelona', 'Rome', 'Florence', 'Los Angeles',
+        'Copenhagen', 'Stockholm', 'Amsterdam', 'Brussels', 'Zurich',
+        'Vienna', 'Prague', 'Warsaw', 'Moscow', 'Istanbul', 'Tel Aviv',
+        'Sydney', 'Melbourne', 'Toronto', 'Montreal', 'Beijing', 'Guangzhou'
+    }
+    
+    # City to country mapping
+    city_to_country = {
+        'Milan': 'Italy', 'Florence': 'Italy', 'Rome': 'Italy',
+        'Paris': 'France', 'London': 'United Kingdom', 'New York': 'United States',
+        'Los Angeles': 'United States', 'Tokyo': 'Japan', 'Shanghai': 'China',
+        'Hong Kong': 'Hong Kong', 'Seoul': 'South Korea', 'Singapore': 'Singapore',
+        'Mumbai': 'India', 'Dubai': 'United Arab Emirates', 'Bangkok': 'Thailand',
+        'Berlin': 'Germany', 'Madrid': 'Spain', 'Barcelona': 'Spain',
+        'Copenhagen': 'Denmark', 'Stockholm': 'Sweden', 'Amsterdam': 'Netherlands',
+        'Brussels': 'Belgium', 'Zurich': 'Switzerland', 'Vienna': 'Austria',
+        'Prague': 'Czech Republic', 'Warsaw': 'Poland', 'Moscow': 'Russia',
+        'Istanbul': 'Turkey', 'Tel Aviv': 'Israel', 'Sydney': 'Australia',
+        'Melbourne': 'Australia', 'Toronto': 'Canada', 'Montreal': 'Canada',
+        'Beijing': 'China', 'Guangzhou': 'China'
+    }
+    
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.modemonline.com/fashion/mini-web-sites/fashion-brands"
@@ -28,32 +62,6 @@ class BrandsScraper(BaseScraper):
             'lebanon', 'newzealand', 'korea', 'switzerland', 'taiwan',
             'netherlands', 'turkey', 'greatbritain', 'usa'
         ]
-        
-        # Known cities for location extraction
-        self.known_cities = {
-            'Milan', 'Paris', 'London', 'New York', 'Tokyo', 'Shanghai', 
-            'Hong Kong', 'Seoul', 'Singapore', 'Mumbai', 'Dubai', 'Bangkok',
-            'Berlin', 'Madrid', 'Barcelona', 'Rome', 'Florence', 'Los Angeles',
-            'Copenhagen', 'Stockholm', 'Amsterdam', 'Brussels', 'Zurich',
-            'Vienna', 'Prague', 'Warsaw', 'Moscow', 'Istanbul', 'Tel Aviv',
-            'Sydney', 'Melbourne', 'Toronto', 'Montreal', 'Beijing', 'Guangzhou'
-        }
-        
-        # City to country mapping
-        self.city_to_country = {
-            'Milan': 'Italy', 'Florence': 'Italy', 'Rome': 'Italy',
-            'Paris': 'France', 'London': 'United Kingdom', 'New York': 'United States',
-            'Los Angeles': 'United States', 'Tokyo': 'Japan', 'Shanghai': 'China',
-            'Hong Kong': 'Hong Kong', 'Seoul': 'South Korea', 'Singapore': 'Singapore',
-            'Mumbai': 'India', 'Dubai': 'United Arab Emirates', 'Bangkok': 'Thailand',
-            'Berlin': 'Germany', 'Madrid': 'Spain', 'Barcelona': 'Spain',
-            'Copenhagen': 'Denmark', 'Stockholm': 'Sweden', 'Amsterdam': 'Netherlands',
-            'Brussels': 'Belgium', 'Zurich': 'Switzerland', 'Vienna': 'Austria',
-            'Prague': 'Czech Republic', 'Warsaw': 'Poland', 'Moscow': 'Russia',
-            'Istanbul': 'Turkey', 'Tel Aviv': 'Israel', 'Sydney': 'Australia',
-            'Melbourne': 'Australia', 'Toronto': 'Canada', 'Montreal': 'Canada',
-            'Beijing': 'China', 'Guangzhou': 'China'
-        }
     
     def get_urls(self):
         """Return URLs for each country (testing with subset first)"""
@@ -61,6 +69,9 @@ class BrandsScraper(BaseScraper):
         countries = self.test_countries
         return [f"{self.base_url}/{country}" for country in countries]
     
+    def needs_javascript(self, url, html):
+        return 'Mini Website' not in html
+
     def scrape_brands_page(self, url):
         """Scrape brands from the mini-web-sites page"""
         print(f"\n{'='*80}")
@@ -68,43 +79,35 @@ class BrandsScraper(BaseScraper):
         print('='*80)
         
         try:
-            page = self.new_page()
-            page.goto(url, wait_until='networkidle', timeout=60000)
-            time.sleep(3)
+            # Server HTML when it has the rows, otherwise the browser
+            html = self.fetch_html(url)
+            if html is not None:
+                rows = mini_website_rows(html)
+            else:
+                page = self.new_page()
+                self.navigate(page, url, timeout=60000)
+                rows = page_mini_website_rows(page)
+                page.close()
             
             brands = []
             
-            # Find all "Mini Website" links (same pattern as tradeshows)
-            mini_website_links = page.locator('a:has-text("Mini Website")').all()
-            print(f"Found {len(mini_website_links)} Mini Website links")
+            # Find all "Mini Website" rows (same pattern as tradeshows)
+            print(f"Found {len(rows)} Mini Website links")
+            
+            # Source URL of each row, for reference
+            source_urls = [
+                f"https://www.modemonline.com{row['href']}" if row['href'].startswith('/') else row['href']
+                for row in rows
+            ]
             
-            for i, link in enumerate(mini_website_links, 1):
+            # Parse the brand information across worker processes, in row order
+            parsed = self.parse_pool.map(self.parse_brand_text, [row['text'] for row in rows], source_urls)
+            for i, brand_data in enumerate(parsed, 1):
                 try:
-                    # Get the parent element (usually tr or div)
-                    parent = None
-                    try:
-                        parent = link.locator('xpath=ancestor::tr').first
-                    except:
-                        try:
-                            parent = link.locator('xpath=ancestor::div[@class*="col" or @class*="row"]').first
-                        except:
-                            parent = link.locator('xpath=..').first
-                    
-                    if parent:
-                        # Get all text content from parent
-                        text = parent.text_content()
-                        
-                        # Get the link URL for source reference
-                        href = link.get_attribute('href')
-                        source_url = f"https://www.modemonline.com{href}" if href and href.startswith('/') else (href or "")
-                        
-                        # Parse the brand information
-                        brand_data = self.parse_brand_text(text, source_url)
-                        
-                        if brand_data and brand_data.get('company_name'):
-                            brands.append(brand_data)
-                            if i % 10 == 0:
-                                print(f"  Processed {i}/{len(mini_website_links)} brands...")
+                    if brand_data and brand_data.get('company_name'):
+                        brands.append(brand_data)
+                        if i % 10 == 0:
+                            print(f"  Processed {i}/{len(rows)} brands...")
                 
                 except Exception as e:
                     print(f"  Warning: Error processing brand link {i}: {str(e)}")
@@ -114,10 +117,13 @@ class BrandsScraper(BaseScraper):
             return brands
             
         except Exception as e:
+            if is_transient(e):
+                raise  # retried with backoff by crawl_resumable()
             print(f"[ERROR] Failed to scrape brands: {str(e)}")
             return []
     
-    def parse_brand_text(self, text, source_url=""):
+    @classmethod
+    def parse_brand_text(cls, text, source_url=""):
         """Parse brand information from text content"""
         try:
             # Clean text
@@ -131,19 +137,19 @@ class BrandsScraper(BaseScraper):
             company_name = name_match.group(1).strip() if name_match else text.split()[0] if text.split() else ""
             
             # Extract city
-            city = self.extract_city(text)
+            city = cls.extract_city(text)
             
             # Get country from city
-            country = self.city_to_country.get(city, "")
+            country = cls.city_to_country.get(city, "")
             
             # Get region
             region = REGION_MAPPING.get(country, "")
             
             # Extract contacts
-            email = self.extract_email(text)
-            phone = self.extract_phone(text)
-            website = self.extract_website(text)
-            instagram = self.extract_instagram(text)
+            email = cls.extract_email(text)
+            phone = cls.extract_phone(text, country)
+            website = cls.extract_website(text)
+            instagram = cls.extract_instagram(text)
             
             # Extract description (everything after name and before contacts)
             description = ""
@@ -178,51 +184,46 @@ class BrandsScraper(BaseScraper):
             print(f"  Warning: Error parsing brand text: {str(e)}")
             return {}
     
-    def extract_city(self, text):
+    @classmethod
+    def extract_city(cls, text):
         """Extract city from text"""
-        for city in sorted(self.known_cities, key=len, reverse=True):
+        for city in sorted(cls.known_cities, key=len, reverse=True):
             if city in text:
                 return city
         return ""
     
-    def extract_email(self, text):
+    @staticmethod
+    def extract_email(text):
         """Extract email from text"""
-        email_pattern = r'\b[\w\.-]+@[\w\.-]+\.\w+\b'
-        match = re.search(email_pattern, text)
-        return match.group(0) if match else ""
+        return first_contact(text, 'email')
     
-    def extract_phone(self, text):
-        """Extract phone number from text"""
-        phone_pattern = r'\b(?:\+?[\d\s\(\)\-\.]{10,})\b'
-        match = re.search(phone_pattern, text)
-        return match.group(0).strip() if match else ""
+    @staticmethod
+    def extract_phone(text, country=None):
+        """Extract phone number from text (E.164; national numbers are read as country's)"""
+        return first_contact(text, 'phone', default_country=country)
     
-    def extract_website(self, text):
+    @staticmethod
+    def extract_website(text):
         """Extract website from text"""
         website_pattern = r'(?:www\.[\w\.-]+\.\w+|https?://[\w\.-]+\.\w+)'
         match = re.search(website_pattern, text, re.IGNORECASE)
         return match.group(0) if match else ""
     
-    def extract_instagram(self, text):
-        """Extract Instagram handle from text"""
-        instagram_pattern = r'@([\w\.]+)'
-        match = re.search(instagram_pattern, text)
-        return match.group(1) if match else ""
+    @staticmethod
+    def extract_instagram(text):
+        """Extract Instagram handle (@handle or instagram.com/handle) from text"""
+        return first_contact(text, 'instagram', mentions=True)
     
     def run(self):
         """Main scraping process"""
         print(f"Starting brands scraper at {datetime.now()}")
         
         try:
-            self.start_browser()
-            
-            all_brands = []
             urls = self.get_urls()
             
-            for url in urls:
-                brands = self.scrape_brands_page(url)
-                all_brands.extend(brands)
-                time.sleep(2)
+            # Pages already done by an interrupted run are not scraped again
+            all_brands = [brand for brands in self.crawl_resumable(urls, self.scrape_brands_page)
+                          for brand in brands]
             
             # Filter by region
             filtered_brands = []
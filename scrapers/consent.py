@@ -0,0 +1,96 @@
+"""
+Cookie consent detection and reusable consent state.
+
+All known Cookiebot/OneTrust/generic consent buttons are checked in a single in-page
+evaluation that clicks the first visible match. Once a host's banner has been
+accepted, the context's storage state (cookies + localStorage) is kept in a
+ConsentStore so later contexts start with consent already given.
+"""
+from typing import Any, Dict, List, Optional, Set
+
+# Consent buttons by CSS selector (in priority order)
+CONSENT_CSS_SELECTORS = [
+    # Cookiebot
+    '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
+    '#CybotCookiebotDialogBodyButtonAccept',
+    'a#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll',
+
+    # OneTrust
+    '#onetrust-accept-btn-handler',
+    'button#onetrust-accept-btn-handler',
+]
+
+# Generic consent buttons as (tag, text contained), checked after the CSS selectors
+CONSENT_BUTTON_TEXTS = [
+    ('button', 'Accept'),
+    ('button', 'Accept All'),
+    ('button', 'I Accept'),
+    ('button', 'Agree'),
+    ('button', 'Allow All'),
+    ('a', 'Accept All Cookies'),
+]
+
+# Returns a description of the clicked element, or null when no banner is visible
+CONSENT_SCRIPT = """
+({css, texts}) => {
+    const visible = (el) => {
+        const style = window.getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        return style.visibility !== 'hidden' && style.display !== 'none' && rect.width > 0 && rect.height > 0;
+    };
+    for (const selector of css) {
+        const el = document.querySelector(selector);
+        if (el && visible(el)) { el.click(); return selector; }
+    }
+    for (const [tag, text] of texts) {
+        for (const el of document.querySelectorAll(tag)) {
+            if ((el.textContent || '').includes(text) && visible(el)) {
+                el.click();
+                return `${tag}:has-text("${text}")`;
+            }
+        }
+    }
+    return null;
+}
+"""
+
+CONSENT_SCRIPT_ARGS = {'css': CONSENT_CSS_SELECTORS, 'texts': [list(t) for t in CONSENT_BUTTON_TEXTS]}
+
+
+class ConsentStore:
+    """Storage state captured after accepting consent, keyed by host."""
+
+    def __init__(self):
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.consented: Set[str] = set()
+
+    def has(self, host: str) -> bool:
+        """True if consent was accepted on host (this run or a cached one)."""
+        return host in self.consented
+
+    @property
+    def hosts(self) -> Set[str]:
+        return set(self.states)
+
+    def record(self, host: str, state: Dict[str, Any], consented: bool = True):
+        self.states[host] = state
+        if consented:
+            self.consented.add(host)
+
+    def cookies(self) -> List[Dict[str, Any]]:
+        """Cookies from every recorded state, de-duplicated by (name, domain, path)."""
+        merged: Dict[tuple, Dict[str, Any]] = {}
+        for state in self.states.values():
+            for cookie in state.get('cookies', []):
+                merged[(cookie.get('name'), cookie.get('domain'), cookie.get('path'))] = cookie
+        return list(merged.values())
+
+    def storage_state(self) -> Optional[Dict[str, Any]]:
+        """A storage_state dict for browser.new_context(), or None if nothing is recorded."""
+        if not self.states:
+            return None
+        origins: Dict[str, Dict[str, Any]] = {}
+        for state in self.states.values():
+            for origin in state.get('origins', []):
+                origins[origin.get('origin')] = origin
+        return {'cookies': self.cookies(), 'origins': list(origins.values())}
@@ -3,18 +3,30 @@ Designer Showrooms scraper for ModeMonline.com
 Extracts individual brand showroom information from designer-showrooms pages.
 """
 import re
-import time
 from datetime import datetime
-from scrapers.base_scraper import BaseScraper
+from scrapers.async_base_scraper import AsyncBaseScraper
+from scrapers.extraction import mini_website_rows, page_mini_website_rows_async
+from scrapers.readiness import MINI_WEBSITE_LIST
 from config.settings import REGION_MAPPING, TARGET_REGIONS
 from utils.data_cleaner import clean_text
+from utils import date_engine
+from utils.merge_leads import LeadMerger
 
 
-class DesignerShowroomsScraper(BaseScraper):
+class DesignerShowroomsScraper(AsyncBaseScraper):
     """Scraper for individual designer brand showrooms"""
     
-    def __init__(self):
-        super().__init__()
+    # Listing pages are parsed from text/HTML only
+    block_resource_types = ('stylesheet',)
+    readiness = MINI_WEBSITE_LIST
+    legacy_wait_ms = 5000
+    # Listing pages are server-rendered; see needs_javascript()
+    http_capable = True
+    # Rows are parsed in worker processes once the page is released
+    parse_in_pool = True
+    
+    def __init__(self, headless=True):
+        super().__init__(headless=headless)
         self.base_url = "https://www.modemonline.com/fashion/fashion-weeks"
         self.seasons = [
             "spring-summer-2026",
@@ -33,76 +45,60 @@ class DesignerShowroomsScraper(BaseScraper):
             urls.append(url)
         return urls
     
-    def scrape_showroom_page(self, url):
-        """Scrape a single designer showroom page using Playwright DOM selectors"""
-        print(f"Scraping designer showroom page: {url}")
-        try:
-            page = self.new_page()
-            page.goto(url, wait_until='networkidle', timeout=60000)
-
-            # Handle cookie consent if present
-            self.handle_cookie_consent(page)
+    def get_list_page_urls(self):
+        return self.get_urls_to_scrape()
 
-            # Small wait to allow dynamic content to render
-            time.sleep(5)
+    def needs_javascript(self, url, html):
+        return 'Mini Website' not in html
 
-            showrooms = []
+    async def snapshot_list_page(self, page, url):
+        """Load a designer showroom page in the browser and return its Mini Website rows"""
+        # Returns once the Mini Website rows have rendered
+        await self.navigate(page, url, timeout=60000)
 
-            # Find all "Mini Website" links (same pattern that worked for tradeshows)
-            mini_links = page.locator('a:has-text("Mini Website")').all()
-            print(f"Found {len(mini_links)} potential showroom entries")
+        # Handle cookie consent if present
+        await self.handle_cookie_consent(page)
 
-            for idx, link in enumerate(mini_links, 1):
-                try:
-                    parent = None
-                    # Try enclosing table row first
-                    try:
-                        tr = link.locator('xpath=ancestor::tr[1]')
-                        if tr.count() > 0:
-                            parent = tr
-                    except Exception:
-                        pass
+        return await page_mini_website_rows_async(page)
 
-                    # Fallback to a nearby div container
-                    if not parent:
-                        try:
-                            div = link.locator('xpath=ancestor::div[contains(@class, "row") or contains(@class, "col")][1]')
-                            if div.count() > 0:
-                                parent = div
-                        except Exception:
-                            pass
-
-                    # Last resort: direct parent
-                    if not parent:
-                        parent = link.locator('xpath=..')
+    @classmethod
+    def parse_list_snapshot(cls, url, snapshot):
+        """Parse a designer showroom page: HTML fetched over HTTP or rows from the browser"""
+        print(f"Scraping designer showroom page: {url}")
+        rows = mini_website_rows(snapshot) if isinstance(snapshot, str) else snapshot
+        return cls._showrooms_from_rows(rows, url)
 
-                    text = parent.text_content() if parent else ''
-                    href = link.get_attribute('href')
-                    source_url = (
-                        f"https://www.modemonline.com{href}" if href and href.startswith('/') else (href or url)
-                    )
+    @classmethod
+    def _showrooms_from_rows(cls, rows, url):
+        """Build showroom records from Mini Website rows ({'text', 'href'})"""
+        showrooms = []
+        print(f"Found {len(rows)} potential showroom entries")
 
-                    if text and len(text) > 30:
-                        record = self.parse_showroom_text(text, source_url)
-                        if record:
-                            showrooms.append(record)
-                            if idx <= 3:
-                                # Print first few extracted for visibility
-                                print(f"  Extracted: {record.get('brand_name')} – {record.get('primary_city')} ({record.get('categories')})")
-                except Exception as e:
-                    if idx <= 3:
-                        print(f"  Warning: failed to parse entry #{idx}: {e}")
-                    continue
+        for idx, row in enumerate(rows, 1):
+            try:
+                text = row['text']
+                href = row['href']
+                source_url = (
+                    f"https://www.modemonline.com{href}" if href and href.startswith('/') else (href or url)
+                )
 
-            page.close()
-            print(f"Found {len(showrooms)} designer showrooms on {url}")
-            return showrooms
+                if text and len(text) > 30:
+                    record = cls.parse_showroom_text(text, source_url)
+                    if record:
+                        showrooms.append(record)
+                        if idx <= 3:
+                            # Print first few extracted for visibility
+                            print(f"  Extracted: {record.get('brand_name')} – {record.get('primary_city')} ({record.get('categories')})")
+            except Exception as e:
+                if idx <= 3:
+                    print(f"  Warning: failed to parse entry #{idx}: {e}")
+                continue
 
-        except Exception as e:
-            print(f"Error scraping {url}: {str(e)}")
-            return []
+        print(f"Found {len(showrooms)} designer showrooms on {url}")
+        return showrooms
     
-    def parse_showroom_text(self, text: str, source_url: str):
+    @classmethod
+    def parse_showroom_text(cls, text: str, source_url: str):
         """Parse one showroom record from text content extracted from the DOM"""
         try:
             s = ' '.join(text.split())
@@ -146,8 +142,8 @@ class DesignerShowroomsScraper(BaseScraper):
             sales_end = 'N/A'
             dm = re.search(r'Sales\s+campaign\s+\w+\s+from\s+([A-Z][a-z]+\.?\s+\d{1,2}\s+\d{4})\s+to\s+([A-Z][a-z]+\.?\s+\d{1,2}\s+\d{4})', s)
             if dm:
-                sales_start = self.parse_date(dm.group(1))
-                sales_end = self.parse_date(dm.group(2))
+                sales_start = cls.parse_date(dm.group(1))
+                sales_end = cls.parse_date(dm.group(2))
 
             # City detection
             known_cities = ['Paris','Milan','Milano','London','New York','Florence','Firenze','Tokyo','Shanghai','Berlin','Düsseldorf','Munich','Seoul','Hong Kong','Copenhagen']
@@ -174,7 +170,7 @@ class DesignerShowroomsScraper(BaseScraper):
             address = clean_text(addr_m.group(1))[:200] if addr_m else 'N/A'
 
             # Country / Region
-            country = self.get_country_from_city(primary_city)
+            country = cls.get_country_from_city(primary_city)
             region = REGION_MAPPING.get(country, 'Other')
             if region not in TARGET_REGIONS:
                 return None
@@ -200,20 +196,17 @@ class DesignerShowroomsScraper(BaseScraper):
             print(f"  Warning: parse error: {e}")
             return None
     
-    def parse_date(self, date_str):
+    @staticmethod
+    def parse_date(date_str):
         """Parse date string to YYYY-MM-DD format"""
-        try:
-            date_str = clean_text(date_str)
-            # Remove day name if present
-            date_str = re.sub(r'^[A-Z][a-z]+\.?\s+', '', date_str)
-            
-            dt = datetime.strptime(date_str, '%B %d %Y')
-            return dt.strftime('%Y-%m-%d')
-        except Exception as e:
-            print(f"Could not parse date '{date_str}': {str(e)}")
-            return date_str
+        parsed = date_engine.parse_date(date_str)
+        if parsed:
+            return parsed.isoformat()
+        print(f"Could not parse date '{date_str}'")
+        return date_str
     
-    def get_country_from_city(self, city):
+    @staticmethod
+    def get_country_from_city(city):
         """Map city to country"""
         city_country_map = {
             'Paris': 'France',
@@ -245,20 +238,22 @@ class DesignerShowroomsScraper(BaseScraper):
         
         self.save_to_csv(showrooms, filename)
         print(f"Saved {len(showrooms)} designer showrooms to {filename}")
+
+        # Designer showrooms are leads too; merge them into the warehouse and its export
+        merger = LeadMerger(self.warehouse)
+        counts = merger.upsert([merger.designer_showroom_lead(sr) for sr in showrooms])
+        merger.export()
+        print(f"Leads: {counts['inserted']} new, {counts['updated']} updated in {merger.output_file}")
     
-    def run(self):
+    async def scrape_async(self):
         """Main scraping workflow"""
         print("Starting designer showrooms scraper")
         
-        self.start_browser()
-        all_showrooms = []
-        
-        urls = self.get_urls_to_scrape()
-        
-        for url in urls:
-            showrooms = self.scrape_showroom_page(url)
-            all_showrooms.extend(showrooms)
-            time.sleep(self.delay)
+        # The browser is launched on demand, only for pages HTTP cannot serve
+        try:
+            all_showrooms = await self.crawl()
+        finally:
+            await self.stop_browser()
         
         # Dedupe by brand_name + source_url
         deduped = []
@@ -275,7 +270,8 @@ class DesignerShowroomsScraper(BaseScraper):
 
         print(f"Designer showrooms scraping complete. Total: {len(deduped)}")
 
-        self.stop_browser()
+    def run(self):
+        self.scrape()
 
 
 if __name__ == "__main__":
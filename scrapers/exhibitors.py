@@ -4,17 +4,21 @@ Collect exhibitor brands from each tradeshow's Mini Website.
 """
 import csv
 import re
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
 
 from scrapers.base_scraper import BaseScraper
+from scrapers.extraction import page_mini_website_rows
+from scrapers.readiness import MINI_WEBSITE_LIST, compile_readiness
 from config.settings import REGION_MAPPING, TARGET_REGIONS
 from utils.data_cleaner import clean_text
 
 
 class ExhibitorsScraper(BaseScraper):
+    readiness = MINI_WEBSITE_LIST
+    legacy_wait_ms = 3000
+
     def __init__(self):
         super().__init__()
         self.tradeshows_csv = Path('data/processed/tradeshows.csv')
@@ -40,6 +44,33 @@ class ExhibitorsScraper(BaseScraper):
         print(f"Loaded {len(sites)} tradeshow mini sites")
         return sites
 
+    def load_exhibitor_rows(self, url: str) -> List[Dict[str, str]]:
+        """Open a tradeshow page (following its 'Exhibitors' link if any) and return its Mini Website rows."""
+        with self.pooled_page() as page:
+            self.navigate(page, url, timeout=60000)
+
+            # Handle cookie consent if present
+            self.handle_cookie_consent(page)
+
+            # If there is a link to 'Exhibitors' page internally, click or navigate to it
+            try:
+                link = page.locator('a:has-text("Exhibitors")').first
+                if link and link.count() > 0 and link.is_visible():
+                    href = link.get_attribute('href')
+                    if href and not href.startswith('http'):
+                        href = (url.rstrip('/') + '/' + href.lstrip('/'))
+                    if href:
+                        self.navigate(page, href, timeout=60000, legacy_wait_ms=2000)
+                    else:
+                        link.click()
+                        page.wait_for_load_state('domcontentloaded')
+                        page.wait_for_function(compile_readiness(self.readiness),
+                                               timeout=self.readiness_timeout)
+            except Exception:
+                pass
+
+            return page_mini_website_rows(page)
+
     def scrape_exhibitors_for_site(self, site: Dict[str, str]) -> List[Dict[str, str]]:
         """Try mini site first, then fallback to source_url. Returns list of exhibitor records."""
         event_name = site.get('event_name', '')
@@ -55,58 +86,17 @@ class ExhibitorsScraper(BaseScraper):
             if not url:
                 continue
             print(f"\nScraping exhibitors for: {event_name} -> {url}")
-            page = self.new_page()
             try:
-                page.goto(url, wait_until='networkidle', timeout=60000)
-                
-                # Handle cookie consent if present
-                self.handle_cookie_consent(page)
-                
-                time.sleep(3)
-
-                # If there is a link to 'Exhibitors' page internally, click or navigate to it
-                try:
-                    link = page.locator('a:has-text("Exhibitors")').first
-                    if link and link.count() > 0 and link.is_visible():
-                        href = link.get_attribute('href')
-                        if href and not href.startswith('http'):
-                            href = (url.rstrip('/') + '/' + href.lstrip('/'))
-                        if href:
-                            page.goto(href, wait_until='networkidle', timeout=60000)
-                            time.sleep(2)
-                        else:
-                            link.click()
-                            time.sleep(2)
-                except Exception:
-                    pass
-
-                links = page.locator('a:has-text("Mini Website")').all()
-                print(f"Found {len(links)} potential exhibitor entries on {url}")
-
-                for i, lnk in enumerate(links, 1):
+                rows = self.retrier.call(url, self.load_exhibitor_rows, url)
+                print(f"Found {len(rows)} potential exhibitor entries on {url}")
+
+                # Page is back in the pool; parse the row texts across worker processes
+                parsed = self.parse_pool.map(self.parse_exhibitor_text, [row['text'] for row in rows])
+                for i, (row, rec) in enumerate(zip(rows, parsed), 1):
                     try:
-                        parent = None
-                        try:
-                            tr = lnk.locator('xpath=ancestor::tr[1]')
-                            if tr.count() > 0:
-                                parent = tr
-                        except Exception:
-                            pass
-                        if not parent:
-                            try:
-                                div = lnk.locator('xpath=ancestor::div[contains(@class, "row") or contains(@class, "col")][1]')
-                                if div.count() > 0:
-                                    parent = div
-                            except Exception:
-                                pass
-                        if not parent:
-                            parent = lnk.locator('xpath=..')
-
-                        text = parent.text_content() if parent else ''
-                        href = lnk.get_attribute('href')
+                        href = row['href']
                         exhibitor_url = f"https://www.modemonline.com{href}" if href and href.startswith('/') else (href or url)
 
-                        rec = self.parse_exhibitor_text(text)
                         if not rec:
                             continue
                         # enrich
@@ -125,23 +115,19 @@ class ExhibitorsScraper(BaseScraper):
                             print(f"  Warn: failed entry #{i}: {e}")
                         continue
 
-                page.close()
                 if records:
                     print(f"Extracted {len(records)} exhibitors for {event_name} from {url}")
                     return records
             except Exception as e:
                 print(f"  ERROR scraping tradeshow page {url}: {e}")
-                try:
-                    page.close()
-                except Exception:
-                    pass
                 continue
 
         # No exhibitors found on mini or source pages
         print(f"No exhibitors found on mini or source pages for {event_name}")
         return []
 
-    def parse_exhibitor_text(self, text: str) -> Dict[str, str]:
+    @classmethod
+    def parse_exhibitor_text(cls, text: str) -> Dict[str, str]:
         try:
             s = ' '.join(text.split())
             s = s.replace('’', "'")
@@ -177,7 +163,7 @@ class ExhibitorsScraper(BaseScraper):
             instagram = f"@{insta_m.group(1) or insta_m.group(2)}" if insta_m else ''
 
             # country/region
-            country = self.get_country_from_city(primary_city) if primary_city and primary_city != 'N/A' else ''
+            country = cls.get_country_from_city(primary_city) if primary_city and primary_city != 'N/A' else ''
             region = REGION_MAPPING.get(country, 'Other') if country else 'Other'
 
             return {
@@ -195,10 +181,15 @@ class ExhibitorsScraper(BaseScraper):
 
     def save_exhibitors(self, recs: List[Dict[str,str]]):
         out = Path('data/processed/exhibitors.csv')
-        self.save_to_csv(recs, str(out))
-        print(f"Saved {len(recs)} exhibitors to {out}")
-
-    def get_country_from_city(self, city: str) -> str:
+        # Keep the history of an exhibitors.csv written before the warehouse
+        self.warehouse.import_csv('exhibitors', str(out))
+        counts = self.warehouse.upsert('exhibitors', recs)
+        total = self.warehouse.export_csv('exhibitors', str(out), order_by=('$.source_tradeshow', 'name'))
+        print(f"Upserted {len(recs)} exhibitors ({counts['inserted']} new, {counts['updated']} updated); "
+              f"saved {total} to {out}")
+
+    @staticmethod
+    def get_country_from_city(city: str) -> str:
         map_ = {
             'Paris': 'France', 'Milan': 'Italy', 'London': 'United Kingdom', 'Florence': 'Italy',
             'New York': 'United States', 'Tokyo': 'Japan', 'Shanghai': 'China', 'Berlin': 'Germany',
@@ -217,7 +208,6 @@ class ExhibitorsScraper(BaseScraper):
         for site in sites[:max_sites]:
             recs = self.scrape_exhibitors_for_site(site)
             all_recs.extend(recs)
-            time.sleep(self.delay)
 
         # Dedupe by (company_name, website or email)
         seen = set()
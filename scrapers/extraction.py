@@ -0,0 +1,261 @@
+"""
+Row extraction shared by the browser and HTTP fetch paths.
+
+modemonline listing pages render one entry per "Mini Website" link; an entry's text
+is the nearest enclosing table row, else the nearest div with a "row"/"col" class,
+else the link's parent. Extractors return [{'text': ..., 'href': ...}] so scrapers
+parse rows the same way whichever path fetched the page.
+
+In the browser the rows are collected by one page.evaluate() call instead of a
+locator round trip per link and per attribute.
+
+Multilabel showroom pages pair a name + "Mini Website" link with the next <table>;
+showroom_blocks() walks them in one lxml pass over the page skeleton, with table
+bodies cut out first (with a regex fallback when lxml is not installed).
+"""
+import re
+from html import unescape
+from typing import Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, Tag
+
+from scrapers.http_fetch import parse_html
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+MINI_WEBSITE_TEXT = 'Mini Website'
+
+# Same container rule as _row_container(), run in the page
+MINI_WEBSITE_ROWS_SCRIPT = """
+(linkText) => {
+    const container = (a) => {
+        const tr = a.closest('tr');
+        if (tr) return tr;
+        for (let el = a.parentElement; el; el = el.parentElement) {
+            if (el.tagName === 'DIV' && /row|col/.test(el.getAttribute('class') || '')) return el;
+        }
+        return a.parentElement;
+    };
+    const rows = [];
+    for (const a of document.querySelectorAll('a')) {
+        if (!(a.textContent || '').includes(linkText)) continue;
+        const c = container(a);
+        rows.push({text: c ? c.textContent : '', href: a.getAttribute('href') || ''});
+    }
+    return rows;
+}
+"""
+
+# {'text', 'href', 'parent_text'} for every link matching a CSS selector
+LINKS_SCRIPT = """
+(selector) => Array.from(document.querySelectorAll(selector), (a) => ({
+    text: (a.innerText || '').trim(),
+    href: a.getAttribute('href') || '',
+    parent_text: a.parentElement ? a.parentElement.innerText : '',
+}))
+"""
+
+
+def _row_container(link: Tag) -> Optional[Tag]:
+    tr = link.find_parent('tr')
+    if tr is not None:
+        return tr
+    for div in link.find_parents('div'):
+        classes = ' '.join(div.get('class') or [])
+        if 'row' in classes or 'col' in classes:
+            return div
+    return link.parent
+
+
+def mini_website_rows(html: Union[str, BeautifulSoup]) -> List[Dict[str, str]]:
+    """Return {'text', 'href'} for each "Mini Website" link in a listing page."""
+    soup = parse_html(html) if isinstance(html, str) else html
+    rows = []
+    for link in soup.find_all('a'):
+        if MINI_WEBSITE_TEXT not in link.get_text():
+            continue
+        container = _row_container(link)
+        rows.append({
+            'text': container.get_text() if container is not None else '',
+            'href': link.get('href') or '',
+        })
+    return rows
+
+
+def page_mini_website_rows(page) -> List[Dict[str, str]]:
+    """mini_website_rows() for a loaded Playwright page, in one evaluation."""
+    return page.evaluate(MINI_WEBSITE_ROWS_SCRIPT, MINI_WEBSITE_TEXT)
+
+
+async def page_mini_website_rows_async(page) -> List[Dict[str, str]]:
+    return await page.evaluate(MINI_WEBSITE_ROWS_SCRIPT, MINI_WEBSITE_TEXT)
+
+
+def page_links(page, selector: str = 'a') -> List[Dict[str, str]]:
+    """{'text', 'href', 'parent_text'} for each link matching selector, in one evaluation."""
+    return page.evaluate(LINKS_SCRIPT, selector)
+
+
+async def page_links_async(page, selector: str = 'a') -> List[Dict[str, str]]:
+    return await page.evaluate(LINKS_SCRIPT, selector)
+
+
+# Showroom blocks: <span>Name</span> <a>* Mini Website</a> ... <table>details</table>
+_SHOWROOM_SPAN_RE = re.compile(
+    r"<span[^>]*>([A-Za-z0-9\s&'\-\.]+?)</span>\s*<a[^>]*>[\*\s]*Mini Website</a>.*?<table[^>]*>(.*?)</table>",
+    re.IGNORECASE | re.DOTALL)
+# Fallback when names are not wrapped in a span
+_SHOWROOM_TEXT_RE = re.compile(
+    r"([A-Z][A-Za-z0-9 &'\-\.]{3,120})\s*<a[^>]*>[\*\s]*Mini Website</a>.*?<table[^>]*>(.*?)</table>",
+    re.IGNORECASE | re.DOTALL)
+_SPAN_NAME_RE = re.compile(r"^[A-Za-z0-9\s&'\-\.]+$")
+_TEXT_NAME_RE = re.compile(r"([A-Z][A-Za-z0-9 &'\-\.]{3,120})\s*$", re.IGNORECASE)
+_LINK_TEXT_RE = re.compile(r'^[\*\s]*Mini Website$', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+_HREF_RE = re.compile(r'href\s*=\s*["\']([^"\']+)', re.IGNORECASE)
+
+
+def showroom_blocks_regex(html: str) -> List[Dict[str, object]]:
+    """Regex version of showroom_blocks() (backtracks heavily on large pages).
+
+    table_text is the tag-stripped table HTML, so entities stay encoded.
+    """
+    matches = list(_SHOWROOM_SPAN_RE.finditer(html)) or list(_SHOWROOM_TEXT_RE.finditer(html))
+    return [{
+        'name': m.group(1),
+        'table_html': m.group(2),
+        'table_text': ' '.join(_TAG_RE.sub(' ', m.group(2)).split()),
+        'links': _HREF_RE.findall(m.group(2)),
+    } for m in matches]
+
+
+def _span_name(link) -> Optional[str]:
+    prev = link.getprevious()
+    if prev is None or prev.tag != 'span' or len(prev) or (prev.tail or '').strip():
+        return None
+    text = prev.text or ''
+    return text if text and _SPAN_NAME_RE.match(text) else None
+
+
+def _text_name(link) -> Optional[str]:
+    prev = link.getprevious()
+    before = (prev.tail if prev is not None else link.getparent().text) or ''
+    m = _TEXT_NAME_RE.search(before)
+    return m.group(1) if m else None
+
+
+# A table body holding one of these stays in the tree (the walk has to see it): a
+# script or comment (whose text may hide "</table"), a showroom link
+_CUT_UNSAFE = ('script', '<!--', MINI_WEBSITE_TEXT.lower())
+_CUT_TAG = 'showroom-table'
+_HREF_VALUE_RE = re.compile(r"""href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_TEXT_RUN_RE = re.compile(r'>([^<]+)')
+
+
+def _cut_tables(html: str) -> Tuple[str, List[str]]:
+    """The part of a page showroom_blocks() has to parse, with table bodies cut out.
+
+    Runs from just before the first "Mini Website" link (two tags back, so its name
+    comes along) to the last </table> ('' when no table follows a link). Each plain
+    <table> becomes an empty <showroom-table> element; the verbatim bodies are
+    returned in document order. Nav, scripts and table rows are most of a multilabel
+    page's nodes, so the skeleton parses in a fraction of the time. Nested tables,
+    tables holding an _CUT_UNSAFE marker and tables with an upper-case href (links
+    are read case-sensitively) stay as they are. Linear: str.find only.
+    """
+    lower = html.lower()
+    link = lower.find(_CUT_UNSAFE[-1])
+    last = lower.rfind('</table')
+    if link < 0 or last < link:
+        return '', []
+    start = lower.rfind('<', 0, lower.rfind('<', 0, lower.rfind('<a', 0, link)))
+    # Starting inside a script or comment would turn its text into elements
+    if (start < 0 or lower.rfind('<script', 0, start) > lower.rfind('</script', 0, start)
+            or lower.rfind('<!--', 0, start) > lower.rfind('-->', 0, start)):
+        start = 0
+    end = lower.find('>', last) + 1 or len(html)
+    script, comment, link_text = _CUT_UNSAFE
+    placeholder = f'<{_CUT_TAG}></{_CUT_TAG}>'
+    parts, bodies = [], []
+    copied = start
+    table = lower.find('<table', start, end)
+    while table >= 0:
+        body = lower.find('>', table, end) + 1
+        close = lower.find('</table', body, end)
+        if not body or close < 0:
+            break
+        following = lower.find('<table', body, end)
+        if 0 <= following < close:
+            return html[start:end], []  # nested tables: leave the whole region to the tree
+        lowered = lower[body:close]
+        if (lower[table + 6] in '> \t\r\n' and script not in lowered and comment not in lowered
+                and link_text not in lowered):
+            text = html[body:close]
+            if lowered.count('href') == text.count('href'):
+                parts += (html[copied:table], placeholder)
+                bodies.append(text)
+                copied = lower.find('>', close, end) + 1 or end
+        table = following
+    parts.append(html[copied:end])
+    return ''.join(parts), bodies
+
+
+def _showroom_blocks_tree(root, name_of, bodies: List[str]) -> List[Dict[str, object]]:
+    blocks = []
+    pending = None  # name of a showroom link still waiting for its table
+    done = set()  # tables already assigned; links inside them are part of the details
+    cut = 0  # bodies index of the next <showroom-table>
+    for el in root.iter('a', 'table', _CUT_TAG):
+        tag = el.tag
+        if tag == _CUT_TAG:
+            cut += 1
+            if pending is None:
+                continue
+            table_html = bodies[cut - 1]
+            text = ' '.join(_TEXT_RUN_RE.findall('>' + table_html))
+            blocks.append({
+                'name': pending,
+                'table_html': table_html,
+                'table_text': ' '.join((unescape(text) if '&' in text else text).split()),
+                'links': [unescape(href) for href in map(''.join, _HREF_VALUE_RE.findall(table_html)) if href],
+            })
+            pending = None
+        elif tag == 'table':
+            if pending is None:
+                continue
+            outer = etree.tostring(el, encoding='unicode', with_tail=False)
+            blocks.append({
+                'name': pending,
+                'table_html': outer[outer.find('>') + 1:outer.rfind('</table>')],
+                'table_text': ' '.join(' '.join(el.itertext()).split()),
+                'links': [a.get('href') for a in el.iter('a') if a.get('href')],
+            })
+            done.add(el)
+            pending = None
+        elif pending is None and not len(el) and _LINK_TEXT_RE.match(el.text or ''):
+            if done and any(t in done for t in el.iterancestors('table')):
+                continue
+            pending = name_of(el)
+    return blocks
+
+
+def showroom_blocks(html: str) -> List[Dict[str, object]]:
+    """Return {'name', 'table_html', 'table_text', 'links'} per showroom on a multilabel page.
+
+    Each "Mini Website" link preceded by a <span> name is paired with the first
+    <table> after it; if no span-named link exists, the text right before the link
+    is the name. Same records as showroom_blocks_regex() in a single tree walk,
+    except that entities in table_text and links are decoded. Only the showroom part
+    of the page, with table bodies cut out (see _cut_tables()), becomes a tree.
+    """
+    if etree is None:
+        return showroom_blocks_regex(html)
+    skeleton, bodies = _cut_tables(html)
+    root = etree.HTML(skeleton) if skeleton.strip() else None
+    if root is None:
+        return []
+    return (_showroom_blocks_tree(root, _span_name, bodies)
+            or _showroom_blocks_tree(root, _text_name, bodies))
@@ -0,0 +1,131 @@
+"""
+Multi-process browser farm for async scrapers.
+
+One Python process drives one Chromium, so a crawl is limited to about one core.
+With `workers` > 1, AsyncBaseScraper.crawl() hands the crawl to a BrowserFarm:
+the parent enqueues the list pages in the scraper's frontier (scrapers/frontier.py)
+and starts N worker processes. Each worker builds its own instance of the scraper,
+with its own browser, page pool and HTTP session, and leases URLs from that shared
+frontier until it is empty. Detail pages found by a worker go back into the
+frontier, so any worker may pick them up. Results are stored in the frontier as
+pages complete. The parent reads them back in enqueue order and the scraper saves
+them as usual, so only one process writes the output files.
+
+Hosts see one request budget: each worker keeps 1/N of every host's rate limit
+and of PER_HOST_CONCURRENCY. Throughput therefore grows with the number of cores
+until the hosts' limits are reached. A worker that dies has its leases handed back
+and is replaced, up to N times per crawl.
+
+    python main.py --sections tradeshows,designer_showrooms --workers 4
+"""
+import asyncio
+import multiprocessing
+import queue
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.rate_limiter import shared_limiter
+
+
+def _run_worker(scraper_class, options: Dict[str, Any], index: int, reports):
+    """Entry point of one worker process (module level so 'spawn' can pickle it)."""
+    # Must happen before the scraper takes the process-wide limiter
+    shared_limiter().share(options['workers'])
+    scraper = scraper_class(headless=options['headless'])
+    scraper.fetch_mode = options['fetch_mode']
+    scraper.offline = options['offline']
+    start = time.monotonic()
+    pages = asyncio.run(scraper.work_farm(options['workers']))
+    reports.put({'worker': index, 'pages': pages, 'seconds': time.monotonic() - start,
+                 'fetch_stats': dict(scraper.fetch_stats)})
+
+
+class BrowserFarm:
+    """Runs one scraper's crawl on several worker processes sharing its frontier.
+
+    Args:
+        scraper: the (parent) AsyncBaseScraper whose class, options and frontier are used
+        workers: worker processes, defaults to scraper.workers
+        poll: seconds between checks on the workers
+    """
+
+    def __init__(self, scraper, workers: Optional[int] = None, poll: float = 0.5):
+        self.scraper = scraper
+        self.workers = max(1, workers or scraper.workers)
+        self.poll = poll
+        self.options = {'workers': self.workers, 'headless': scraper.headless,
+                        'fetch_mode': scraper.fetch_mode, 'offline': scraper.offline}
+        # 'spawn' everywhere: forking would copy the parent's SQLite connections and threads
+        self._mp = multiprocessing.get_context('spawn')
+
+    def crawl(self, list_urls: List[str]) -> List[Dict[str, Any]]:
+        """Crawl list_urls (and their detail pages) on the workers; returns the scraper's crawl() result."""
+        name = type(self.scraper).__name__
+        frontier = self.scraper.frontier
+        if frontier.begin():
+            print(f"[INFO] {name}: resuming crawl, {frontier.remaining()} URLs left")
+        frontier.enqueue_many(list_urls, kind='list', priority=0, depth=0)
+        print(f"[INFO] {name}: crawling {frontier.remaining()} URLs on {self.workers} worker processes")
+        start = time.monotonic()
+        reports = self._run(frontier)
+        elapsed = time.monotonic() - start
+        for report in reports:
+            self.scraper.fetch_stats.update(report['fetch_stats'])
+        pages = sum(report['pages'] for report in reports)
+        print(f"[INFO] {name}: {pages} pages in {elapsed:.1f}s ({pages / elapsed if elapsed else 0:.1f} pages/s) - "
+              + ', '.join(f"worker {r['worker']}: {r['pages']}" for r in sorted(reports, key=lambda r: r['worker'])))
+        if frontier.remaining():
+            # Left running so the next crawl resumes with what is left
+            print(f"[WARN] {name}: {frontier.remaining()} URLs not crawled; the next run resumes them")
+        else:
+            frontier.finish()
+        return self.scraper.frontier_results(frontier)
+
+    def _start(self, index: int, reports):
+        process = self._mp.Process(target=_run_worker, args=(type(self.scraper), self.options, index, reports),
+                                   name=f'{type(self.scraper).__name__}-worker-{index}')
+        process.start()
+        return process
+
+    def _run(self, frontier) -> List[Dict[str, Any]]:
+        reports = self._mp.Queue()
+        collected: List[Dict[str, Any]] = []
+        processes = {index: self._start(index, reports) for index in range(self.workers)}
+        restarts = 0
+        expected = 0
+        try:
+            while processes:
+                for index, process in list(processes.items()):
+                    process.join(self.poll / len(processes))
+                    if process.is_alive():
+                        continue
+                    del processes[index]
+                    if process.exitcode == 0:
+                        expected += 1
+                        continue
+                    print(f"[WARN] {process.name} exited with code {process.exitcode}")
+                    # Its leases go back to the queue now instead of after FRONTIER_LEASE_SECONDS
+                    frontier.reclaim_dead_leases()
+                    if frontier.remaining() and restarts < self.workers:
+                        restarts += 1
+                        processes[index] = self._start(index, reports)
+                collected.extend(self._drain(reports))
+        finally:
+            for process in processes.values():
+                process.terminate()
+        # Reports of workers that exited last may still be in the pipe
+        while len(collected) < expected:
+            try:
+                collected.append(reports.get(timeout=5))
+            except queue.Empty:
+                break
+        return collected
+
+    @staticmethod
+    def _drain(reports) -> List[Dict[str, Any]]:
+        drained = []
+        while True:
+            try:
+                drained.append(reports.get_nowait())
+            except queue.Empty:
+                return drained
@@ -5,7 +5,9 @@ Since modemonline.com has no Asia showroom data, we'll expand Europe coverage
 by checking digital brand profiles/presentations
 """
 from scrapers.base_scraper import BaseScraper
-import time
+from scrapers.extraction import page_links
+from utils.retry import is_transient
+from utils.warehouse import fill_missing
 import csv
 from pathlib import Path
 import hashlib
@@ -15,6 +17,12 @@ from datetime import datetime
 class FashionWeekBrandsScraper(BaseScraper):
     """Extract brands from fashion week digital/presentations pages"""
     
+    # Digital pages: ready once designer links have rendered
+    readiness = ('any',
+                 ('all', ('selector', 'a[href*="/digital/designers/"]'), ('dom_stable', 300)),
+                 ('dom_stable', 2000))
+    legacy_wait_ms = 3000
+    
     def scrape_fashion_week_brands(self):
         """Scrape brands from fashion week digital presentation pages"""
         print("="*80)
@@ -38,9 +46,12 @@ class FashionWeekBrandsScraper(BaseScraper):
         for fw_path in fashion_weeks:
             # Try digital presentations page
             url = f"https://www.modemonline.com/fashion/fashion-weeks/{fw_path}/digital"
-            brands = self.scrape_digital_page(url, fw_path)
+            try:
+                brands = self.retrier.call(url, self.scrape_digital_page, url, fw_path)
+            except Exception as e:
+                print(f"  Giving up on {url}: {e}")
+                brands = []
             all_brands.extend(brands)
-            time.sleep(3)  # Rate limit
         
         # Deduplicate
         unique_brands = self.deduplicate_brands(all_brands)
@@ -57,19 +68,18 @@ class FashionWeekBrandsScraper(BaseScraper):
         
         try:
             page = self.new_page()
-            page.goto(url, wait_until='networkidle', timeout=60000)
+            self.navigate(page, url, timeout=60000)
             self.handle_cookie_consent(page)
-            time.sleep(3)
             
             # Look for brand/designer links
             # Pattern 1: Links to brand detail pages
-            brand_links = page.locator('a[href*="/digital/designers/"]').all()
+            brand_links = page_links(page, 'a[href*="/digital/designers/"]')
             print(f"  Found {len(brand_links)} designer links")
             
             for link in brand_links[:50]:  # Limit to first 50
                 try:
-                    href = link.get_attribute('href')
-                    brand_name = link.inner_text().strip()
+                    href = link['href']
+                    brand_name = link['text']
                     
                     if brand_name and len(brand_name) > 1:
                         # Extract city/country from fw_path
@@ -101,6 +111,8 @@ class FashionWeekBrandsScraper(BaseScraper):
             page.close()
             
         except Exception as e:
+            if is_transient(e):
+                raise  # retried with backoff by the caller
             print(f"  Error scraping {url}: {e}")
         
         print(f"  Extracted {len(brands)} brands")
@@ -139,6 +151,8 @@ class FashionWeekBrandsScraper(BaseScraper):
             writer.writerows(brands)
         
         print(f"\n[OK] Saved {len(brands)} brands to {output_path}")
+        counts = self.warehouse.upsert('brands', brands, merge=fill_missing)
+        print(f"[OK] Warehouse brands: {counts['inserted']} new, {counts['updated']} updated")
     
     def run(self):
         """Main execution"""
@@ -1,21 +1,33 @@
 from typing import List, Dict, Any
 import re
-from datetime import datetime
-from .base_scraper import BaseScraper
+import zlib
+from .async_base_scraper import AsyncBaseScraper
 from config import settings
 from utils.incremental import IncrementalStore
 from utils.logger import setup_logger
+from utils.date_engine import find_date_range, iso_range
+from scrapers.readiness import DOM_SETTLED
+from scrapers.extraction import page_links_async
 
 logger = setup_logger('fashion_weeks')
 
 
-class FashionWeeksScraper(BaseScraper):
+class FashionWeeksScraper(AsyncBaseScraper):
     """Starter scraper for fashion weeks listing.
 
     This is a scaffold that navigates to the fashion weeks index and extracts event links.
     Concrete selectors should be refined after inspecting ModeMonline pages.
     """
 
+    follow_detail_pages = True
+    # Event pages are parsed from text only
+    block_resource_types = ('stylesheet',)
+    # Index page: ready once season event links have rendered
+    readiness = ('any',
+                 ('all', ('selector', 'a[href*="/fashion/fashion-weeks/spring-summer-"]'), ('dom_stable', 300)),
+                 ('dom_stable', 2000))
+    legacy_wait_ms = 2000
+
     def __init__(self, headless=True):
         super().__init__(headless=headless)
         self.base_path = '/fashion/fashion-weeks/'
@@ -24,24 +36,31 @@ class FashionWeeksScraper(BaseScraper):
     def get_list_page_urls(self) -> List[str]:
         return [settings.BASE_URL + self.base_path]
 
-    def scrape_list_page(self, page, url: str) -> List[Dict[str, Any]]:
+    def cache_ttl(self, url: str):
+        # The index lists newly announced weeks; keep it for an hour only
+        if url.rstrip('/').endswith(self.base_path.rstrip('/')):
+            return 3600
+        return super().cache_ttl(url)
+
+    async def scrape_list_page(self, page, url: str) -> List[Dict[str, Any]]:
         logger.info(f'Visiting list page: {url}')
-        page.goto(url, timeout=settings.TIMEOUT * 1000)
+        await self.navigate(page, url)
         
         # Handle cookie consent if present
-        self.handle_cookie_consent(page)
-        
-        page.wait_for_timeout(2000)
+        await self.handle_cookie_consent(page)
         
         # Extract event links with date context from the index page using DOM traversal
         # Dates appear as text nodes before the anchor: "June 20-24[Event Link]"
-        anchors = page.query_selector_all('a[href*="/fashion/fashion-weeks/spring-summer-"]')
+        anchors = await page_links_async(page, 'a[href*="/fashion/fashion-weeks/spring-summer-"]')
         links = []
         seen = set()
+        # One lookup for every candidate instead of one per link
+        already_scraped = self.incremental.has_many(
+            settings.BASE_URL + a['href'] if a['href'].startswith('/') else a['href'] for a in anchors if a['href'])
         
         for a in anchors:
             try:
-                href = a.get_attribute('href')
+                href = a['href']
                 if not href or '/spring-summer-' not in href:
                     continue
                 
@@ -56,23 +75,22 @@ class FashionWeeksScraper(BaseScraper):
                 # Filter: skip already seen URLs
                 if full in seen:
                     continue
+                if full in already_scraped:
+                    logger.debug(f'Skipping already scraped url: {full}')
+                    continue
                 
                 # Only include links that look like detail pages (have city after season)
                 parts = href.split('/')
                 if len(parts) >= 6:  # e.g., /fashion/fashion-weeks/spring-summer-2026/milan/men
-                    event_name = a.inner_text().strip() if a else ''
+                    event_name = a['text']
                     
-                    # Extract date from preceding text using JavaScript to get parent's text content
+                    # Extract date from the parent's text (collected with the link)
                     # The pattern is: parent contains "Date [Anchor]", we want the date part
                     date_hint = ''
-                    try:
-                        parent_text = a.evaluate('(el) => { let p = el.parentElement; return p ? p.innerText : ""; }')
-                        # Look for date pattern: "Month DD-DD" before the event name
-                        date_match = re.search(r'([A-Z][a-z]{2,8})\s+(\d{1,2})-(\d{1,2})', parent_text)
-                        if date_match:
-                            date_hint = f"{date_match.group(1)} {date_match.group(2)}-{date_match.group(3)}"
-                    except Exception as e:
-                        logger.debug(f'Could not extract date for {event_name}: {e}')
+                    # Look for date pattern: "Month DD-DD" before the event name
+                    date_match = re.search(r'([A-Z][a-z]{2,8})\s+(\d{1,2})-(\d{1,2})', a['parent_text'])
+                    if date_match:
+                        date_hint = f"{date_match.group(1)} {date_match.group(2)}-{date_match.group(3)}"
                     
                     seen.add(full)
                     links.append({'url': full, 'event_name_hint': event_name, 'dates_hint': date_hint})
@@ -83,16 +101,18 @@ class FashionWeeksScraper(BaseScraper):
         logger.info(f'Found {len(links)} event links')
         return links
 
-    def scrape_detail_page(self, page, url: str, event_hint: str = '', dates_hint: str = '') -> Dict[str, Any]:
+    async def scrape_detail_page(self, page, item: Dict[str, Any]) -> Dict[str, Any]:
+        url = item['url']
+        # Hints from the list page
+        event_hint = item.get('event_name_hint', '')
+        dates_hint = item.get('dates_hint', '')
         logger.info(f'Visiting detail page: {url}')
-        page.goto(url, timeout=settings.TIMEOUT * 1000)
+        await self.navigate(page, url, readiness=DOM_SETTLED, legacy_wait_ms=1500)
         
         # Handle cookie consent if present
-        self.handle_cookie_consent(page)
+        await self.handle_cookie_consent(page)
         
-        page.wait_for_timeout(1500)
-        
-        body_text = page.inner_text('body') if page.query_selector('body') else ''
+        body_text = await page.inner_text('body') if await page.query_selector('body') else ''
         
         # --- Event Name ---
         event_name = self._extract_event_name(body_text, event_hint, url)
@@ -111,8 +131,8 @@ class FashionWeeksScraper(BaseScraper):
         # These are often not clearly structured. We use regex on the body text.
         venue = self._extract_text_by_pattern(body_text, r'Venue\s*:\s*([^\n]+)')
         organizer = self._extract_text_by_pattern(body_text, r'Organizer\s*:\s*([^\n]+)')
-        element = page.query_selector('a[href*="www."][target="_blank"]')
-        website = element.get_attribute('href') if element else 'N/A'
+        element = await page.query_selector('a[href*="www."][target="_blank"]')
+        website = await element.get_attribute('href') if element else 'N/A'
         
         # --- Categories ---
         # Categories from URL path (e.g., /men/ or /women/)
@@ -171,8 +191,8 @@ class FashionWeeksScraper(BaseScraper):
         city = raw_data.get('city', 'N/A')
         season = raw_data.get('season', 'N/A')
         
-        # Generate unique ID
-        event_id = f"FW-{season}-{city.replace(' ', '')}-{hash(event_name) % 10000}"
+        # Generate unique ID (crc32, unlike hash(), is the same in every run)
+        event_id = f"FW-{season}-{city.replace(' ', '')}-{zlib.crc32(event_name.encode('utf-8')) % 10000}"
         
         # Parse dates
         start_date, end_date = self._parse_date_range(raw_data.get('dates_str', ''), season)
@@ -208,56 +228,45 @@ class FashionWeeksScraper(BaseScraper):
         if not year_match: return 'N/A', 'N/A'
         year = f"20{year_match.group(0)}"
         
-        # Pattern: "Month Day-Day" (e.g., "June 20-24")
-        match = re.match(r'([A-Z][a-z]+)\s+(\d{1,2})-(\d{1,2})', date_str)
-        if match:
-            month, start_day, end_day = match.groups()
-            try:
-                start_dt = datetime.strptime(f'{year} {month} {start_day}', '%Y %B %d')
-                end_dt = datetime.strptime(f'{year} {month} {end_day}', '%Y %B %d')
-                return start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d')
-            except ValueError:
-                return 'N/A', 'N/A'
-        return 'N/A', 'N/A'
+        # e.g. "June 20-24"; the season supplies the year
+        start, end = iso_range(find_date_range(date_str, default_year=int(year)))
+        if start is None:
+            return 'N/A', 'N/A'
+        return start, end
 
 
-    def scrape(self):
+    async def scrape_async(self):
         results = []
+        # The browser is launched on demand (in the farm workers with --workers N)
         try:
-            self.start_browser()
-            page = self.new_page()
-            for list_url in self.get_list_page_urls():
-                items = self.scrape_list_page(page, list_url)
-                for item in items:
-                    url = item.get('url')
-                    if not url:
-                        continue
-                    if self.incremental.has(url):
-                        logger.debug(f'Skipping already scraped url: {url}')
-                        continue
-                    try:
-                        # Pass hints from list page to detail page scraper
-                        event_hint = item.get('event_name_hint', '')
-                        dates_hint = item.get('dates_hint', '')
-                        detail = self.scrape_detail_page(page, url, event_hint, dates_hint)
-                        parsed = self.parse_data(detail)
-                        
-                        # Apply geographic filtering: only Asia and Europe
-                        if parsed.get('region') in ['Asia', 'Europe']:
-                            results.append(parsed)
-                            logger.info(f"Added: {parsed.get('event_name')} ({parsed.get('city')}, {parsed.get('country')})")
-                        else:
-                            logger.info(f"Skipped (not Asia/Europe): {parsed.get('event_name')} ({parsed.get('country')})")
-                        
-                        self.incremental.add(url)
-                    except Exception as e:
-                        logger.error(f'Failed to scrape detail {url}: {e}')
-            
-            # Save results
-            if results:
-                self.save_to_csv(results, 'data/processed/events_calendar.csv', mode='a')
-                logger.info(f'Saved {len(results)} events to CSV')
-            else:
-                logger.warning('No events matched filters')
+            details = await self.crawl()
         finally:
-            self.stop_browser()
+            await self.stop_browser()
+
+        for detail in details:
+            try:
+                parsed = self.parse_data(detail)
+                
+                # Apply geographic filtering: only Asia and Europe
+                if parsed.get('region') in ['Asia', 'Europe']:
+                    results.append(parsed)
+                    logger.info(f"Added: {parsed.get('event_name')} ({parsed.get('city')}, {parsed.get('country')})")
+                else:
+                    logger.info(f"Skipped (not Asia/Europe): {parsed.get('event_name')} ({parsed.get('country')})")
+                
+                self.incremental.add(detail['source_url'])
+            except Exception as e:
+                logger.error(f"Failed to parse detail {detail.get('source_url')}: {e}")
+        self.incremental.flush()
+        
+        # Save results
+        if results:
+            # events_calendar.csv used to be appended to; keep its history on the first run
+            self.warehouse.import_csv('events', 'data/processed/events_calendar.csv')
+            counts = self.warehouse.upsert('events', results)
+            total = self.warehouse.export_csv('events', 'data/processed/events_calendar.csv',
+                                              order_by=('$.start_date', 'city'))
+            logger.info(f"Upserted {len(results)} events ({counts['inserted']} new, {counts['updated']} updated); "
+                        f'{total} in events_calendar.csv')
+        else:
+            logger.warning('No events matched filters')
@@ -0,0 +1,285 @@
+"""
+Persistent crawl frontier.
+
+Each scraper gets an SQLite queue (WAL) under settings.FRONTIER_DIR. A row holds
+a canonical URL, its priority, its depth, its kind ('list' or 'detail'), the
+payload needed to process it, its state (pending / leased / done / failed) and
+its attempt count. Workers lease the best pending URL. They ack it with its
+result, which is stored with the row, or nack it to retry up to max_attempts.
+Leases expire, and leases held by processes that no longer run are taken back
+at startup, so a crawl killed with kill -9 resumes where it stopped. A finished
+crawl is marked complete, and the next crawl() starts from an empty frontier.
+
+Usage:
+    python -m scrapers.frontier stats [TradeshowsScraper]
+    python -m scrapers.frontier reset TradeshowsScraper
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import settings
+from scrapers.page_cache import normalize_url
+
+# Query parameters that never change the page
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', '_ga', 'sessionid', 'phpsessid')
+
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+
+def canonicalize_url(url: str) -> str:
+    """normalize_url() plus: tracking parameters dropped, no trailing slash except on '/'."""
+    parts = urlsplit(normalize_url(url))
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith(TRACKING_PARAMS)])
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme, parts.netloc, path, query, ''))
+
+
+class FrontierItem:
+    """One leased URL (as enqueued; the frontier keys it by its canonical form)."""
+
+    def __init__(self, url: str, kind: str, priority: int, depth: int, payload: Any, attempts: int):
+        self.url = url
+        self.kind = kind
+        self.priority = priority
+        self.depth = depth
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f'FrontierItem({self.kind} {self.url}, attempt {self.attempts})'
+
+
+class Frontier:
+    """Disk-backed priority queue of URLs with dedupe, leases and retry counts.
+
+    Args:
+        name: queue name (one per scraper), stored as <FRONTIER_DIR>/<name>.sqlite3
+        root: directory, defaults to settings.FRONTIER_DIR
+        max_attempts: leases per URL before it is marked failed
+        lease_seconds: how long a leased URL stays with its worker before it is handed out again
+    """
+
+    def __init__(self, name: str, root: Optional[str] = None, max_attempts: Optional[int] = None,
+                 lease_seconds: Optional[float] = None):
+        self.root = Path(root or getattr(settings, 'FRONTIER_DIR', 'data/raw/frontier'))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.max_attempts = max_attempts or getattr(settings, 'FRONTIER_MAX_ATTEMPTS', 3)
+        self.lease_seconds = lease_seconds or getattr(settings, 'FRONTIER_LEASE_SECONDS', 600)
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / f'{name}.sqlite3'), timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS frontier ('
+            ' url TEXT PRIMARY KEY, fetch_url TEXT NOT NULL, kind TEXT NOT NULL, priority INTEGER NOT NULL, depth INTEGER NOT NULL,'
+            ' seq INTEGER NOT NULL, payload TEXT, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,'
+            ' owner TEXT, lease_until REAL, result TEXT, error TEXT, updated_at REAL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS frontier_next ON frontier (state, priority DESC, seq)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.reclaim_dead_leases()
+
+    def _transaction(self, fn, *args):
+        # IMMEDIATE takes the write lock up front so concurrent workers queue on the busy timeout
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(*args)
+                self._db.execute('COMMIT')
+                return result
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+    # ----------------
+    # Crawl lifecycle
+    # ----------------
+    def _meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', (key, value))
+
+    def begin(self) -> bool:
+        """Start a crawl: resume an unfinished one, or clear a completed one. True when resuming."""
+        resuming = self._meta('status') == 'running' and self.counts().get(DONE, 0) + self.remaining() > 0
+        if not resuming:
+            self.clear()
+        self._set_meta('status', 'running')
+        return resuming
+
+    def finish(self):
+        """Mark the crawl complete; results stay readable until the next begin()."""
+        self._set_meta('status', 'complete')
+
+    def reclaim_dead_leases(self):
+        """Hand back leases held by processes on this host that are gone (e.g. killed with -9)."""
+        host = socket.gethostname()
+        with self._lock:
+            owners = [row[0] for row in self._db.execute(
+                'SELECT DISTINCT owner FROM frontier WHERE state = ?', (LEASED,))]
+        dead = [owner for owner in owners if owner and owner.rsplit(':', 1)[0] == host
+                and owner != self.owner and not _pid_alive(int(owner.rsplit(':', 1)[1]))]
+        if dead:
+            marks = ','.join('?' * len(dead))
+            self._transaction(lambda: self._db.execute(
+                f'UPDATE frontier SET state = ?, owner = NULL, lease_until = NULL'
+                f' WHERE state = ? AND owner IN ({marks})', (PENDING, LEASED, *dead)))
+
+    # ----------------
+    # Queue operations
+    # ----------------
+    def enqueue(self, url: str, kind: str = 'list', priority: int = 0, depth: int = 0, payload: Any = None) -> bool:
+        """Add url unless its canonical form is already known. True if it was added."""
+        return self.enqueue_many([url], kind=kind, priority=priority, depth=depth,
+                                 payloads=[payload]) == 1
+
+    def enqueue_many(self, urls: Iterable[str], kind: str = 'list', priority: int = 0, depth: int = 0,
+                     payloads: Optional[Iterable[Any]] = None) -> int:
+        """Add URLs (in order) that are not known yet; returns how many were added."""
+        urls = list(urls)
+        payloads = list(payloads) if payloads is not None else [None] * len(urls)
+
+        def insert():
+            added = 0
+            now = time.time()
+            seq = self._db.execute('SELECT COALESCE(MAX(seq), 0) FROM frontier').fetchone()[0]
+            for url, payload in zip(urls, payloads):
+                seq += 1
+                cursor = self._db.execute(
+                    'INSERT OR IGNORE INTO frontier'
+                    ' (url, fetch_url, kind, priority, depth, seq, payload, state, updated_at)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (canonicalize_url(url), url, kind, priority, depth, seq,
+                     json.dumps(payload, default=str) if payload is not None else None, PENDING, now))
+                added += cursor.rowcount
+            return added
+
+        return self._transaction(insert)
+
+    def lease(self, n: int = 1) -> List[FrontierItem]:
+        """Take up to n URLs: highest priority first, then in enqueue order. Expired leases count as pending."""
+        def take():
+            now = time.time()
+            rows = self._db.execute(
+                'SELECT url, fetch_url, kind, priority, depth, payload, attempts FROM frontier'
+                ' WHERE state = ? OR (state = ? AND lease_until < ?)'
+                ' ORDER BY priority DESC, seq LIMIT ?', (PENDING, LEASED, now, n)).fetchall()
+            self._db.executemany(
+                'UPDATE frontier SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1,'
+                ' updated_at = ? WHERE url = ?',
+                [(LEASED, self.owner, now + self.lease_seconds, now, row[0]) for row in rows])
+            return [FrontierItem(fetch_url, kind, priority, depth, json.loads(payload) if payload else None,
+                                 attempts + 1)
+                    for _, fetch_url, kind, priority, depth, payload, attempts in rows]
+
+        return self._transaction(take)
+
+    def ack(self, url: str, result: Any = None):
+        """Mark url done and store its result."""
+        self._transaction(lambda: self._db.execute(
+            'UPDATE frontier SET state = ?, owner = NULL, lease_until = NULL, result = ?, error = NULL,'
+            ' updated_at = ? WHERE url = ?', (DONE, json.dumps(result, default=str), time.time(), canonicalize_url(url))))
+
+    def nack(self, url: str, error: str = '', retry: bool = True):
+        """Give url back for another attempt, or mark it failed once max_attempts is reached."""
+        key = canonicalize_url(url)
+
+        def release():
+            row = self._db.execute('SELECT attempts FROM frontier WHERE url = ?', (key,)).fetchone()
+            state = PENDING if retry and row and row[0] < self.max_attempts else FAILED
+            self._db.execute(
+                'UPDATE frontier SET state = ?, owner = NULL, lease_until = NULL, error = ?, updated_at = ?'
+                ' WHERE url = ?', (state, error[:500], time.time(), key))
+            return state
+
+        return self._transaction(release)
+
+    # ----------------
+    # Inspection
+    # ----------------
+    def results(self, kind: Optional[str] = None) -> List[Any]:
+        """Stored results of done URLs, in enqueue order."""
+        sql = 'SELECT result FROM frontier WHERE state = ?'
+        params: Tuple = (DONE,)
+        if kind:
+            sql += ' AND kind = ?'
+            params += (kind,)
+        with self._lock:
+            return [json.loads(row[0]) for row in self._db.execute(sql + ' ORDER BY seq', params)]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._db.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state').fetchall())
+
+    def remaining(self) -> int:
+        """URLs still pending or leased."""
+        counts = self.counts()
+        return counts.get(PENDING, 0) + counts.get(LEASED, 0)
+
+    def failures(self) -> List[Dict[str, Union[str, int]]]:
+        with self._lock:
+            rows = self._db.execute('SELECT url, attempts, error FROM frontier WHERE state = ? ORDER BY seq',
+                                    (FAILED,)).fetchall()
+        return [{'url': url, 'attempts': attempts, 'error': error} for url, attempts, error in rows]
+
+    def clear(self):
+        def wipe():
+            self._db.execute('DELETE FROM frontier')
+            self._db.execute('DELETE FROM meta')
+        self._transaction(wipe)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    # A killed process that has not been reaped yet is a zombie (Linux)
+    try:
+        return Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (OSError, IndexError):
+        return True
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Inspect or reset crawl frontiers')
+    parser.add_argument('command', choices=['stats', 'reset'])
+    parser.add_argument('names', nargs='*', help='frontier (scraper class) names; default all')
+    args = parser.parse_args(argv)
+    root = Path(getattr(settings, 'FRONTIER_DIR', 'data/raw/frontier'))
+    names = args.names or sorted(p.stem for p in root.glob('*.sqlite3'))
+    for name in names:
+        frontier = Frontier(name)
+        if args.command == 'stats':
+            counts = frontier.counts()
+            print(f"{name}: {frontier._meta('status') or 'empty'}, "
+                  + ', '.join(f"{counts.get(s, 0)} {s}" for s in (PENDING, LEASED, DONE, FAILED)))
+        else:
+            frontier.clear()
+            print(f'{name}: reset')
+        frontier.close()
+
+
+if __name__ == '__main__':
+    main()
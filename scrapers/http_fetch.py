@@ -0,0 +1,81 @@
+"""
+Plain HTTP fetching for server-rendered pages.
+
+A keep-alive requests.Session with a connection pool sized for concurrent use,
+plus an HTML parser helper (lxml when installed, html.parser otherwise). Used by
+BaseScraper's `fetch_mode` so pages that do not need JavaScript skip Chromium.
+"""
+import random
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from config import settings
+from config.user_agents import USER_AGENTS
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, HTML_PARSER)
+
+
+class FetchResult:
+    """Response of one HTTP fetch."""
+
+    def __init__(self, url: str, status: int, text: str, headers: Dict[str, str], elapsed_ms: float,
+                 content: bytes = b''):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.content = content
+        self.headers = headers
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+
+class HttpFetcher:
+    """Pooled keep-alive HTTP client.
+
+    Args:
+        pool_size: connections kept open per host (match the scraper's concurrency)
+        timeout: seconds per request, defaults to settings.TIMEOUT
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: Optional[float] = None,
+                 user_agent: Optional[str] = None):
+        self.timeout = timeout or getattr(settings, 'TIMEOUT', 30)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent or random.choice(USER_AGENTS),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+
+    def add_cookies(self, cookies: Iterable[Dict[str, Any]]):
+        """Load Playwright-style cookies (e.g. from stored consent state) into the session."""
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        start = time.monotonic()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return FetchResult(response.url, response.status_code, response.text,
+                           dict(response.headers), (time.monotonic() - start) * 1000, response.content)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,126 @@
+"""
+Declarative request interception for Playwright browser contexts.
+
+An InterceptionPolicy aborts requests by resource type, by (third-party) domain or by
+URL pattern, and counts what it blocked so a run can report the requests and bytes
+it saved.
+"""
+import re
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from config import settings
+
+
+class InterceptionStats:
+    """Counters for blocked and allowed requests."""
+
+    def __init__(self):
+        self.blocked = Counter()  # resource_type -> requests aborted
+        self.blocked_by_rule = Counter()  # rule -> requests aborted
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def bytes_saved(self) -> int:
+        """Estimated bytes not downloaded, using BLOCKED_BYTES_ESTIMATE per resource type."""
+        estimates = getattr(settings, 'BLOCKED_BYTES_ESTIMATE', {})
+        default = estimates.get('other', 0)
+        return sum(count * estimates.get(rtype, default) for rtype, count in self.blocked.items())
+
+    def summary(self) -> str:
+        top = ', '.join(f'{rtype}={count}' for rtype, count in self.blocked.most_common())
+        return (f'blocked {self.blocked_requests} requests (~{self.bytes_saved / 1024:.0f} KB saved; {top or "none"}), '
+                f'allowed {self.allowed_requests} requests ({self.allowed_bytes / 1024:.0f} KB by Content-Length)')
+
+
+class InterceptionPolicy:
+    """Decide which requests a browser context should abort.
+
+    Args:
+        resource_types: Playwright resource types to block (image, media, font, stylesheet...)
+        domains: hosts to block, including their subdomains (analytics, ads, trackers)
+        url_patterns: regular expressions searched in the full request URL
+    """
+
+    def __init__(self, resource_types: Iterable[str] = (), domains: Iterable[str] = (),
+                 url_patterns: Iterable[str] = ()):
+        self.resource_types = frozenset(resource_types)
+        self.domains = tuple(sorted({d.lower().lstrip('.') for d in domains}))
+        self.url_patterns = tuple(url_patterns)
+        self._compiled = [re.compile(p, re.IGNORECASE) for p in self.url_patterns]
+        self.stats = InterceptionStats()
+
+    @classmethod
+    def from_settings(cls) -> 'InterceptionPolicy':
+        return cls(
+            resource_types=getattr(settings, 'BLOCKED_RESOURCE_TYPES', ()),
+            domains=getattr(settings, 'BLOCKED_DOMAINS', ()),
+            url_patterns=getattr(settings, 'BLOCKED_URL_PATTERNS', ()),
+        )
+
+    def extend(self, resource_types: Iterable[str] = (), domains: Iterable[str] = (),
+               url_patterns: Iterable[str] = ()) -> 'InterceptionPolicy':
+        """Return a new policy that also blocks the given types, domains and patterns."""
+        return InterceptionPolicy(
+            resource_types=self.resource_types | set(resource_types),
+            domains=self.domains + tuple(domains),
+            url_patterns=self.url_patterns + tuple(url_patterns),
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.resource_types or self.domains or self._compiled)
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """Return the rule that blocks this request, or None to let it through."""
+        if resource_type in self.resource_types:
+            return f'type:{resource_type}'
+        host = (urlparse(url).hostname or '').lower()
+        for domain in self.domains:
+            if host == domain or host.endswith('.' + domain):
+                return f'domain:{domain}'
+        for pattern in self._compiled:
+            if pattern.search(url):
+                return f'pattern:{pattern.pattern}'
+        return None
+
+    def check(self, request) -> bool:
+        """Record and return True if the request should be aborted."""
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason is None:
+            return False
+        self.stats.blocked[request.resource_type] += 1
+        self.stats.blocked_by_rule[reason] += 1
+        return True
+
+    def handle_route(self, route):
+        """Route handler for the sync API: context.route('**/*', policy.handle_route).
+
+        Allowed requests fall back to earlier-registered handlers (e.g. the asset cache)
+        and from there to the network.
+        """
+        if self.check(route.request):
+            route.abort()
+        else:
+            route.fallback()
+
+    async def handle_route_async(self, route):
+        """Route handler for the async API."""
+        if self.check(route.request):
+            await route.abort()
+        else:
+            await route.fallback()
+
+    def on_response(self, response):
+        """Response listener counting what was actually downloaded."""
+        self.stats.allowed_requests += 1
+        try:
+            self.stats.allowed_bytes += int(response.headers.get('content-length', 0))
+        except (TypeError, ValueError):
+            pass
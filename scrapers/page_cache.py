@@ -0,0 +1,180 @@
+"""
+Content-addressed on-disk page cache.
+
+An SQLite index maps each normalized URL to the sha256 of its body plus the
+validators (ETag / Last-Modified) needed to revalidate it. Bodies are stored
+gzip-compressed under bodies/<2 hex>/<sha256>.gz, so identical pages are kept once.
+Freshness is decided by the caller's TTL function; archived seasons never expire.
+
+Usage:
+    python -m scrapers.page_cache stats
+    python -m scrapers.page_cache clear
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import settings
+
+SEASON_RE = re.compile(r'(spring-summer|fall-winter)-(\d{4})(?:-(\d{4}))?')
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop default ports and fragments, sort query parameters."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and not ((scheme == 'http' and parts.port == 80) or (scheme == 'https' and parts.port == 443)):
+        host = f'{host}:{parts.port}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def season_is_archived(url: str, today: Optional[date] = None) -> bool:
+    """True if url belongs to a season that ended before this year (e.g. fall-winter-2023-2024)."""
+    m = SEASON_RE.search(url)
+    if not m:
+        return False
+    last_year = int(m.group(3) or m.group(2))
+    return last_year < (today or date.today()).year
+
+
+class CacheEntry:
+    """One cached page."""
+
+    def __init__(self, url: str, body: bytes, status: int, content_type: str, etag: Optional[str],
+                 last_modified: Optional[str], fetched_at: float, validated_at: float):
+        self.url = url
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.validated_at = validated_at
+
+    @property
+    def text(self) -> str:
+        m = re.search(r'charset=([\w-]+)', self.content_type or '', re.IGNORECASE)
+        return self.body.decode(m.group(1) if m else 'utf-8', errors='replace')
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """SQLite-indexed, gzip, content-addressed page store.
+
+    Args:
+        root: cache directory, defaults to settings.PAGE_CACHE_DIR
+        ttl_for: url -> seconds a page stays fresh, or None for forever
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl_for: Optional[Callable[[str], Optional[float]]] = None):
+        self.root = Path(root or getattr(settings, 'PAGE_CACHE_DIR', 'data/raw/page_cache'))
+        self.root.mkdir(parents=True, exist_ok=True)
+        default_ttl = getattr(settings, 'PAGE_CACHE_TTL_HOURS', 12) * 3600
+        self.ttl_for = ttl_for or (lambda url: default_ttl)
+        self.counts = Counter()  # hit / revalidated / stored / offline_miss
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / 'index.db'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, status INTEGER, content_type TEXT,'
+            ' etag TEXT, last_modified TEXT, fetched_at REAL, validated_at REAL)')
+        self._db.commit()
+
+    def _body_path(self, content_hash: str) -> Path:
+        return self.root / 'bodies' / content_hash[:2] / f'{content_hash}.gz'
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT content_hash, status, content_type, etag, last_modified, fetched_at, validated_at'
+                ' FROM pages WHERE url = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            body = gzip.decompress(self._body_path(row[0]).read_bytes())
+        except OSError:
+            return None
+        return CacheEntry(key, body, *row[1:])
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        ttl = self.ttl_for(entry.url)
+        return ttl is None or time.time() - entry.validated_at < ttl
+
+    def put(self, url: str, body: bytes, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._body_path(content_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp.write_bytes(gzip.compress(body))
+            os.replace(tmp, path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (normalize_url(url), content_hash, status, headers.get('content-type', ''),
+                 headers.get('etag'), headers.get('last-modified'), now, now))
+            self._db.commit()
+
+    def mark_validated(self, url: str):
+        """Record a 304 Not Modified: the cached body is fresh again."""
+        with self._lock:
+            self._db.execute('UPDATE pages SET validated_at = ? WHERE url = ?', (time.time(), normalize_url(url)))
+            self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pages, bodies = self._db.execute('SELECT COUNT(*), COUNT(DISTINCT content_hash) FROM pages').fetchone()
+        size = sum(p.stat().st_size for p in (self.root / 'bodies').rglob('*.gz')) if (self.root / 'bodies').exists() else 0
+        return {'pages': pages, 'bodies': bodies, 'bytes_on_disk': size}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM pages')
+            self._db.commit()
+        for path in (self.root / 'bodies').rglob('*.gz') if (self.root / 'bodies').exists() else []:
+            path.unlink()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Inspect or clear the on-disk page cache')
+    parser.add_argument('command', choices=['stats', 'clear'])
+    args = parser.parse_args(argv)
+    cache = PageCache()
+    if args.command == 'stats':
+        s = cache.stats()
+        print(f"{s['pages']} pages, {s['bodies']} distinct bodies, {s['bytes_on_disk'] / 1024:.0f} KB on disk")
+    else:
+        cache.clear()
+        print('Page cache cleared')
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
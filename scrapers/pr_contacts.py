@@ -8,13 +8,13 @@ Strategy:
 - Save to master_leads.csv with lead_type='Press Office'
 """
 import csv
-import re
 import time
 from pathlib import Path
 from datetime import datetime
 import hashlib
 from scrapers.base_scraper import BaseScraper
 from config.settings import REGION_MAPPING, TARGET_REGIONS
+from utils.contact_extractor import extract_contacts
 
 
 class PRContactsScraper(BaseScraper):
@@ -97,48 +97,7 @@ class PRContactsScraper(BaseScraper):
     
     def _extract_emails(self, text):
         """Extract email addresses from text"""
-        # Comprehensive email regex
-        pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(pattern, text)
-        
-        # Filter out common noise
-        filtered = []
-        for email in emails:
-            email = email.strip()
-            # Skip placeholder/example emails
-            if any(skip in email.lower() for skip in ['example.com', 'test.com', 'domain.com', 'email.com']):
-                continue
-            if len(email) > 5:  # Reasonable minimum
-                filtered.append(email)
-        
-        return filtered
-    
-    def _extract_phones(self, text):
-        """Extract phone numbers from text"""
-        # Common international phone patterns
-        patterns = [
-            r'\+\d{1,3}\s*\(?\d{1,4}\)?\s*\d{1,4}[\s\-]?\d{1,4}[\s\-]?\d{1,9}',  # +33 (0)1 23 45 67 89
-            r'\d{2,4}[\s\-]\d{2,4}[\s\-]\d{2,4}[\s\-]\d{2,4}',  # 01 23 45 67
-            r'\(\d{3}\)\s*\d{3}[\s\-]?\d{4}',  # (123) 456-7890
-        ]
-        
-        phones = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            phones.extend(matches)
-        
-        # Deduplicate and clean
-        seen = set()
-        filtered = []
-        for phone in phones:
-            phone = phone.strip()
-            # Normalize for dedup
-            normalized = re.sub(r'[\s\-\(\)]', '', phone)
-            if len(normalized) >= 8 and normalized not in seen:  # Reasonable minimum
-                seen.add(normalized)
-                filtered.append(phone)
-        
-        return filtered
+        return extract_contacts(text).get('email', [])
     
     def run(self):
         """Main scraping workflow"""
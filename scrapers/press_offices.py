@@ -4,16 +4,24 @@ Extracts press office contact information for lead generation.
 Priority 1A - Tier 1 Lead Generation
 """
 import re
-import time
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
+from scrapers.readiness import MINI_WEBSITE_LIST
+from scrapers.extraction import mini_website_rows, page_mini_website_rows
 from config.settings import REGION_MAPPING, TARGET_REGIONS
+from utils.contact_extractor import extract_contacts
 from utils.data_cleaner import clean_text
+from utils.retry import is_transient
 
 
 class PressOfficesScraper(BaseScraper):
     """Scraper for press offices/PR agencies"""
     
+    readiness = MINI_WEBSITE_LIST
+    legacy_wait_ms = 5000
+    # mini-web-sites pages are server-rendered; see needs_javascript()
+    http_capable = True
+    
     def __init__(self):
         super().__init__()
         self.base_url = "https://www.modemonline.com/fashion/mini-web-sites/press-offices"
@@ -22,51 +30,33 @@ class PressOfficesScraper(BaseScraper):
         """Get URLs to scrape"""
         return [self.base_url]
     
+    def needs_javascript(self, url, html):
+        return 'Mini Website' not in html
+
     def scrape_press_office_page(self, url):
-        """Scrape press offices using Playwright DOM API"""
+        """Scrape press offices from server HTML, or the browser when it needs JavaScript"""
         print(f"\n{'='*80}")
         print(f"Scraping: {url}")
         print('='*80)
         
         try:
-            page = self.new_page()
-            page.goto(url, wait_until='networkidle', timeout=60000)
+            html = self.fetch_html(url)
+            if html is not None:
+                rows = mini_website_rows(html)
+            else:
+                page = self.new_page()
+                # Returns once the Mini Website rows have rendered
+                self.navigate(page, url, timeout=60000)
+                rows = page_mini_website_rows(page)
+                page.close()
             
-            # Wait for content to load
-            time.sleep(5)
-            
-            # Find all "Mini Website" links
+            # Find all "Mini Website" rows
             press_offices = []
-            mini_website_links = page.locator('a:has-text("Mini Website")').all()
-            print(f"Found {len(mini_website_links)} Mini Website links\n")
+            print(f"Found {len(rows)} Mini Website links\n")
             
-            for idx, link in enumerate(mini_website_links):
+            for idx, row in enumerate(rows):
                 try:
-                    # Get parent container
-                    parent_element = None
-                    
-                    # Try table row first
-                    try:
-                        parent_tr = link.locator('xpath=ancestor::tr[1]')
-                        if parent_tr.count() > 0:
-                            parent_element = parent_tr
-                    except:
-                        pass
-                    
-                    # Try div container
-                    if not parent_element:
-                        try:
-                            parent_div = link.locator('xpath=ancestor::div[contains(@class, "col") or contains(@class, "row")][1]')
-                            if parent_div.count() > 0:
-                                parent_element = parent_div
-                        except:
-                            pass
-                    
-                    # Fallback to immediate parent
-                    if not parent_element:
-                        parent_element = link.locator('xpath=..')
-                    
-                    text = parent_element.text_content()
+                    text = row['text']
                     
                     if idx < 3:  # Show first 3 for debugging
                         print(f"=== Press Office #{idx+1} ===")
@@ -84,11 +74,12 @@ class PressOfficesScraper(BaseScraper):
                         print(f"Error processing link {idx}: {e}")
                     continue
             
-            page.close()
             print(f"\n[OK] Successfully extracted {len(press_offices)} press offices")
             return press_offices
             
         except Exception as e:
+            if is_transient(e):
+                raise  # retried with backoff by crawl_resumable()
             print(f"\n[ERROR] Error scraping {url}: {str(e)}")
             import traceback
             traceback.print_exc()
@@ -129,15 +120,14 @@ class PressOfficesScraper(BaseScraper):
                 city = known_city
                 break
         
-        # Extract email
-        email_pattern = r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-        email_match = re.search(email_pattern, text)
-        email = clean_text(email_match.group(1)) if email_match else "N/A"
+        # Get country and region
+        country = self.get_country_from_city(city)
+        region = REGION_MAPPING.get(country, "Other")
         
-        # Extract phone
-        phone_pattern = r'(?:T|Tel|Phone|P)\s*:?\s*(\+?[\d\s\(\)\-\.]{10,})'
-        phone_match = re.search(phone_pattern, text, re.IGNORECASE)
-        phone = clean_text(phone_match.group(1)) if phone_match else "N/A"
+        # Extract email, phone (E.164) and socials in one pass
+        contacts = extract_contacts(text, default_country=country)
+        email = contacts['email'][0] if contacts.get('email') else "N/A"
+        phone = contacts['phone'][0] if contacts.get('phone') else "N/A"
         
         # Extract website
         web_pattern = r'(?:www\.|https?://)([\w\-\.]+\.(?:com|net|org|it|fr|de|uk|cn|jp|au|kr|nl|be|ch)[^\s<"\)]*)'
@@ -148,19 +138,8 @@ class PressOfficesScraper(BaseScraper):
             if not website.startswith('http'):
                 website = 'https://' + website
         
-        # Extract Instagram
-        instagram_pattern = r'instagram\.com/([a-zA-Z0-9_\.]+)'
-        insta_match = re.search(instagram_pattern, text.lower())
-        instagram = f"@{insta_match.group(1)}" if insta_match else "N/A"
-        
-        # Extract Facebook  
-        facebook_pattern = r'facebook\.com/([a-zA-Z0-9_\.]+)'
-        fb_match = re.search(facebook_pattern, text.lower())
-        facebook = f"facebook.com/{fb_match.group(1)}" if fb_match else "N/A"
-        
-        # Get country and region
-        country = self.get_country_from_city(city)
-        region = REGION_MAPPING.get(country, "Other")
+        instagram = f"@{contacts['instagram'][0]}" if contacts.get('instagram') else "N/A"
+        facebook = f"facebook.com/{contacts['facebook'][0]}" if contacts.get('facebook') else "N/A"
         
         # Filter by region
         if region not in TARGET_REGIONS:
@@ -234,10 +213,12 @@ class PressOfficesScraper(BaseScraper):
         """Main execution method"""
         all_press_offices = []
         
-        for url in self.get_urls():
-            press_offices = self.scrape_press_office_page(url)
-            all_press_offices.extend(press_offices)
-            time.sleep(2)  # Rate limiting
+        try:
+            # Rate limited; pages done by an interrupted run are not scraped again
+            for press_offices in self.crawl_resumable(self.get_urls(), self.scrape_press_office_page):
+                all_press_offices.extend(press_offices)
+        finally:
+            self.stop_browser()
         
         self.save_to_csv(all_press_offices)
         print(f"\nPress offices scraping complete. Total: {len(all_press_offices)}")
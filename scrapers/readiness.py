@@ -0,0 +1,129 @@
+"""
+Page readiness strategies.
+
+Instead of fixed sleeps and `networkidle` waits, each scraper declares what "ready"
+means for its pages. A declaration is a spec built from registered strategies:
+
+    ('link_text', 'Mini Website')                    # a link with this text exists
+    ('all', ('selector', 'table'), ('dom_stable', 300))
+    ('any', ('link_text', 'Mini Website'), ('text', 'No results'))
+
+Specs compile to one JavaScript predicate that `page.wait_for_function` polls in the
+page, so navigation returns the moment the predicate holds.
+"""
+import json
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+Spec = Union[str, Tuple]
+
+READINESS_STRATEGIES: Dict[str, Callable[..., str]] = {}
+
+
+def register_readiness(name: str):
+    """Register a builder that turns spec arguments into a JS boolean expression."""
+    def decorator(fn):
+        READINESS_STRATEGIES[name] = fn
+        return fn
+    return decorator
+
+
+@register_readiness('selector')
+def selector_present(selector: str) -> str:
+    return f'!!document.querySelector({json.dumps(selector)})'
+
+
+@register_readiness('link_text')
+def link_text_present(text: str) -> str:
+    return f"Array.from(document.querySelectorAll('a')).some(a => (a.textContent || '').includes({json.dumps(text)}))"
+
+
+@register_readiness('text')
+def text_present(text: str) -> str:
+    """Page body contains text, e.g. a known empty-state marker."""
+    return f"!!document.body && (document.body.innerText || '').includes({json.dumps(text)})"
+
+
+@register_readiness('dom_stable')
+def dom_stable(quiet_ms: int = 300, attributes: bool = True) -> str:
+    """No DOM mutations for quiet_ms milliseconds (observer installed on first poll).
+
+    With attributes=False only added/removed nodes and text changes count, so class and
+    style churn (carousels, animations) on third-party pages does not keep it unsettled.
+    """
+    slot = '__scraperDomStable' if attributes else '__scraperContentStable'
+    options = {'subtree': True, 'childList': True, 'characterData': True, 'attributes': bool(attributes)}
+    return (
+        '(() => {'
+        f' const s = window.{slot} || (window.{slot} = (() => {{'
+        '  const st = {last: performance.now()};'
+        '  new MutationObserver(() => { st.last = performance.now(); })'
+        f'   .observe(document, {json.dumps(options)});'
+        '  return st; })());'
+        f' return performance.now() - s.last >= {int(quiet_ms)}; }})()'
+    )
+
+
+@register_readiness('all')
+def all_of(*specs: Spec) -> str:
+    return '(' + ' && '.join(f'({compile_expression(s)})' for s in specs) + ')'
+
+
+@register_readiness('any')
+def any_of(*specs: Spec) -> str:
+    return '(' + ' || '.join(f'({compile_expression(s)})' for s in specs) + ')'
+
+
+def compile_expression(spec: Spec) -> str:
+    if isinstance(spec, str):
+        return READINESS_STRATEGIES[spec]()
+    name, *args = spec
+    if name not in READINESS_STRATEGIES:
+        raise KeyError(f'Unknown readiness strategy: {name}')
+    return READINESS_STRATEGIES[name](*args)
+
+
+def compile_readiness(spec: Spec) -> str:
+    """Compile a spec into a function string for page.wait_for_function."""
+    return f'() => {compile_expression(spec)}'
+
+
+# Listing pages built from "Mini Website" rows: ready once rows exist and the DOM has
+# settled, or once the page has been quiet for 2 s without any (an empty season)
+MINI_WEBSITE_LIST = ('any',
+                     ('all', ('link_text', 'Mini Website'), ('dom_stable', 300)),
+                     ('dom_stable', 2000))
+
+# Generic content page, often a third-party site: ready once its content (nodes and
+# text, not attributes) has settled
+DOM_SETTLED = ('dom_stable', 300, False)
+
+
+class ReadinessTimer:
+    """Per-page navigation timings and the wall-clock saved versus a fixed wait."""
+
+    def __init__(self, legacy_wait_ms: int = 0):
+        self.legacy_wait_ms = legacy_wait_ms
+        self.samples: List[Dict] = []
+
+    def record(self, url: str, goto_ms: float, ready_ms: float, timed_out: bool = False,
+               legacy_wait_ms: Optional[int] = None) -> Dict:
+        legacy = self.legacy_wait_ms if legacy_wait_ms is None else legacy_wait_ms
+        sample = {
+            'url': url,
+            'goto_ms': goto_ms,
+            'ready_ms': ready_ms,
+            'saved_ms': max(0.0, legacy - ready_ms),
+            'timed_out': timed_out,
+        }
+        self.samples.append(sample)
+        return sample
+
+    def summary(self) -> str:
+        if not self.samples:
+            return 'no pages timed'
+        ready = [s['ready_ms'] for s in self.samples]
+        saved = sum(s['saved_ms'] for s in self.samples)
+        timeouts = sum(1 for s in self.samples if s['timed_out'])
+        return (f"{len(ready)} pages, ready p50 {statistics.median(ready):.0f} ms / max {max(ready):.0f} ms, "
+                f"{saved / 1000:.1f} s saved vs fixed waits, {timeouts} readiness timeouts")
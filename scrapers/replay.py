@@ -0,0 +1,130 @@
+"""
+Record/replay of scraper traffic.
+
+Record mode (settings.RECORD_ARCHIVE = <dir>) captures every response a scraper
+sees, from the browser's route handler and from HTTP fetches, into a HAR 1.2 file
+(<dir>/archive.har) whose bodies are stored next to it under bodies/.
+
+Replay mode (settings.REPLAY_SERVER = <base url>) sends every request to a local
+ReplayServer that serves the archive with configurable latency, so crawls can be
+benchmarked without the live site.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from scrapers.page_cache import normalize_url
+
+# Headers that describe the wire encoding rather than the (decoded) stored body
+_HOP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def replay_url(server: str, url: str) -> str:
+    """The local ReplayServer URL that serves the recording of url."""
+    return f"{server.rstrip('/')}/{quote(normalize_url(url), safe='')}"
+
+
+class ReplayArchive:
+    """HAR-like archive: one entry per normalized URL, bodies stored by sha256."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        har = self.root / 'archive.har'
+        if har.exists():
+            for entry in json.loads(har.read_text(encoding='utf-8'))['log']['entries']:
+                self.entries[normalize_url(entry['request']['url'])] = entry
+
+    def add(self, url: str, status: int, headers: Dict[str, str], body: bytes, method: str = 'GET'):
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = self.root / 'bodies' / f'{digest}.gz'
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = body_path.with_name(f'{body_path.name}.{threading.get_ident()}.tmp')
+            tmp.write_bytes(gzip.compress(body))
+            os.replace(tmp, body_path)
+        entry = {
+            'startedDateTime': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'request': {'method': method, 'url': url},
+            'response': {
+                'status': status,
+                'headers': [{'name': k, 'value': v} for k, v in headers.items() if k.lower() not in _HOP_HEADERS],
+                'content': {'size': len(body), 'mimeType': headers.get('content-type', headers.get('Content-Type', '')),
+                            '_file': body_path.name},
+            },
+        }
+        with self._lock:
+            self.entries[normalize_url(url)] = entry
+
+    def get(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Return (status, headers, body) recorded for url, or None."""
+        entry = self.entries.get(normalize_url(url))
+        if entry is None:
+            return None
+        response = entry['response']
+        body = gzip.decompress((self.root / 'bodies' / response['content']['_file']).read_bytes())
+        return response['status'], {h['name']: h['value'] for h in response['headers']}, body
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            har = {'log': {'version': '1.2', 'creator': {'name': 'references-scrapers', 'version': '1.0'},
+                           'entries': list(self.entries.values())}}
+        path = self.root / 'archive.har'
+        tmp = path.with_name('archive.har.tmp')
+        tmp.write_text(json.dumps(har, indent=1), encoding='utf-8')
+        os.replace(tmp, path)
+
+
+class ReplayServer:
+    """Serve a ReplayArchive over local HTTP, adding `latency_ms` to every response."""
+
+    def __init__(self, archive: ReplayArchive, latency_ms: float = 0, host: str = '127.0.0.1', port: int = 0):
+        self.archive = archive
+        self.latency = latency_ms / 1000
+        self.hits = 0
+        self.misses = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                recorded = server.archive.get(unquote(self.path.lstrip('/')))
+                if recorded is None:
+                    server.misses += 1
+                    self.send_error(404, 'Not in replay archive')
+                    return
+                server.hits += 1
+                status, headers, body = recorded
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f'http://{host}:{self._httpd.server_address[1]}'
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
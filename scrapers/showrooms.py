@@ -1,20 +1,35 @@
 from typing import List, Dict, Any
 import re
-from .base_scraper import BaseScraper
+from .async_base_scraper import AsyncBaseScraper
+from scrapers.extraction import showroom_blocks
 from config import settings
 from utils.incremental import IncrementalStore
+from utils.merge_leads import LeadMerger
+from utils.warehouse import content_hash
 from utils.logger import setup_logger
 from utils.data_cleaner import clean_email, clean_text
 
 logger = setup_logger('showrooms')
 
 
-class ShowroomsScraper(BaseScraper):
+class ShowroomsScraper(AsyncBaseScraper):
     """Scraper for multi-label showrooms from fashion week pages.
     
     Extracts showroom names, locations, contact info, brands represented, and dates.
     """
 
+    # Listing pages are parsed from HTML only
+    block_resource_types = ('stylesheet',)
+    # Ready once showroom rows and their detail tables exist; Asia pages are often empty
+    readiness = ('any',
+                 ('all', ('link_text', 'Mini Website'), ('selector', 'table'), ('dom_stable', 300)),
+                 ('dom_stable', 2000))
+    legacy_wait_ms = 2000
+    # Listing pages are server-rendered; see needs_javascript()
+    http_capable = True
+    # Page HTML is parsed in worker processes once the page is released
+    parse_in_pool = True
+
     def __init__(self, headless=True):
         super().__init__(headless=headless)
         self.incremental = IncrementalStore('data/raw/scraped_showrooms_urls.txt')
@@ -32,68 +47,39 @@ class ShowroomsScraper(BaseScraper):
         ]
         return [settings.BASE_URL + path for path in base_weeks]
 
-    def scrape_list_page(self, page, url: str) -> List[Dict[str, Any]]:
-        """Scrape showroom entries from a showrooms listing page."""
-        logger.info(f'Visiting showrooms list page: {url}')
-        page.goto(url, timeout=settings.TIMEOUT * 1000)
-        
-        # Handle cookie consent if present
-        self.handle_cookie_consent(page)
-        
-        page.wait_for_timeout(2000)
-        
+    def needs_javascript(self, url: str, html: str) -> bool:
+        # Showroom rows without their detail tables have not been rendered server-side
+        return 'Mini Website' not in html or '<table' not in html.lower()
+
+    @classmethod
+    def parse_list_snapshot(cls, url: str, body_html: str) -> List[Dict[str, Any]]:
+        """Extract showroom entries from a showrooms listing page's HTML."""
+        logger.info(f'Parsing showrooms list page: {url}')
         # Extract city from URL for geographic context
         parts = url.split('/')
         city = parts[6] if len(parts) > 6 else 'N/A'
         
-        # Strategy: Look for showroom entries in the page
-        # Each showroom typically has a table with address, contact, brands
+        # Each showroom is a <span> name + Mini Website link followed by a table with
+        # address, contact and brands; see showroom_blocks()
         showrooms = []
-        
-        # Find all tables (each showroom has a table with info)
-        tables = page.query_selector_all('table')
-        
-        # Also look for showroom names (often in bold or heading before table)
-        # Pattern: showroom name followed by table with details
-        body_html = page.content()
-
-        # Pattern: <span>ShowroomName</span> followed by Mini Website link, then collapsible div with <table>
-        # Capture showroom name from span and table HTML
-        pattern = re.compile(r"<span[^>]*>([A-Za-z0-9\s&'\-\.]+?)</span>\s*<a[^>]*>[\*\s]*Mini Website</a>.*?<table[^>]*>(.*?)</table>", re.IGNORECASE | re.DOTALL)
-        matches = list(pattern.finditer(body_html))
-
-        # Fallback: try without the span wrapper
-        if not matches:
-            pattern2 = re.compile(r"([A-Z][A-Za-z0-9 &'\-\.]{3,120})\s*<a[^>]*>[\*\s]*Mini Website</a>.*?<table[^>]*>(.*?)</table>", re.IGNORECASE | re.DOTALL)
-            matches = list(pattern2.finditer(body_html))
-
-        for idx, m in enumerate(matches):
-            try:
-                name_raw = m.group(1)
-                table_html = m.group(2)
-                # Convert HTML table to plain text for easier regex parsing
-                table_text = re.sub(r'<[^>]+>', ' ', table_html)
-                table_text = re.sub(r'\s+', ' ', table_text).strip()
-
-                showroom_name = clean_text(name_raw)
-                if not showroom_name:
-                    showroom_name = f'Showroom {idx+1}'
-
-                showrooms.append({
-                    'showroom_name': showroom_name,
-                    'city': city,
-                    'table_text': table_text,
-                    'table_html': table_html,
-                    'source_url': url
-                })
-            except Exception as e:
-                logger.debug(f'Error parsing showroom match {idx}: {e}')
-                continue
+        for idx, block in enumerate(showroom_blocks(body_html)):
+            showroom_name = clean_text(block['name'])
+            if not showroom_name:
+                showroom_name = f'Showroom {idx+1}'
+
+            showrooms.append({
+                'showroom_name': showroom_name,
+                'city': city,
+                'table_text': block['table_text'],
+                'table_html': block['table_html'],
+                'links': block['links'],
+                'source_url': url
+            })
 
         logger.info(f'Found {len(showrooms)} showrooms on page')
         return showrooms
 
-    def scrape_detail_page(self, page, url: str) -> Dict[str, Any]:
+    async def scrape_detail_page(self, page, item: Dict[str, Any]) -> Dict[str, Any]:
         """Not used - showrooms are extracted from list pages directly."""
         return {}
 
@@ -169,36 +155,45 @@ class ShowroomsScraper(BaseScraper):
             'scraped_date': self.timestamp()
         }
 
-    def scrape(self):
+    async def scrape_async(self):
         results = []
+        list_urls = []
+        all_urls = self.get_list_page_urls()
+        already_scraped = self.incremental.has_many(all_urls)
+        for list_url in all_urls:
+            if list_url in already_scraped:
+                logger.debug(f'Skipping already scraped URL: {list_url}')
+                continue
+            list_urls.append(list_url)
+
+        # The browser is launched on demand, only for pages HTTP cannot serve
         try:
-            self.start_browser()
-            page = self.new_page()
-            for list_url in self.get_list_page_urls():
-                if self.incremental.has(list_url):
-                    logger.debug(f'Skipping already scraped URL: {list_url}')
-                    continue
-                
-                try:
-                    showrooms = self.scrape_list_page(page, list_url)
-                    for showroom_data in showrooms:
-                        parsed = self.parse_data(showroom_data)
-                        
-                        # Apply geographic filtering
-                        if parsed.get('region') in ['Asia', 'Europe']:
-                            results.append(parsed)
-                            logger.info(f"Added: {parsed.get('company_name')} ({parsed.get('city')}, {parsed.get('country')})")
-                        else:
-                            logger.info(f"Skipped (not Asia/Europe): {parsed.get('company_name')}")
-                    
-                    self.incremental.add(list_url)
-                except Exception as e:
-                    logger.error(f'Failed to scrape {list_url}: {e}')
+            showrooms = await self.crawl(list_urls)
+        finally:
+            await self.stop_browser()
+
+        pages: Dict[str, List[Dict[str, Any]]] = {}
+        for showroom_data in showrooms:
+            pages.setdefault(showroom_data.get('source_url', ''), []).append(showroom_data)
+            parsed = self.parse_data(showroom_data)
             
-            if results:
-                self.save_to_csv(results, 'data/processed/master_leads.csv', mode='a')
-                logger.info(f'Saved {len(results)} showrooms to CSV')
+            # Apply geographic filtering
+            if parsed.get('region') in ['Asia', 'Europe']:
+                results.append(parsed)
+                logger.info(f"Added: {parsed.get('company_name')} ({parsed.get('city')}, {parsed.get('country')})")
             else:
-                logger.warning('No showrooms matched filters')
-        finally:
-            self.stop_browser()
+                logger.info(f"Skipped (not Asia/Europe): {parsed.get('company_name')}")
+        
+        if results:
+            merger = LeadMerger(self.warehouse)
+            counts = merger.upsert([merger.showroom_lead(r) for r in results])
+            merger.export()
+            logger.info(f"Upserted {len(results)} showrooms ({counts['inserted']} new, {counts['updated']} updated); "
+                        f'exported {merger.output_file}')
+        else:
+            logger.warning('No showrooms matched filters')
+
+        # A list page counts as scraped only once its showrooms are in the warehouse
+        self.incremental.add_many((url, content_hash({'showrooms': rows}), 200)
+                                  for url, rows in pages.items() if url)
+        self.incremental.flush()
@@ -0,0 +1,221 @@
+"""
+Persistent browser storage state, keyed by host.
+
+Cookies and localStorage from a run are written to data/raw/storage_state/<host>.json
+at shutdown and loaded into new contexts on the next run, so consent banners and
+session warm-up are skipped. An optional AssetCache keeps static assets (scripts,
+stylesheets) on disk and serves them through the context's route handler.
+
+Usage:
+    python -m scrapers.storage_cache list
+    python -m scrapers.storage_cache invalidate [--host www.modemonline.com]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from config import settings
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write to a temp file next to path, then rename over it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _cookie_matches(cookie: Dict[str, Any], host: str) -> bool:
+    domain = (cookie.get('domain') or '').lstrip('.').lower()
+    return bool(domain) and (host == domain or host.endswith('.' + domain))
+
+
+def filter_state(state: Dict[str, Any], host: str) -> Dict[str, Any]:
+    """The part of a context storage state that belongs to host."""
+    host = host.lower()
+    return {
+        'cookies': [c for c in state.get('cookies', []) if _cookie_matches(c, host)],
+        'origins': [o for o in state.get('origins', [])
+                    if (urlparse(o.get('origin', '')).hostname or '').lower() == host],
+    }
+
+
+def merge_states(states: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge storage states; later cookies/origins win."""
+    cookies: Dict[tuple, Dict[str, Any]] = {}
+    origins: Dict[str, Dict[str, Any]] = {}
+    for state in states:
+        for cookie in state.get('cookies', []):
+            cookies[(cookie.get('name'), cookie.get('domain'), cookie.get('path'))] = cookie
+        for origin in state.get('origins', []):
+            origins[origin.get('origin')] = origin
+    return {'cookies': list(cookies.values()), 'origins': list(origins.values())}
+
+
+class StorageStateCache:
+    """One JSON file per host with the saved state, a save time and a consent flag."""
+
+    def __init__(self, root: Optional[str] = None, ttl_hours: Optional[float] = None):
+        self.root = Path(root or getattr(settings, 'STORAGE_STATE_DIR', 'data/raw/storage_state'))
+        self.ttl = (ttl_hours if ttl_hours is not None
+                    else getattr(settings, 'STORAGE_STATE_TTL_HOURS', 24)) * 3600
+
+    def path(self, host: str) -> Path:
+        return self.root / f'{host.lower()}.json'
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('saved_at', 0) > self.ttl:
+            return None
+        return entry
+
+    def load(self, host: str) -> Optional[Dict[str, Any]]:
+        """Return {'host', 'saved_at', 'consented', 'state'} or None if missing or expired."""
+        return self._read(self.path(host))
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        entries = {}
+        if self.root.exists():
+            for path in self.root.glob('*.json'):
+                entry = self._read(path)
+                if entry:
+                    entries[entry['host']] = entry
+        return entries
+
+    def save(self, host: str, state: Dict[str, Any], consented: bool = False):
+        entry = {'host': host.lower(), 'saved_at': time.time(), 'consented': consented,
+                 'state': filter_state(state, host)}
+        _atomic_write(self.path(host), json.dumps(entry, indent=2).encode('utf-8'))
+
+    def invalidate(self, host: Optional[str] = None) -> int:
+        """Delete the cached state for host (or every host). Returns files removed."""
+        paths = [self.path(host)] if host else list(self.root.glob('*.json')) if self.root.exists() else []
+        removed = 0
+        for path in paths:
+            if path.exists():
+                path.unlink()
+                removed += 1
+        return removed
+
+
+class AssetCache:
+    """Disk cache for static assets, served from a context route handler.
+
+    Responses for the cached resource types are stored as <sha256>.body plus a
+    <sha256>.json header file and replayed with route.fulfill() until the TTL expires.
+    Anything else falls through to the next route handler.
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl_hours: Optional[float] = None,
+                 resource_types: Iterable[str] = ('script', 'stylesheet')):
+        base = root or os.path.join(getattr(settings, 'STORAGE_STATE_DIR', 'data/raw/storage_state'), 'http_cache')
+        self.root = Path(base)
+        self.ttl = (ttl_hours if ttl_hours is not None
+                    else getattr(settings, 'STORAGE_STATE_TTL_HOURS', 24)) * 3600
+        self.resource_types = frozenset(resource_types)
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.root / f'{key}.body', self.root / f'{key}.json'
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            if time.time() - meta['saved_at'] > self.ttl:
+                return None
+            meta['body'] = body_path.read_bytes()
+            return meta
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        body_path, meta_path = self._paths(url)
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps({'url': url, 'status': status, 'headers': headers,
+                                             'saved_at': time.time()}).encode('utf-8'))
+
+    def cacheable(self, request) -> bool:
+        return request.method == 'GET' and request.resource_type in self.resource_types
+
+    def handle_route(self, route):
+        """Route handler for the sync API; register before other handlers so it runs last."""
+        request = route.request
+        if not self.cacheable(request):
+            route.fallback()
+            return
+        cached = self.get(request.url)
+        if cached:
+            self.hits += 1
+            route.fulfill(status=cached['status'], headers=cached['headers'], body=cached['body'])
+            return
+        self.misses += 1
+        response = route.fetch()
+        body = response.body()
+        if response.status == 200:
+            self.put(request.url, response.status, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+    async def handle_route_async(self, route):
+        """Route handler for the async API."""
+        request = route.request
+        if not self.cacheable(request):
+            await route.fallback()
+            return
+        cached = self.get(request.url)
+        if cached:
+            self.hits += 1
+            await route.fulfill(status=cached['status'], headers=cached['headers'], body=cached['body'])
+            return
+        self.misses += 1
+        response = await route.fetch()
+        body = await response.body()
+        if response.status == 200:
+            self.put(request.url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    def clear(self) -> int:
+        removed = 0
+        if self.root.exists():
+            for path in self.root.iterdir():
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Manage the persisted browser storage-state cache')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help='Show cached hosts and their age')
+    inv = sub.add_parser('invalidate', help='Delete cached state')
+    inv.add_argument('--host', help='Only this host (default: all hosts)')
+    inv.add_argument('--assets', action='store_true', help='Also clear the static asset cache')
+    args = parser.parse_args(argv)
+
+    cache = StorageStateCache()
+    if args.command == 'list':
+        for path in sorted(cache.root.glob('*.json')) if cache.root.exists() else []:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+            age_h = (time.time() - entry.get('saved_at', 0)) / 3600
+            status = 'expired' if age_h * 3600 > cache.ttl else 'valid'
+            print(f"{entry['host']}: {len(entry['state']['cookies'])} cookies, "
+                  f"consented={entry.get('consented')}, {age_h:.1f} h old ({status})")
+    else:
+        removed = cache.invalidate(args.host)
+        print(f"Removed {removed} storage state file(s)")
+        if args.assets:
+            print(f"Removed {AssetCache().clear()} asset cache file(s)")
+
+
+if __name__ == '__main__':
+    main()
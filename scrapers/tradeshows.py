@@ -3,18 +3,30 @@ Tradeshows scraper for ModeMonline.com
 Extracts tradeshow information from the digital/extra/tradeshows pages.
 """
 import re
-import time
 from datetime import datetime
-from scrapers.base_scraper import BaseScraper
+from scrapers.async_base_scraper import AsyncBaseScraper
+from scrapers.extraction import mini_website_rows, page_links_async, page_mini_website_rows_async
+from scrapers.readiness import MINI_WEBSITE_LIST, DOM_SETTLED
 from config.settings import REGION_MAPPING, TARGET_REGIONS
 from utils.data_cleaner import clean_text
+from utils import date_engine
+from utils.warehouse import entity_key
 
 
-class TradeshowsScraper(BaseScraper):
+class TradeshowsScraper(AsyncBaseScraper):
     """Scraper for fashion tradeshows"""
     
-    def __init__(self):
-        super().__init__()
+    # Listing pages are parsed from text/HTML only
+    block_resource_types = ('stylesheet',)
+    readiness = MINI_WEBSITE_LIST
+    legacy_wait_ms = 5000
+    # Listing pages are server-rendered; see needs_javascript()
+    http_capable = True
+    # Rows are parsed in worker processes once the page is released
+    parse_in_pool = True
+    
+    def __init__(self, headless=True):
+        super().__init__(headless=headless)
         self.base_url = "https://www.modemonline.com/fashion/fashion-weeks"
         self.seasons = [
             "spring-summer-2026",
@@ -29,195 +41,86 @@ class TradeshowsScraper(BaseScraper):
             urls.append(url)
         return urls
     
-    def scrape_tradeshow_page(self, url):
-        """Scrape a single tradeshow page using Playwright DOM selectors"""
+    def get_list_page_urls(self):
+        return self.get_urls_to_scrape()
+
+    def needs_javascript(self, url, html):
+        # Server HTML without any Mini Website rows is treated as not rendered yet
+        return 'Mini Website' not in html
+
+    async def snapshot_list_page(self, page, url):
+        """Load a tradeshow page in the browser and return its Mini Website rows"""
+        # Returns once the Mini Website rows have rendered
+        await self.navigate(page, url, timeout=90000)
+        
+        # Handle cookie consent if present
+        await self.handle_cookie_consent(page)
+        
+        return await page_mini_website_rows_async(page)
+
+    @classmethod
+    def parse_list_snapshot(cls, url, snapshot):
+        """Parse a tradeshow page: HTML fetched over HTTP or rows from the browser"""
         print(f"\n{'='*80}")
         print(f"Scraping: {url}")
         print('='*80)
+        rows = mini_website_rows(snapshot) if isinstance(snapshot, str) else snapshot
+        return cls._tradeshows_from_rows(rows, url)
+
+    @classmethod
+    def _tradeshows_from_rows(cls, rows, url):
+        """Build tradeshow records from Mini Website rows ({'text', 'href'})"""
+        tradeshows = []
+        print(f"Found {len(rows)} Mini Website links\n")
         
-        try:
-            page = self.new_page()
+        for idx, row in enumerate(rows):
             try:
-                page.goto(url, wait_until='networkidle', timeout=90000)
-            except Exception:
-                # Fallback to a lighter wait condition
-                page.goto(url, wait_until='load', timeout=90000)
-            
-            # Handle cookie consent if present
-            self.handle_cookie_consent(page)
-            
-            # Wait for content to load
-            import time
-            time.sleep(5)
-            
-            # Find all "Mini Website" links and extract parent elements
-            tradeshows = []
-            
-            # Use Playwright's locator API to find Mini Website links
-            mini_website_links = page.locator('a:has-text("Mini Website")').all()
-            print(f"Found {len(mini_website_links)} Mini Website links\n")
-            
-            for idx, link in enumerate(mini_website_links):
-                try:
-                    # Get the parent container (try div, tr, or td)
-                    # Try to find a table row first, then any container
-                    parent_element = None
-                    
-                    # Try finding parent tr (table row)
-                    try:
-                        parent_tr = link.locator('xpath=ancestor::tr[1]')
-                        if parent_tr.count() > 0:
-                            parent_element = parent_tr
-                    except:
-                        pass
-                    
-                    # If no tr, try div
-                    if not parent_element:
-                        try:
-                            parent_div = link.locator('xpath=ancestor::div[contains(@class, "col") or contains(@class, "row")][1]')
-                            if parent_div.count() > 0:
-                                parent_element = parent_div
-                        except:
-                            pass
+                text = row['text']
+                href = row['href']
+                # Build absolute mini website URL if possible
+                mini_url = None
+                if href:
+                    mini_url = f"https://www.modemonline.com{href}" if href.startswith('/') else href
+                
+                if idx < 3:  # Show first 3 for debugging
+                    print(f"=== Tradeshow #{idx+1} ===")
+                    print(text[:500] if text else "(no text)")  # Show more text
+                    print()
+                
+                # Extract tradeshow data from text
+                if text and len(text) > 50:
+                    tradeshow_data = cls.parse_tradeshow_text(text, url)
+                    if tradeshow_data:
+                        if mini_url:
+                            tradeshow_data['mini_website_url'] = mini_url
+                        tradeshows.append(tradeshow_data)
                     
-                    # If still nothing, just get the immediate parent
-                    if not parent_element:
-                        parent_element = link.locator('xpath=..')
-                    
-                    text = parent_element.text_content()
-                    href = None
-                    try:
-                        href = link.get_attribute('href')
-                    except Exception:
-                        href = None
-                    # Build absolute mini website URL if possible
-                    mini_url = None
-                    if href:
-                        mini_url = f"https://www.modemonline.com{href}" if href.startswith('/') else href
-                    
-                    if idx < 3:  # Show first 3 for debugging
-                        print(f"=== Tradeshow #{idx+1} ===")
-                        print(text[:500] if text else "(no text)")  # Show more text
-                        print()
-                    
-                    # Extract tradeshow data from text
-                    if text and len(text) > 50:
-                        tradeshow_data = self.parse_tradeshow_text(text, url)
-                        if tradeshow_data:
-                            if mini_url:
-                                tradeshow_data['mini_website_url'] = mini_url
-                            tradeshows.append(tradeshow_data)
-                        
-                except Exception as e:
-                    if idx < 5:  # Only show first 5 errors
-                        print(f"Error processing link {idx}: {e}")
-                    continue
-            
-            page.close()
-            print(f"\n[OK] Successfully extracted {len(tradeshows)} tradeshows")
-            return tradeshows
-            
-        except Exception as e:
-            print(f"\n[ERROR] Error scraping {url}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return []
+            except Exception as e:
+                if idx < 5:  # Only show first 5 errors
+                    print(f"Error processing link {idx}: {e}")
+                continue
+        
+        print(f"\n[OK] Successfully extracted {len(tradeshows)} tradeshows")
+        return tradeshows
 
     # ----------------
     # Date enrichment helpers
     # ----------------
-    def _standardize_months(self, text: str) -> str:
-        """Standardize abbreviated month names (e.g., Sept. -> September)."""
-        repl = {
-            'Jan.': 'January', 'Feb.': 'February', 'Mar.': 'March', 'Apr.': 'April',
-            'Jun.': 'June', 'Jul.': 'July', 'Aug.': 'August', 'Sep.': 'September',
-            'Sept.': 'September', 'Oct.': 'October', 'Nov.': 'November', 'Dec.': 'December'
-        }
-        for k, v in repl.items():
-            text = text.replace(k, v)
-        return text
-
-    def _find_date_range_in_text(self, text: str):
+    @classmethod
+    def _find_date_range_in_text(cls, text: str):
         """Find a date range in free text. Returns (start_iso, end_iso) or (None, None)."""
-        if not text:
-            return None, None
-        s = ' '.join(text.split())
-        s = self._standardize_months(s)
-
-        # Common patterns
-        patterns = [
-            # September 20-24, 2025
-            r'([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s*[–\-to]{1,3}\s*(\d{1,2})(?:st|nd|rd|th)?,?\s*(\d{4})',
-            # 20-24 September 2025
-            r'(\d{1,2})(?:st|nd|rd|th)?\s*[–\-to]{1,3}\s*(\d{1,2})(?:st|nd|rd|th)?\s+([A-Z][a-z]+)\s+(\d{4})',
-            # September 20 2025 to September 24 2025
-            r'([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s+(\d{4})\s+(?:to|–|-)\s+([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s+(\d{4})',
-            # 2025-09-20 to 2025-09-24
-            r'(\d{4})-(\d{2})-(\d{2})\s+(?:to|–|-)\s+(\d{4})-(\d{2})-(\d{2})',
-            # 20 September - 24 September 2025
-            r'(\d{1,2})\s+([A-Z][a-z]+)\s*[–\-to]{1,3}\s*(\d{1,2})\s+([A-Z][a-z]+)\s+(\d{4})',
-        ]
-
-        def month_to_num(m: str) -> int:
-            return datetime.strptime(m, '%B').month
-
-        for i, pat in enumerate(patterns):
-            m = re.search(pat, s)
-            if not m:
-                continue
-            try:
-                if i == 0:
-                    # Month D1-D2, YYYY
-                    month, d1, d2, year = m.group(1), int(m.group(2)), int(m.group(3)), int(m.group(4))
-                    start = datetime(year, month_to_num(month), d1).strftime('%Y-%m-%d')
-                    end = datetime(year, month_to_num(month), d2).strftime('%Y-%m-%d')
-                    return start, end
-                elif i == 1:
-                    # D1-D2 Month YYYY
-                    d1, d2, month, year = int(m.group(1)), int(m.group(2)), m.group(3), int(m.group(4))
-                    start = datetime(year, month_to_num(month), d1).strftime('%Y-%m-%d')
-                    end = datetime(year, month_to_num(month), d2).strftime('%Y-%m-%d')
-                    return start, end
-                elif i == 2:
-                    # Month D1 YYYY to Month D2 YYYY
-                    m1, d1, y1, m2, d2, y2 = m.group(1), int(m.group(2)), int(m.group(3)), m.group(4), int(m.group(5)), int(m.group(6))
-                    start = datetime(y1, month_to_num(m1), d1).strftime('%Y-%m-%d')
-                    end = datetime(y2, month_to_num(m2), d2).strftime('%Y-%m-%d')
-                    return start, end
-                elif i == 3:
-                    # ISO to ISO
-                    y1, mo1, d1, y2, mo2, d2 = int(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4)), int(m.group(5)), int(m.group(6))
-                    start = datetime(y1, mo1, d1).strftime('%Y-%m-%d')
-                    end = datetime(y2, mo2, d2).strftime('%Y-%m-%d')
-                    return start, end
-                elif i == 4:
-                    # D1 Month - D2 Month YYYY
-                    d1, m1, d2, m2, y = int(m.group(1)), m.group(2), int(m.group(3)), m.group(4), int(m.group(5))
-                    start = datetime(y, month_to_num(m1), d1).strftime('%Y-%m-%d')
-                    end = datetime(y, month_to_num(m2), d2).strftime('%Y-%m-%d')
-                    return start, end
-            except Exception:
-                continue
-        return None, None
+        return date_engine.iso_range(date_engine.find_date_range(text))
 
-    def extract_dates_from_url(self, url: str, page=None):
+    async def extract_dates_from_url(self, url: str, page):
         """Load a page and attempt to extract a date range from its content."""
         if not url:
             return None, None
-        own_page = False
         try:
-            if page is None:
-                page = self.new_page()
-                own_page = True
-            try:
-                page.goto(url, wait_until='domcontentloaded', timeout=15000)
-            except Exception:
-                page.goto(url, wait_until='load', timeout=15000)
-            self.handle_cookie_consent(page)
-            page.wait_for_timeout(500)
+            await self.navigate(page, url, readiness=DOM_SETTLED, timeout=15000, legacy_wait_ms=500)
+            await self.handle_cookie_consent(page)
             body_text = ''
             try:
-                body_text = page.inner_text('body')
+                body_text = await page.inner_text('body')
             except Exception:
                 body_text = ''
             start, end = self._find_date_range_in_text(body_text)
@@ -225,18 +128,15 @@ class TradeshowsScraper(BaseScraper):
                 return start, end
 
             # If not found on this page, try following an external "Official Website" link
-            external = self._find_external_site_url(page)
+            external = await self._find_external_site_url(page)
             if external:
                 try:
-                    try:
-                        page.goto(external, wait_until='domcontentloaded', timeout=10000)
-                    except Exception:
-                        page.goto(external, wait_until='load', timeout=10000)
-                    self.handle_cookie_consent(page)
-                    page.wait_for_timeout(500)
+                    await self.navigate(page, external, readiness=DOM_SETTLED, timeout=10000,
+                                        legacy_wait_ms=500)
+                    await self.handle_cookie_consent(page)
                     ext_text = ''
                     try:
-                        ext_text = page.inner_text('body')
+                        ext_text = await page.inner_text('body')
                     except Exception:
                         ext_text = ''
                     return self._find_date_range_in_text(ext_text)
@@ -245,55 +145,36 @@ class TradeshowsScraper(BaseScraper):
             return None, None
         except Exception:
             return None, None
-        finally:
-            if own_page:
-                try:
-                    page.close()
-                except Exception:
-                    pass
 
-    def enrich_tradeshows_with_dates(self, tradeshows):
-        """For records lacking dates, visit mini website and parse date ranges."""
+    async def _enrich_one(self, ts):
+        """Try mini website first, then source_url. Returns True if dates were set."""
+        for candidate in [ts.get('mini_website_url'), ts.get('source_url')]:
+            if not candidate:
+                continue
+            start, end = await self.visit(candidate, lambda page: self.extract_dates_from_url(candidate, page))
+            if start and end:
+                ts['start_date'] = start
+                ts['end_date'] = end
+                return True
+        return False
+
+    async def enrich_tradeshows_with_dates(self, tradeshows):
+        """For records lacking dates, visit mini websites concurrently and parse date ranges."""
         if not tradeshows:
             return 0
-        updated = 0
-        # Reuse a single page for efficiency
-        page = None
-        try:
-            page = self.new_page()
-            for idx, ts in enumerate(tradeshows, 1):
-                sd = ts.get('start_date', 'N/A')
-                ed = ts.get('end_date', 'N/A')
-                if sd != 'N/A' and ed != 'N/A':
-                    continue
-                # Try mini website first, then source_url
-                for candidate in [ts.get('mini_website_url'), ts.get('source_url')]:
-                    if not candidate:
-                        continue
-                    start, end = self.extract_dates_from_url(candidate, page=page)
-                    if start and end:
-                        ts['start_date'] = start
-                        ts['end_date'] = end
-                        updated += 1
-                        break
-                # Soft cap to avoid long runs; adjust if needed
-                page.wait_for_timeout(200)
-        finally:
-            try:
-                if page:
-                    page.close()
-            except Exception:
-                pass
-        return updated
+        missing = [ts for ts in tradeshows
+                   if ts.get('start_date', 'N/A') == 'N/A' or ts.get('end_date', 'N/A') == 'N/A']
+        results = await self.run_bounded(missing, self._enrich_one)
+        return sum(1 for r in results if r)
 
-    def _find_external_site_url(self, page):
+    async def _find_external_site_url(self, page):
         """Find an external site link on the current page (e.g., Official Website)."""
         try:
-            links = page.locator('a').all()
+            links = await page_links_async(page)
             for link in links:
                 try:
-                    href = link.get_attribute('href') or ''
-                    text = (link.inner_text() or '').strip().lower()
+                    href = link['href']
+                    text = link['text'].lower()
                     if not href:
                         continue
                     # Normalize protocol-less links
@@ -313,7 +194,7 @@ class TradeshowsScraper(BaseScraper):
             # Fallback: first external absolute link
             for link in links:
                 try:
-                    href = link.get_attribute('href') or ''
+                    href = link['href']
                     if href.startswith('//'):
                         href = 'https:' + href
                     if href.startswith('http') and 'modemonline.com' not in href:
@@ -324,10 +205,9 @@ class TradeshowsScraper(BaseScraper):
             return None
         return None
     
-    def parse_tradeshow_text(self, text, source_url):
+    @classmethod
+    def parse_tradeshow_text(cls, text, source_url):
         """Parse tradeshow details from text content"""
-        import re
-        
         if not text or len(text) < 10:
             return None
         
@@ -354,7 +234,7 @@ class TradeshowsScraper(BaseScraper):
         # Extract dates (robust patterns)
         start_date = "N/A"
         end_date = "N/A"
-        s, e = self._find_date_range_in_text(text)
+        s, e = cls._find_date_range_in_text(text)
         if s and e:
             start_date, end_date = s, e
         
@@ -366,7 +246,7 @@ class TradeshowsScraper(BaseScraper):
                 break
         
         # Get country and region
-        country = self.get_country_from_city(city)
+        country = cls.get_country_from_city(city)
         region = REGION_MAPPING.get(country, "Other")
         
         # Filter by region
@@ -392,20 +272,15 @@ class TradeshowsScraper(BaseScraper):
     
     def parse_date(self, date_str):
         """Parse date string to YYYY-MM-DD format"""
-        try:
-            # Format: "Wed. September 03 2025" or "Tuesday September 04 2025"
-            date_str = clean_text(date_str)
-            # Remove day name if present
-            date_str = re.sub(r'^[A-Z][a-z]+\.?\s+', '', date_str)
-            
-            # Parse
-            dt = datetime.strptime(date_str, '%B %d %Y')
-            return dt.strftime('%Y-%m-%d')
-        except Exception as e:
-            print(f"Could not parse date '{date_str}': {str(e)}")
-            return date_str
+        # Format: "Wed. September 03 2025" or "Tuesday September 04 2025"
+        parsed = date_engine.parse_date(date_str)
+        if parsed:
+            return parsed.isoformat()
+        print(f"Could not parse date '{date_str}'")
+        return date_str
     
-    def get_country_from_city(self, city):
+    @staticmethod
+    def get_country_from_city(city):
         """Map city to country"""
         city_country_map = {
             'Paris': 'France',
@@ -429,8 +304,8 @@ class TradeshowsScraper(BaseScraper):
         }
         return city_country_map.get(city, 'Unknown')
     
-    def save_tradeshows(self, tradeshows):
-        """Save tradeshows to CSV"""
+    def save_tradeshows(self, tradeshows, export=False):
+        """Upsert tradeshows into the warehouse; rewrite the CSV when rows changed (or export=True)"""
         if not tradeshows:
             print("No tradeshows to save")
             return
@@ -438,39 +313,56 @@ class TradeshowsScraper(BaseScraper):
         from pathlib import Path
         filename = str(Path('data/processed/tradeshows.csv'))
         
-        # Add IDs and scraped date
-        for i, ts in enumerate(tradeshows, 1):
-            ts['event_id'] = f"TS{i:04d}"
+        # Keep the history of a tradeshows.csv written before the warehouse (first run only)
+        self.warehouse.import_csv('tradeshows', filename)
+        
+        # Add IDs and scraped date; a tradeshow keeps the ID it got when first stored,
+        # new ones continue the stored sequence (seeded from the highest stored ID)
+        keys = [entity_key('tradeshows', ts) for ts in tradeshows]
+        ids = {key: record.get('event_id', '') for key, record in self.warehouse.get('tradeshows', keys).items()}
+        sequence = self.warehouse.source_mark('tradeshows_event_id')
+        next_id = sequence.get('next') or self.warehouse.max_number('tradeshows', '$.event_id', 'TS') + 1
+        for key, ts in zip(keys, tradeshows):
+            if key not in ids:
+                ids[key] = f"TS{next_id:04d}"
+                next_id += 1
+            ts['event_id'] = ids[key]
             ts['scraped_date'] = datetime.now().strftime('%Y-%m-%d')
         
-        self.save_to_csv(tradeshows, filename)
-        print(f"Saved {len(tradeshows)} tradeshows to {filename}")
+        counts = self.warehouse.upsert(
+            'tradeshows', tradeshows,
+            merge=lambda stored, new: {**stored, **new, 'event_id': stored.get('event_id', new['event_id'])})
+        self.warehouse.set_source_mark('tradeshows_event_id', {'next': next_id})
+        summary = (f"Upserted {len(tradeshows)} tradeshows ({counts['inserted']} new, "
+                   f"{counts['updated']} updated)")
+        if counts['inserted'] or counts['updated'] or export or not Path(filename).exists():
+            total = self.warehouse.export_csv('tradeshows', filename, order_by=('$.event_id',))
+            print(f"{summary}; saved {total} to {filename}")
+        else:
+            print(f"{summary}; {filename} is up to date")
     
-    def run(self):
+    async def scrape_async(self):
         """Main scraping workflow"""
         print("Starting tradeshows scraper")
         
-        self.start_browser()
-        all_tradeshows = []
-        
-        urls = self.get_urls_to_scrape()
-        
-        for url in urls:
-            tradeshows = self.scrape_tradeshow_page(url)
-            all_tradeshows.extend(tradeshows)
-            time.sleep(self.delay)
-        
-        # Enrich with dates from mini websites
-        print("\nAttempting to enrich tradeshow dates from mini websites...")
-        updated_count = self.enrich_tradeshows_with_dates(all_tradeshows)
-        print(f"Updated dates for {updated_count} tradeshows")
+        # The browser is launched on demand, only for pages HTTP cannot serve
+        try:
+            all_tradeshows = await self.crawl()
+            
+            # Enrich with dates from mini websites
+            print("\nAttempting to enrich tradeshow dates from mini websites...")
+            updated_count = await self.enrich_tradeshows_with_dates(all_tradeshows)
+            print(f"Updated dates for {updated_count} tradeshows")
+        finally:
+            await self.stop_browser()
 
         # Save results
         self.save_tradeshows(all_tradeshows)
         
         print(f"Tradeshows scraping complete. Total: {len(all_tradeshows)}")
-        
-        self.stop_browser()
+
+    def run(self):
+        self.scrape()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+"""
+Benchmark utils.contact_extractor against the separate regex passes it replaced.
+
+    python scripts/bench_contact_extractor.py
+    python scripts/bench_contact_extractor.py --archive data/raw/replay --doc-mb 4 --docs 16
+
+Documents are page.content()-sized dumps built from the captured pages in the
+repo root and any record/replay archive. Pages are concatenated up to --doc-mb
+MB each, with contact blocks (emails, UAE/French/Italian phones, socials, asset
+names that look like emails) spread through them. The legacy side runs the
+patterns the scrapers and scripts used to run one after another (email, the
+three pr_contacts phone patterns, the Dubai phone pattern, Instagram, Facebook,
+LinkedIn). The engine scans each document once; the bulk run spreads the
+documents over a ParsePool.
+"""
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+
+try:
+    import _init_path  # noqa: F401
+except ImportError:
+    pass
+
+from scrapers.replay import ReplayArchive
+from utils.contact_extractor import extract_contacts, extract_contacts_bulk
+
+CAPTURED_PAGES = ['brands_page.html', 'debug_tradeshows.html', 'tradeshows_sample.html', 'debug_google.html']
+CONTACT_BLOCKS = [
+    '<p>Press: <a href="mailto:press{i}@brand{i}.com">press{i}@brand{i}.com</a> T: +33 (0)1 42 60 {i2} 00</p>',
+    '<div>Call 04 {i3} 4567 or 050 {i3} 4567 - sales{i}@dubai-brand.ae</div>',
+    '<a href="https://www.instagram.com/brand{i}/">IG</a> <a href="https://www.facebook.com/brand{i}">FB</a>',
+    '<a href="https://ae.linkedin.com/company/brand-{i}">LinkedIn</a> Tel. +39 02 {i3} 8901',
+    '<img srcset="/img/logo@2x.png 2x"><span>info{i}@example.com</span>',
+]
+
+LEGACY_PATTERNS = [
+    re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'),
+    re.compile(r'\+\d{1,3}\s*\(?\d{1,4}\)?\s*\d{1,4}[\s\-]?\d{1,4}[\s\-]?\d{1,9}'),
+    re.compile(r'\d{2,4}[\s\-]\d{2,4}[\s\-]\d{2,4}[\s\-]\d{2,4}'),
+    re.compile(r'\(\d{3}\)\s*\d{3}[\s\-]?\d{4}'),
+    re.compile(r'(?:\+971|00971|0)?\s?(?:50|51|52|55|56|58|2|3|4|6|7|9|800)\s?\d{3}\s?\d{4,5}'),
+    re.compile(r'instagram\.com/([a-zA-Z0-9_\.]+)'),
+    re.compile(r'facebook\.com/([a-zA-Z0-9_\.]+)'),
+    re.compile(r'linkedin\.com/([a-zA-Z0-9_\./-]+)'),
+]
+
+
+def legacy_extract(text: str) -> int:
+    return sum(len(pattern.findall(text)) for pattern in LEGACY_PATTERNS)
+
+
+def build_docs(args):
+    pages = [Path(p).read_text(encoding='utf-8', errors='replace') for p in CAPTURED_PAGES if Path(p).exists()]
+    if args.archive:
+        archive = ReplayArchive(args.archive)
+        for url in archive.entries:
+            status, headers, body = archive.get(url)
+            if b'<html' in body[:2000].lower():
+                pages.append(body.decode('utf-8', errors='replace'))
+    if not pages:
+        raise SystemExit('No pages found (captured *.html in the repo root or --archive)')
+    rng = random.Random(0)
+    target = int(args.doc_mb * 1024 * 1024)
+    docs = []
+    for d in range(args.docs):
+        parts, size, i = [], 0, 0
+        while size < target:
+            page = pages[(d + i) % len(pages)]
+            block = rng.choice(CONTACT_BLOCKS).format(i=i, i2=f'{i % 100:02d}', i3=f'{100 + i % 900}')
+            parts += [page, block]
+            size += len(page) + len(block)
+            i += 1
+        docs.append(''.join(parts))
+    return docs
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single-pass contact extraction')
+    parser.add_argument('--archive', help='record/replay archive to take pages from')
+    parser.add_argument('--doc-mb', type=float, default=1.0, help='size of each document in MB')
+    parser.add_argument('--docs', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=None, help='ParsePool workers for the bulk run')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    docs = build_docs(args)
+    mb = sum(len(d) for d in docs) / 1024 / 1024
+    legacy_s, legacy_hits = best_of(lambda: sum(legacy_extract(d) for d in docs), args.repeat)
+    engine_s, found = best_of(lambda: [extract_contacts(d, default_country='AE') for d in docs], args.repeat)
+    bulk_s, bulk = best_of(lambda: extract_contacts_bulk(docs, default_country='AE', workers=args.workers),
+                           args.repeat)
+
+    kinds = {}
+    for contacts in found:
+        for kind, values in contacts.items():
+            kinds[kind] = kinds.get(kind, 0) + len(values)
+    print(f"{len(docs)} documents, {mb:.1f} MB")
+    print(f"legacy : {legacy_s * 1000:8.1f} ms  {mb / legacy_s:6.1f} MB/s  ({legacy_hits} raw regex hits, unvalidated)")
+    print(f"engine : {engine_s * 1000:8.1f} ms  {mb / engine_s:6.1f} MB/s  {legacy_s / engine_s:.1f}x")
+    print(f"bulk   : {bulk_s * 1000:8.1f} ms  {mb / bulk_s:6.1f} MB/s  {legacy_s / bulk_s:.1f}x (ParsePool)")
+    print('distinct contacts per kind: ' + ', '.join(f"{k} {v}" for k, v in sorted(kinds.items())))
+    if bulk != found:
+        print('[WARN] bulk results differ from the single-process run')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+End-to-end crawl benchmark against a recorded archive.
+
+Record once against the live site, then replay offline as often as needed:
+
+    python scripts/bench_crawl.py --record data/raw/replay
+    python scripts/bench_crawl.py --archive data/raw/replay --latency 50
+
+Each scraper runs in a throwaway working directory (so its CSVs and caches never
+touch data/), and pages/min, p50/p95 page latency and peak RSS are reported.
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import _init_path  # noqa: F401
+except ImportError:
+    pass
+
+from config import settings
+from scrapers.replay import ReplayArchive, ReplayServer
+
+SCRAPERS = ['tradeshows', 'designer_showrooms', 'showrooms', 'exhibitors']
+
+
+def build_scraper(name: str):
+    if name == 'tradeshows':
+        from scrapers.tradeshows import TradeshowsScraper
+        return TradeshowsScraper()
+    if name == 'designer_showrooms':
+        from scrapers.designer_showrooms import DesignerShowroomsScraper
+        return DesignerShowroomsScraper()
+    if name == 'showrooms':
+        from scrapers.showrooms import ShowroomsScraper
+        return ShowroomsScraper()
+    from scrapers.exhibitors import ExhibitorsScraper
+    return ExhibitorsScraper()
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process plus its largest child (Chromium), in MB."""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024  # ru_maxrss is bytes on macOS, KB on Linux
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (self_rss + child_rss) / scale
+
+
+def run_scraper(name: str) -> dict:
+    scraper = build_scraper(name)
+    start = time.monotonic()
+    if hasattr(scraper, 'scrape_async'):
+        scraper.scrape()
+    else:
+        scraper.run()
+    elapsed = time.monotonic() - start
+    pages = len(scraper.page_latencies_ms)
+    return {
+        'scraper': name,
+        'pages': pages,
+        'seconds': elapsed,
+        'pages_per_min': pages / elapsed * 60 if elapsed else 0.0,
+        'p50_ms': percentile(scraper.page_latencies_ms, 50),
+        'p95_ms': percentile(scraper.page_latencies_ms, 95),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record a crawl, or replay it offline and report throughput')
+    parser.add_argument('--record', metavar='DIR', help='crawl the live site and record every response into DIR')
+    parser.add_argument('--archive', metavar='DIR', default='data/raw/replay', help='archive to replay')
+    parser.add_argument('--latency', type=float, default=0, help='latency added to every replayed response (ms)')
+    parser.add_argument('--scrapers', nargs='+', choices=SCRAPERS, default=SCRAPERS)
+    args = parser.parse_args()
+
+    server = None
+    settings.PAGE_CACHE = False
+    if args.record:
+        settings.RECORD_ARCHIVE = str(Path(args.record).resolve())
+    else:
+        archive = ReplayArchive(str(Path(args.archive).resolve()))
+        if not archive.entries:
+            print(f"[WARN] No recorded pages in {args.archive}; run with --record first")
+            return
+        server = ReplayServer(archive, latency_ms=args.latency).start()
+        settings.REPLAY_SERVER = server.base_url
+        print(f"[INFO] Replaying {len(archive.entries)} pages from {args.archive} at {server.base_url}")
+
+    cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench_crawl_') as workdir:
+        os.chdir(workdir)
+        try:
+            for name in args.scrapers:
+                print(f"\n=== {name} ===")
+                results.append(run_scraper(name))
+        finally:
+            os.chdir(cwd)
+            if server:
+                server.stop()
+
+    print(f"\n{'scraper':<20}{'pages':>7}{'pages/min':>11}{'p50 ms':>9}{'p95 ms':>9}{'peak RSS MB':>13}")
+    for r in results:
+        print(f"{r['scraper']:<20}{r['pages']:>7}{r['pages_per_min']:>11.1f}{r['p50_ms']:>9.0f}"
+              f"{r['p95_ms']:>9.0f}{r['peak_rss_mb']:>13.0f}")
+    if server:
+        print(f"\nReplay hits: {server.hits}, misses: {server.misses}")
+
+
+if __name__ == '__main__':
+    main()
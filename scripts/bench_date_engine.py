@@ -0,0 +1,157 @@
+"""
+Microbenchmark: utils.date_engine vs the per-pattern date extraction it replaced.
+
+    python scripts/bench_date_engine.py
+    python scripts/bench_date_engine.py --archive data/raw/replay --size 50000
+
+The corpus is the tradeshow text available locally. That covers the captured
+tradeshow pages, every tradeshow page in a record/replay archive, and
+data/processed/tradeshows.csv. Rows rebuilt from the CSV get dates in the layouts
+seen on modemonline. The result is cycled up to --size texts.
+"""
+import argparse
+import csv
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import _init_path  # noqa: F401
+except ImportError:
+    pass
+
+from scrapers.http_fetch import parse_html
+from scrapers.replay import ReplayArchive
+from utils.date_engine import find_date_range, find_date_ranges, iso_range
+
+CAPTURED_PAGES = ['debug_tradeshows.html', 'tradeshows_sample.html']
+DATE_LAYOUTS = [
+    '{month} {d1}-{d2}, {year}', '{d1}-{d2} {month} {year}', '{abbr}. {d1}-{d2}, {year}',
+    '{month} {d1} {year} to {month} {d2} {year}', '{year}-{mm}-{dd1} to {year}-{mm}-{dd2}',
+    '{d1} {month} - {d2} {month} {year}', 'dates to be announced',
+]
+
+
+def legacy_find_date_range(text: str):
+    """TradeshowsScraper._find_date_range_in_text before the date engine."""
+    if not text:
+        return None, None
+    s = ' '.join(text.split())
+    repl = {
+        'Jan.': 'January', 'Feb.': 'February', 'Mar.': 'March', 'Apr.': 'April',
+        'Jun.': 'June', 'Jul.': 'July', 'Aug.': 'August', 'Sep.': 'September',
+        'Sept.': 'September', 'Oct.': 'October', 'Nov.': 'November', 'Dec.': 'December'
+    }
+    for k, v in repl.items():
+        s = s.replace(k, v)
+    patterns = [
+        r'([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s*[–\-to]{1,3}\s*(\d{1,2})(?:st|nd|rd|th)?,?\s*(\d{4})',
+        r'(\d{1,2})(?:st|nd|rd|th)?\s*[–\-to]{1,3}\s*(\d{1,2})(?:st|nd|rd|th)?\s+([A-Z][a-z]+)\s+(\d{4})',
+        r'([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s+(\d{4})\s+(?:to|–|-)\s+([A-Z][a-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?\s+(\d{4})',
+        r'(\d{4})-(\d{2})-(\d{2})\s+(?:to|–|-)\s+(\d{4})-(\d{2})-(\d{2})',
+        r'(\d{1,2})\s+([A-Z][a-z]+)\s*[–\-to]{1,3}\s*(\d{1,2})\s+([A-Z][a-z]+)\s+(\d{4})',
+    ]
+
+    def month_to_num(m: str) -> int:
+        return datetime.strptime(m, '%B').month
+
+    for i, pat in enumerate(patterns):
+        m = re.search(pat, s)
+        if not m:
+            continue
+        try:
+            g = m.groups()
+            if i == 0:
+                y, mo = int(g[3]), month_to_num(g[0])
+                return datetime(y, mo, int(g[1])).strftime('%Y-%m-%d'), datetime(y, mo, int(g[2])).strftime('%Y-%m-%d')
+            if i == 1:
+                y, mo = int(g[3]), month_to_num(g[2])
+                return datetime(y, mo, int(g[0])).strftime('%Y-%m-%d'), datetime(y, mo, int(g[1])).strftime('%Y-%m-%d')
+            if i == 2:
+                return (datetime(int(g[2]), month_to_num(g[0]), int(g[1])).strftime('%Y-%m-%d'),
+                        datetime(int(g[5]), month_to_num(g[3]), int(g[4])).strftime('%Y-%m-%d'))
+            if i == 3:
+                return (datetime(int(g[0]), int(g[1]), int(g[2])).strftime('%Y-%m-%d'),
+                        datetime(int(g[3]), int(g[4]), int(g[5])).strftime('%Y-%m-%d'))
+            y = int(g[4])
+            return (datetime(y, month_to_num(g[1]), int(g[0])).strftime('%Y-%m-%d'),
+                    datetime(y, month_to_num(g[3]), int(g[2])).strftime('%Y-%m-%d'))
+        except Exception:
+            continue
+    return None, None
+
+
+def page_texts(html: str):
+    return [t for t in parse_html(html).get_text('\n').split('\n') if t.strip()]
+
+
+def build_corpus(args):
+    texts = []
+    for path in CAPTURED_PAGES:
+        if Path(path).exists():
+            texts += page_texts(Path(path).read_text(encoding='utf-8', errors='replace'))
+    if args.archive:
+        archive = ReplayArchive(args.archive)
+        for url in archive.entries:
+            if 'tradeshows' in url:
+                texts += page_texts(archive.get(url)[2].decode('utf-8', errors='replace'))
+    rng = random.Random(0)
+    csv_path = Path('data/processed/tradeshows.csv')
+    if csv_path.exists():
+        with csv_path.open(encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                month = rng.randint(1, 12)
+                d1 = rng.randint(1, 24)
+                when = rng.choice(DATE_LAYOUTS).format(
+                    month=datetime(2000, month, 1).strftime('%B'), abbr=datetime(2000, month, 1).strftime('%b'),
+                    d1=d1, d2=d1 + 3, year=rng.choice([2025, 2026]), mm=f'{month:02d}', dd1=f'{d1:02d}', dd2=f'{d1 + 3:02d}')
+                texts.append(f"{row['event_name']} * Mini Website {row['city']}, {row['country']} {when} "
+                             f"Tradeshow for men's and women's ready-to-wear and accessories")
+    if not texts:
+        raise SystemExit('No tradeshow text found (captured pages, --archive or data/processed/tradeshows.csv)')
+    return [texts[i % len(texts)] for i in range(max(args.size, len(texts)))]
+
+
+def timed(fn, corpus, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark date-range extraction')
+    parser.add_argument('--archive', help='record/replay archive with tradeshow pages')
+    parser.add_argument('--size', type=int, default=20000, help='texts in the corpus')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args)
+    legacy_s, legacy = timed(lambda c: [legacy_find_date_range(t) for t in c], corpus, args.repeat)
+    engine_s, engine = timed(lambda c: [iso_range(find_date_range(t)) for t in c], corpus, args.repeat)
+    batch_s, _ = timed(find_date_ranges, corpus, args.repeat)
+
+    found_legacy = sum(1 for r in legacy if r[0])
+    found_engine = sum(1 for r in engine if r[0])
+    agree = sum(1 for a, b in zip(legacy, engine) if a == b)
+    print(f"{len(corpus)} texts ({len(set(corpus))} distinct)")
+    print(f"legacy : {legacy_s * 1000:8.1f} ms  ({legacy_s / len(corpus) * 1e6:.1f} us/text), {found_legacy} ranges")
+    print(f"engine : {engine_s * 1000:8.1f} ms  ({engine_s / len(corpus) * 1e6:.1f} us/text), {found_engine} ranges, "
+          f"{legacy_s / engine_s:.1f}x")
+    print(f"batch  : {batch_s * 1000:8.1f} ms  (find_date_ranges, repeated texts parsed once)")
+    print(f"identical results on {agree}/{len(corpus)} texts")
+
+    dated = [t for t, r in zip(corpus, legacy) if r[0]]
+    if dated:
+        legacy_s, _ = timed(lambda c: [legacy_find_date_range(t) for t in c], dated, args.repeat)
+        engine_s, _ = timed(lambda c: [iso_range(find_date_range(t)) for t in c], dated, args.repeat)
+        print(f"texts with a date only ({len(dated)}): legacy {legacy_s / len(dated) * 1e6:.1f} us/text, "
+              f"engine {engine_s / len(dated) * 1e6:.1f} us/text, {legacy_s / engine_s:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark: utils.fuzzy_dedupe on a synthetic lead set.
+
+    python scripts/bench_fuzzy_dedupe.py
+    python scripts/bench_fuzzy_dedupe.py --size 200000 --scaling
+
+Leads are generated on the fly, so the records are never all in memory. Company
+names are built from syllables plus common words ("Maison", "Studio", ...),
+with a city, country, website and phone each. A share of the rows (--dup-rate) are
+variants of an earlier company, as the scrapers produce them: "Maison X Paris" /
+"MAISON X" / "Maison X Showroom", accents, www./https:// websites, +33 / 0 phone
+prefixes, missing website or phone. The benchmark reports the time per phase,
+comparisons per record, peak RSS, and pairwise precision/recall against the
+generated truth. With --scaling the same run is repeated at 1/100 and 1/10 of
+--size to show how time per record stays flat.
+"""
+import argparse
+import random
+import resource
+import time
+from array import array
+
+import numpy as np
+
+try:
+    import _init_path  # noqa: F401
+except ImportError:
+    pass
+
+from utils.fuzzy_dedupe import FuzzyDeduper
+from utils.merge_leads import LeadMerger
+from utils.warehouse import Warehouse
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'ne', 'so', 'ti', 'va', 'zu', 'be', 'do', 'fa', 'gi', 'hu', 'je',
+             'ko', 'lu', 'ma', 'no', 'pe', 'qi', 'ri', 'sa', 'to', 'vi', 'wa', 'xe', 'ya', 'ze', 'an',
+             'el', 'is', 'or', 'um', 'ar', 'en', 'il', 'on', 'ur', 'ey']
+PREFIXES = ['', '', '', 'Maison', 'Studio', 'Atelier', 'House of', 'The', 'Collective']
+CITIES = [('Paris', 'France', '+33'), ('Milan', 'Italy', '+39'), ('London', 'United Kingdom', '+44'),
+          ('Berlin', 'Germany', '+49'), ('Madrid', 'Spain', '+34'), ('Tokyo', 'Japan', '+81'),
+          ('Seoul', 'South Korea', '+82'), ('Shanghai', 'China', '+86'), ('Copenhagen', 'Denmark', '+45'),
+          ('Amsterdam', 'Netherlands', '+31'), ('Antwerp', 'Belgium', '+32'), ('Stockholm', 'Sweden', '+46')]
+ACCENTS = str.maketrans({'e': 'é', 'a': 'à', 'o': 'ö', 'u': 'ü'})
+
+
+def company(entity: int, seed: int):
+    """The canonical lead of a generated company (the same for every call)."""
+    rng = random.Random(seed * 1_000_003 + entity)
+    # The first word spells the (scrambled) company id, so no two companies share a name
+    code, word = (entity * 2_654_435_761) % 2 ** 32, ''
+    while code or len(word) < 6:
+        code, digit = divmod(code, len(SYLLABLES))
+        word += SYLLABLES[digit]
+    words = [word.capitalize()] + [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+                                   for _ in range(rng.randint(0, 1))]
+    prefix = rng.choice(PREFIXES)
+    city, country, code = rng.choice(CITIES)
+    return {
+        'company_name': ' '.join(([prefix] if prefix else []) + words),
+        'words': words,
+        'city': city,
+        'country': country,
+        'website': f"https://www.{''.join(words).lower()}.com",
+        'email': f"info@{''.join(words).lower()}.com" if rng.random() < 0.4 else '',
+        'phone': f"{code} {rng.randint(1, 9)} {rng.randint(10000000, 99999999)}",
+    }
+
+
+def variant(lead, rng: random.Random):
+    """A second scrape of the same company, as a different source would write it."""
+    lead = dict(lead)
+    name = lead['company_name']
+    change = rng.randrange(7)
+    if change == 0:
+        name = f"{name} {lead['city']}"
+    elif change == 1:
+        name = name.upper()
+    elif change == 2:
+        name = f"{name} Showroom"
+    elif change == 3:
+        name = name.translate(ACCENTS)
+    elif change == 4:
+        name = ' '.join(lead['words'])
+    elif change == 5:
+        name = f"{name}."
+    lead['company_name'] = name
+    roll = rng.random()
+    if roll < 0.3:
+        lead['website'] = ''
+    elif roll < 0.6:
+        lead['website'] = lead['website'].replace('https://www.', '') + '/contact'
+    if rng.random() < 0.3:
+        lead['phone'] = ''
+    elif rng.random() < 0.5:
+        lead['phone'] = '0' + lead['phone'].split(' ', 1)[1]
+    return lead
+
+
+def leads(size: int, dup_rate: float, seed: int, truth=None):
+    """size generated leads; truth (an array) receives each lead's company id."""
+    rng = random.Random(seed)
+    entities = 0
+    for _ in range(size):
+        if entities and rng.random() < dup_rate:
+            entity = rng.randrange(entities)
+            lead = variant(company(entity, seed), rng)
+        else:
+            entity = entities
+            entities += 1
+            lead = company(entity, seed)
+        del lead['words']
+        if truth is not None:
+            truth.append(entity)
+        yield {'lead_type': 'Designer Showroom', 'source': 'synthetic', **lead}
+
+
+def pair_count(counts: np.ndarray) -> int:
+    counts = counts.astype(np.int64)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def pairwise_scores(labels: np.ndarray, truth: np.ndarray):
+    """Precision and recall of the record pairs put in one cluster."""
+    _, predicted = np.unique(labels, return_counts=True)
+    _, actual = np.unique(truth, return_counts=True)
+    _, both = np.unique(labels * (int(truth.max()) + 1) + truth, return_counts=True)
+    tp, pred, true = pair_count(both), pair_count(predicted), pair_count(actual)
+    return (tp / pred if pred else 1.0), (tp / true if true else 1.0)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(size: int, args, merger: LeadMerger):
+    truth = array('i')
+    deduper = FuzzyDeduper(max_block=args.max_block)
+    start = time.perf_counter()
+    labels = deduper.cluster(leads(size, args.dup_rate, args.seed, truth))
+    cluster_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    merged = sum(1 for _ in deduper.merged(leads(size, args.dup_rate, args.seed), labels, merger.merge_records))
+    merge_s = time.perf_counter() - start
+
+    precision, recall = pairwise_scores(labels, np.frombuffer(truth, dtype=np.int32).astype(np.int64))
+    stats = deduper.stats
+    print(f"{size:>9} leads: cluster {cluster_s:7.1f}s ({cluster_s / size * 1e6:5.1f} us/lead), "
+          f"merge {merge_s:6.1f}s ({merge_s / size * 1e6:5.1f} us/lead) -> {merged} leads, "
+          f"{stats['clusters']} clusters")
+    print(f"{'':>9}        {stats['blocks']} blocks ({stats['oversized_blocks']} oversized skipped), "
+          f"{stats['comparisons'] / size:.2f} comparisons/lead, precision {precision:.3f}, recall {recall:.3f}, "
+          f"peak RSS {peak_rss_mb():.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fuzzy lead deduplication')
+    parser.add_argument('--size', type=int, default=1_000_000, help='generated leads')
+    parser.add_argument('--dup-rate', type=float, default=0.2, help='share of leads that repeat an earlier company')
+    parser.add_argument('--max-block', type=int, default=None, help='FUZZY_MAX_BLOCK override')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scaling', action='store_true', help='also run at 1/100 and 1/10 of --size')
+    args = parser.parse_args()
+
+    # merge_records needs no stored state; an in-memory warehouse keeps the real one untouched
+    merger = LeadMerger(warehouse=Warehouse(':memory:'))
+    print(f"baseline RSS {peak_rss_mb():.0f} MB")
+    sizes = [args.size // 100, args.size // 10, args.size] if args.scaling else [args.size]
+    for size in sizes:
+        if size:
+            run(size, args, merger)
+
+
+if __name__ == '__main__':
+    main()
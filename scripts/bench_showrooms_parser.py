@@ -0,0 +1,115 @@
+"""
+Benchmark the multilabel showrooms parsers: lxml tree walk vs the DOTALL regex.
+
+    python scripts/bench_showrooms_parser.py page_paris.html page_milan.html
+    python scripts/bench_showrooms_parser.py --archive data/raw/replay
+    python scripts/bench_showrooms_parser.py --synthetic 400
+
+Pages come from saved HTML files, from a record/replay archive (every recorded
+multilabel-showrooms page), or are generated. Both parsers must return the same
+showroom names, table text (entities decoded) and links; the timing is the best of
+--repeat interleaved runs. Captured pages on which neither parser finds a showroom are
+reported, since matching there proves nothing.
+"""
+import argparse
+import html as htmllib
+import sys
+import time
+from pathlib import Path
+
+try:
+    import _init_path  # noqa: F401
+except ImportError:
+    pass
+
+from scrapers.extraction import etree, showroom_blocks, showroom_blocks_regex
+from scrapers.replay import ReplayArchive
+
+
+def synthetic_page(showrooms: int, spans: bool = True, tables: bool = True) -> str:
+    """A multilabel page shaped like modemonline's: nav/script noise, then one block per showroom.
+
+    Without spans the regex falls back to its second pattern; without tables (as on
+    empty Asia pages) every link scans to the end of the page looking for one.
+    """
+    noise = ''.join(f'<li><a href="/fashion/nav/{i}">Menu item {i}</a></li>' for i in range(300))
+    script = '<script>var config = {' + ','.join(f'"k{i}": "{"x" * 40}"' for i in range(500)) + '};</script>'
+    blocks = []
+    for i in range(showrooms):
+        blocks.append(
+            '<div class="row showroom"><div class="col-md-8">'
+            + (f'<span class="name">Showroom {i} & Partners</span> ' if spans else f'Showroom {i} & Partners ')
+            + f'<a href="/fashion/mini-web-sites/showroom-{i}">* Mini Website</a></div>'
+            f'<div class="collapse" id="sr{i}"><table class="details">'
+            f'<tr><td>Address</td><td>Via Montenapoleone {i}, 20121 Milano</td></tr>'
+            f'<tr><td>Phone</td><td>+39 02 {1000000 + i}</td></tr>'
+            f'<tr><td>Email</td><td><a href="mailto:info{i}@showroom.it">info{i}@showroom.it</a></td></tr>'
+            f'<tr><td>Brands</td><td>Brand A{i}, Brand B{i}, Brand C{i}</td></tr>'
+            f'<tr><td>Links</td><td><a href="https://instagram.com/showroom{i}">Instagram</a></td></tr>'
+            f'<tr><td>Sales campaign</td><td>Sales campaign Men from September 20 2025 to October 10 2025</td></tr>'
+            f'</table></div></div>')
+        if not tables:
+            blocks[-1] = blocks[-1].replace('table', 'dl')
+    return (f'<html><head>{script}</head><body><nav><ul>{noise}</ul></nav>'
+            f'<div class="container">{"".join(blocks)}</div>{script}</body></html>')
+
+
+def load_pages(args):
+    pages = [(path, Path(path).read_text(encoding='utf-8', errors='replace')) for path in args.files]
+    if args.archive:
+        archive = ReplayArchive(args.archive)
+        for url in archive.entries:
+            if 'multilabel-showrooms' in url:
+                status, headers, body = archive.get(url)
+                pages.append((url, body.decode('utf-8', errors='replace')))
+    if not pages:
+        n = args.synthetic
+        pages.append((f'synthetic, {n} showrooms', synthetic_page(n)))
+        pages.append((f'synthetic, {n} showrooms, no spans', synthetic_page(n, spans=False)))
+        pages.append((f'synthetic, {n} showrooms, no tables', synthetic_page(n, tables=False)))
+    return pages
+
+
+def best_of(parsers, html: str, repeat: int):
+    """Best time and last result per parser; runs are interleaved so load spikes hit both."""
+    best, results = [float('inf')] * len(parsers), [None] * len(parsers)
+    for _ in range(repeat):
+        for i, fn in enumerate(parsers):
+            start = time.perf_counter()
+            results[i] = fn(html)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the lxml and regex showroom parsers')
+    parser.add_argument('files', nargs='*', help='saved multilabel-showrooms pages')
+    parser.add_argument('--archive', help='record/replay archive directory to take pages from')
+    parser.add_argument('--synthetic', type=int, default=300, help='showrooms in the generated page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if etree is None:
+        print('[WARN] lxml is not installed; showroom_blocks() falls back to the regex parser')
+
+    mismatches = empty = 0
+    for name, html in load_pages(args):
+        (regex_s, tree_s), (regex_blocks, tree_blocks) = best_of(
+            [showroom_blocks_regex, showroom_blocks], html, args.repeat)
+        # The regex keeps entities encoded in table_text; the tree decodes them
+        same = [(b['name'], ' '.join(htmllib.unescape(b['table_text']).split()), b['links'])
+                for b in regex_blocks] == [(b['name'], b['table_text'], b['links']) for b in tree_blocks]
+        mismatches += not same
+        print(f"{name}: {len(html) / 1024:.0f} KB, {len(tree_blocks)} showrooms "
+              f"(regex {len(regex_blocks)}), regex {regex_s * 1000:.1f} ms, lxml {tree_s * 1000:.1f} ms, "
+              f"{regex_s / tree_s if tree_s else 0:.1f}x, records {'match' if same else 'DIFFER'}")
+        if not tree_blocks and not regex_blocks and not name.startswith('synthetic'):
+            empty += 1
+    if empty:
+        # Nothing was compared on these: a login wall, an error page or not a list page
+        print(f'[WARN] {empty} captured page(s) had no showrooms for either parser')
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
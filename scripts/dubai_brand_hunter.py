@@ -1,10 +1,14 @@
 import asyncio
 import random
 import urllib.parse
-import re
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.contact_extractor import extract_contacts
+from utils.checkpoint import CheckpointJournal
 from duckduckgo_search import DDGS
 
 # --- TARGETS ---
@@ -81,55 +85,55 @@ async def deep_scan_contact(page, url):
         await asyncio.sleep(2)
         content = await page.content()
         
-        # Regex
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        phone_pattern = r'(?:\+971|00971|0)?\s?(?:50|51|52|55|56|58|2|3|4|6|7|9|800)\s?\d{3}\s?\d{4}'
-        
-        emails = list(set(re.findall(email_pattern, content)))
-        phones = list(set(re.findall(phone_pattern, content)))
+        contacts = extract_contacts(content, default_country='AE')
+        emails = contacts.get('email', [])
+        phones = contacts.get('phone', [])
         
         # Socials
         socials = []
-        if "instagram.com" in content: socials.append("IG")
-        if "linkedin.com" in content: socials.append("LI")
+        if contacts.get('instagram'): socials.append("IG")
+        if contacts.get('linkedin'): socials.append("LI")
         
         return ", ".join(emails[:3]), ", ".join(phones[:3]), ", ".join(socials)
     except: return "", "", ""
 
 async def run_brand_hunter():
-    results = []
     output_file = "dubai_brand_leads.csv"
+    journal = CheckpointJournal(output_file)
     print(f"🚀 Starting Brand Hunter...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=False)
+            context = await browser.new_context()
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company in TARGETS:
-            print(f"[{company}] Processing...")
-            website = await get_website_hybrid(page, company)
-            email, phone, social = await deep_scan_contact(page, website)
+            for company in TARGETS:
+                if company in journal:
+                    continue
+                print(f"[{company}] Processing...")
+                website = await get_website_hybrid(page, company)
+                email, phone, social = await deep_scan_contact(page, website)
             
-            # Smart Links
-            encoded = urllib.parse.quote(company)
-            cmo = f"https://www.linkedin.com/search/results/people/?keywords=CMO%20{encoded}%20Dubai"
-            cto = f"https://www.linkedin.com/search/results/people/?keywords=CTO%20{encoded}%20Dubai"
+                # Smart Links
+                encoded = urllib.parse.quote(company)
+                cmo = f"https://www.linkedin.com/search/results/people/?keywords=CMO%20{encoded}%20Dubai"
+                cto = f"https://www.linkedin.com/search/results/people/?keywords=CTO%20{encoded}%20Dubai"
             
-            results.append({
-                "Company": company,
-                "Website": website,
-                "Generic_Email": email,
-                "Phone": phone,
-                "Social_Links": social,
-                "LinkedIn_CMO": cmo,
-                "LinkedIn_CTO": cto
-            })
-            pd.DataFrame(results).to_csv(output_file, index=False)
-            await asyncio.sleep(2)
+                journal.append({
+                    "Company": company,
+                    "Website": website,
+                    "Generic_Email": email,
+                    "Phone": phone,
+                    "Social_Links": social,
+                    "LinkedIn_CMO": cmo,
+                    "LinkedIn_CTO": cto
+                })
+                await asyncio.sleep(2)
             
-        await browser.close()
+            await browser.close()
+
     print("Done.")
 
 if __name__ == "__main__":
@@ -2,9 +2,13 @@ import asyncio
 import random
 import urllib.parse
 import re
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.checkpoint import CheckpointJournal
 
 # --- TARGETS: THE AESTHETIC 10 ---
 TARGETS = [
@@ -89,46 +93,47 @@ def extract_from_text(html, contacts):
         contacts["Phones"].add(p.strip())
 
 async def run_creative_contacts():
-    results = []
     output_file = "Dubai_Creative_Leads.csv"
+    journal = CheckpointJournal(output_file)
     print(f"🚀 Starting Creative Contact Hunter...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
-        context = await browser.new_context(ignore_https_errors=True)
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
+            context = await browser.new_context(ignore_https_errors=True)
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company in TARGETS:
-            print(f"[{company}] Processing...")
+            for company in TARGETS:
+                if company in journal:
+                    continue
+                print(f"[{company}] Processing...")
             
-            # 1. Official Website
-            website = await get_website_ddg(page, company)
+                # 1. Official Website
+                website = await get_website_ddg(page, company)
             
-            # 2. Deep Contact Scan
-            data = await extract_contacts(page, website)
+                # 2. Deep Contact Scan
+                data = await extract_contacts(page, website)
             
-            # 3. Creative Decision Maker Links
-            encoded = urllib.parse.quote(company)
-            link_creative = f"https://www.linkedin.com/search/results/people/?keywords=(Creative%20Director%20OR%20Art%20Director)%20{encoded}%20Dubai"
-            link_visual = f"https://www.linkedin.com/search/results/people/?keywords=Head%20of%20Visual%20{encoded}%20Dubai"
+                # 3. Creative Decision Maker Links
+                encoded = urllib.parse.quote(company)
+                link_creative = f"https://www.linkedin.com/search/results/people/?keywords=(Creative%20Director%20OR%20Art%20Director)%20{encoded}%20Dubai"
+                link_visual = f"https://www.linkedin.com/search/results/people/?keywords=Head%20of%20Visual%20{encoded}%20Dubai"
             
-            row = {
-                "Company": company,
-                "Website": website if website else "Not Found",
-                "Emails": ", ".join(list(data["Emails"])),
-                "Phones": ", ".join(list(data["Phones"])),
-                "Link_Creative_Dir": link_creative,
-                "Link_Visual_Head": link_visual
-            }
-            results.append(row)
-            print(f"    -> Found {len(data['Emails'])} Emails, {len(data['Phones'])} Phones")
+                row = {
+                    "Company": company,
+                    "Website": website if website else "Not Found",
+                    "Emails": ", ".join(list(data["Emails"])),
+                    "Phones": ", ".join(list(data["Phones"])),
+                    "Link_Creative_Dir": link_creative,
+                    "Link_Visual_Head": link_visual
+                }
+                journal.append(row)
+                print(f"    -> Found {len(data['Emails'])} Emails, {len(data['Phones'])} Phones")
+                await asyncio.sleep(random.uniform(1.5, 3))
             
-            pd.DataFrame(results).to_csv(output_file, index=False)
-            await asyncio.sleep(random.uniform(1.5, 3))
-            
-        await browser.close()
-    
+            await browser.close()
+
     print(f"✅ Data saved to {output_file}")
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
 import asyncio
 import random
 import urllib.parse
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.checkpoint import CheckpointJournal
 
 # --- TARGETS WITH SECTORS ---
 TARGETS = [
@@ -85,48 +89,48 @@ async def get_instagram_ddg(page, company):
         return "Error"
 
 async def run_culture_hunter():
-    results = []
     output_file = "output/Dubai_Culture_Leads.csv"
+    journal = CheckpointJournal(output_file)
     print(f"🚀 Starting Culture Hunter on {len(TARGETS)} Brands...")
     
-    async with async_playwright() as p:
-        # Launch with ignore_https_errors for resilience
-        browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
-        context = await browser.new_context(ignore_https_errors=True)
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            # Launch with ignore_https_errors for resilience
+            browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
+            context = await browser.new_context(ignore_https_errors=True)
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company, sector in TARGETS:
-            print(f"[{company}] ({sector}) Processing...")
+            for company, sector in TARGETS:
+                if company in journal:
+                    continue
+                print(f"[{company}] ({sector}) Processing...")
             
-            # 1. Discovery
-            website = await get_website_ddg(page, company)
-            await asyncio.sleep(random.uniform(2, 4))
+                # 1. Discovery
+                website = await get_website_ddg(page, company)
+                await asyncio.sleep(random.uniform(2, 4))
             
-            instagram = await get_instagram_ddg(page, company)
-            await asyncio.sleep(random.uniform(2, 4))
+                instagram = await get_instagram_ddg(page, company)
+                await asyncio.sleep(random.uniform(2, 4))
             
-            # 2. Smart Links
-            encoded = urllib.parse.quote(company)
-            link_creative = f"https://www.linkedin.com/search/results/people/?keywords=(Creative%20Director%20OR%20Art%20Director)%20{encoded}%20Dubai"
-            link_brand = f"https://www.linkedin.com/search/results/people/?keywords=(Head%20of%20Brand%20OR%20Brand%20Director)%20{encoded}%20Dubai"
-            link_marketing = f"https://www.linkedin.com/search/results/people/?keywords=Marketing%20Director%20{encoded}%20Dubai"
+                # 2. Smart Links
+                encoded = urllib.parse.quote(company)
+                link_creative = f"https://www.linkedin.com/search/results/people/?keywords=(Creative%20Director%20OR%20Art%20Director)%20{encoded}%20Dubai"
+                link_brand = f"https://www.linkedin.com/search/results/people/?keywords=(Head%20of%20Brand%20OR%20Brand%20Director)%20{encoded}%20Dubai"
+                link_marketing = f"https://www.linkedin.com/search/results/people/?keywords=Marketing%20Director%20{encoded}%20Dubai"
             
-            results.append({
-                "Company": company,
-                "Sector": sector,
-                "Website": website,
-                "Instagram_Link": instagram,
-                "LinkedIn_Creative_Search": link_creative,
-                "LinkedIn_Brand_Search": link_brand,
-                "LinkedIn_Marketing_Search": link_marketing
-            })
+                journal.append({
+                    "Company": company,
+                    "Sector": sector,
+                    "Website": website,
+                    "Instagram_Link": instagram,
+                    "LinkedIn_Creative_Search": link_creative,
+                    "LinkedIn_Brand_Search": link_brand,
+                    "LinkedIn_Marketing_Search": link_marketing
+                })
             
-            # Incremental Save
-            pd.DataFrame(results).to_csv(output_file, index=False)
-            
-        await browser.close()
-    
+            await browser.close()
+
     print(f"✅ Data saved to {output_file}")
 
 if __name__ == "__main__":
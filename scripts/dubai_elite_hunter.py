@@ -1,9 +1,13 @@
 import asyncio
 import random
 import urllib.parse
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.checkpoint import CheckpointJournal
 from duckduckgo_search import DDGS
 
 # --- TARGETS: THE ELITE 10 ---
@@ -102,44 +106,47 @@ async def get_instagram_handle(page, company):
     except: return "Error"
 
 async def run_elite_hunter():
-    results = []
     output_file = "Dubai_Elite_10_Refined.csv"
+    journal = CheckpointJournal(output_file)
     print(f"🚀 Starting Elite 10 Hunter...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=False)
+            context = await browser.new_context()
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company in TARGETS:
-            print(f"Analyzing: {company}...")
-            website = await get_website_hybrid(page, company)
-            instagram = await get_instagram_handle(page, company)
+            for company in TARGETS:
+                if company in journal:
+                    continue
+                print(f"Analyzing: {company}...")
+                website = await get_website_hybrid(page, company)
+                instagram = await get_instagram_handle(page, company)
             
-            email_format = "Unknown"
-            if website and "http" in website:
-                domain = urllib.parse.urlparse(website).netloc.replace("www.", "")
-                email_format = f"firstname.lastname@{domain} (Unverified)"
+                email_format = "Unknown"
+                if website and "http" in website:
+                    domain = urllib.parse.urlparse(website).netloc.replace("www.", "")
+                    email_format = f"firstname.lastname@{domain} (Unverified)"
             
-            encoded = urllib.parse.quote(company)
-            cmo_link = f"https://www.linkedin.com/search/results/people/?keywords=Chief%20Marketing%20Officer%20{encoded}%20Dubai"
-            brand_link = f"https://www.linkedin.com/search/results/people/?keywords=(Head%20of%20Brand%20OR%20Brand%20Director)%20{encoded}%20Dubai"
-            digital_link = f"https://www.linkedin.com/search/results/people/?keywords=(VP%20Digital%20OR%20Head%20of%20Digital)%20{encoded}%20Dubai"
+                encoded = urllib.parse.quote(company)
+                cmo_link = f"https://www.linkedin.com/search/results/people/?keywords=Chief%20Marketing%20Officer%20{encoded}%20Dubai"
+                brand_link = f"https://www.linkedin.com/search/results/people/?keywords=(Head%20of%20Brand%20OR%20Brand%20Director)%20{encoded}%20Dubai"
+                digital_link = f"https://www.linkedin.com/search/results/people/?keywords=(VP%20Digital%20OR%20Head%20of%20Digital)%20{encoded}%20Dubai"
             
-            results.append({
-                "Company": company,
-                "Website": website,
-                "Instagram_Link": instagram,
-                "LinkedIn_CMO_Search": cmo_link,
-                "LinkedIn_Brand_Search": brand_link,
-                "LinkedIn_Digital_Search": digital_link,
-                "Probable_Email_Format": email_format
-            })
-            pd.DataFrame(results).to_csv(output_file, index=False)
-            await asyncio.sleep(2)
+                journal.append({
+                    "Company": company,
+                    "Website": website,
+                    "Instagram_Link": instagram,
+                    "LinkedIn_CMO_Search": cmo_link,
+                    "LinkedIn_Brand_Search": brand_link,
+                    "LinkedIn_Digital_Search": digital_link,
+                    "Probable_Email_Format": email_format
+                })
+                await asyncio.sleep(2)
             
-        await browser.close()
+            await browser.close()
+
     print("Done.")
 
 if __name__ == "__main__":
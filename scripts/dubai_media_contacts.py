@@ -1,10 +1,14 @@
 import asyncio
 import random
 import urllib.parse
-import re
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.contact_extractor import extract_contacts as scan_contacts
+from utils.checkpoint import CheckpointJournal
 
 # --- TARGETS (10 Companies) ---
 TARGETS = [
@@ -80,56 +84,47 @@ async def extract_contacts(page, url):
     return contacts
 
 def extract_from_text(html, contacts):
-    # Email Regex
-    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', html)
-    # Filter junk emails
-    for e in emails:
-        e = e.lower()
-        if not any(x in e for x in ['.png', '.jpg', '.jpeg', '.gif', 'sentry.io', 'email.com', 'example.com']):
-            contacts["Emails"].add(e)
-            
-    # Phone Regex (Dubai + Generic)
-    # Matches: +971 4 123 4567, 04 123 4567, 800 1234
-    phones = re.findall(r'(?:\+971|00971|0)?\s?(?:50|51|52|55|56|58|2|3|4|6|7|9|800)\s?\d{3}\s?\d{4,5}', html)
-    for p in phones:
-        contacts["Phones"].add(p.strip())
+    # Emails (junk/asset names filtered) and phones (Dubai + international, E.164) in one pass
+    found = scan_contacts(html, default_country='AE')
+    contacts["Emails"].update(found.get('email', []))
+    contacts["Phones"].update(found.get('phone', []))
 
 async def run_media_contacts():
-    results = []
     output_file = "Dubai_Media_Contacts.csv"
+    journal = CheckpointJournal(output_file)
     print(f"🚀 Starting Contact Hunter on {len(TARGETS)} Companies...")
     
-    async with async_playwright() as p:
-        # Robust Browser Config
-        browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
-        context = await browser.new_context(ignore_https_errors=True)
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            # Robust Browser Config
+            browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
+            context = await browser.new_context(ignore_https_errors=True)
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company in TARGETS:
-            print(f"[{company}] Processing...")
-            
-            # 1. Find Website
-            website = await get_website_ddg(page, company)
+            for company in TARGETS:
+                if company in journal:
+                    continue
+                print(f"[{company}] Processing...")
             
-            # 2. Extract Info
-            data = await extract_contacts(page, website)
+                # 1. Find Website
+                website = await get_website_ddg(page, company)
             
-            row = {
-                "Company": company,
-                "Website": website if website else "Not Found",
-                "Emails": ", ".join(list(data["Emails"])),
-                "Phones": ", ".join(list(data["Phones"]))
-            }
-            results.append(row)
-            print(f"    -> Found {len(data['Emails'])} Emails, {len(data['Phones'])} Phones")
+                # 2. Extract Info
+                data = await extract_contacts(page, website)
             
-            # Incremental Save
-            pd.DataFrame(results).to_csv(output_file, index=False)
-            await asyncio.sleep(random.uniform(1.5, 3))
+                row = {
+                    "Company": company,
+                    "Website": website if website else "Not Found",
+                    "Emails": ", ".join(list(data["Emails"])),
+                    "Phones": ", ".join(list(data["Phones"]))
+                }
+                journal.append(row)
+                print(f"    -> Found {len(data['Emails'])} Emails, {len(data['Phones'])} Phones")
+                await asyncio.sleep(random.uniform(1.5, 3))
             
-        await browser.close()
-    
+            await browser.close()
+
     print(f"✅ Data saved to {output_file}")
 
 if __name__ == "__main__":
@@ -2,9 +2,13 @@ import asyncio
 import random
 import urllib.parse
 import re
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.checkpoint import CheckpointJournal
 
 # --- SUBSET TARGETS (10 Companies) ---
 TARGETS = [
@@ -96,49 +100,49 @@ async def analyze_instagram_followers(page, url):
         return "Error", False
 
 async def run_media_scout():
-    results = []
     output_file = "Dubai_Content_Survival_Leads.csv"
+    journal = CheckpointJournal(output_file)
     print(f"🚀 Starting Media Scout on {len(TARGETS)} Companies...")
     
-    async with async_playwright() as p:
-        # Ignore SSL errors to fix net::ERR_CERT_AUTHORITY_INVALID
-        browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
-        context = await browser.new_context(ignore_https_errors=True)
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            # Ignore SSL errors to fix net::ERR_CERT_AUTHORITY_INVALID
+            browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
+            context = await browser.new_context(ignore_https_errors=True)
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company in TARGETS:
-            print(f"[{company}] Processing...")
+            for company in TARGETS:
+                if company in journal:
+                    continue
+                print(f"[{company}] Processing...")
             
-            # 1. Find Instagram
-            ig_link = await get_instagram_ddg(page, company)
+                # 1. Find Instagram
+                ig_link = await get_instagram_ddg(page, company)
             
-            # 2. Analyze Stats
-            follower_count, is_high_vol = await analyze_instagram_followers(page, ig_link)
+                # 2. Analyze Stats
+                follower_count, is_high_vol = await analyze_instagram_followers(page, ig_link)
             
-            # 3. Smart Links (Content Roles)
-            encoded = urllib.parse.quote(company)
-            link_brand = f"https://www.linkedin.com/search/results/people/?keywords=(Brand%20Manager%20OR%20Brand%20Director)%20{encoded}%20Dubai"
-            link_content = f"https://www.linkedin.com/search/results/people/?keywords=(Head%20of%20Content%20OR%20Social%20Media%20Director)%20{encoded}%20Dubai"
-            link_mktg = f"https://www.linkedin.com/search/results/people/?keywords=Marketing%20Director%20{encoded}%20Dubai"
+                # 3. Smart Links (Content Roles)
+                encoded = urllib.parse.quote(company)
+                link_brand = f"https://www.linkedin.com/search/results/people/?keywords=(Brand%20Manager%20OR%20Brand%20Director)%20{encoded}%20Dubai"
+                link_content = f"https://www.linkedin.com/search/results/people/?keywords=(Head%20of%20Content%20OR%20Social%20Media%20Director)%20{encoded}%20Dubai"
+                link_mktg = f"https://www.linkedin.com/search/results/people/?keywords=Marketing%20Director%20{encoded}%20Dubai"
             
-            row = {
-                "Company": company,
-                "Instagram": ig_link if ig_link else "Not Found",
-                "Followers": follower_count,
-                "High_Volume_Lead": "YES" if is_high_vol else "No",
-                "Link_Brand_Mgr": link_brand,
-                "Link_Head_Content": link_content,
-                "Link_Marketing_Dir": link_mktg
-            }
-            results.append(row)
+                row = {
+                    "Company": company,
+                    "Instagram": ig_link if ig_link else "Not Found",
+                    "Followers": follower_count,
+                    "High_Volume_Lead": "YES" if is_high_vol else "No",
+                    "Link_Brand_Mgr": link_brand,
+                    "Link_Head_Content": link_content,
+                    "Link_Marketing_Dir": link_mktg
+                }
+                journal.append(row)
+                await asyncio.sleep(random.uniform(1.5, 3))
             
-            # Save
-            pd.DataFrame(results).to_csv(output_file, index=False)
-            await asyncio.sleep(random.uniform(1.5, 3))
-            
-        await browser.close()
-    
+            await browser.close()
+
     print(f"✅ Data saved to {output_file}")
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
 import asyncio
-import re
 import pandas as pd
 import urllib.parse
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.contact_extractor import normalize_phone
+from utils.checkpoint import CheckpointJournal
 
 # Files
 FILE_MEDIA = "output/Dubai_Media_Contacts.csv"
@@ -15,34 +20,17 @@ OUTPUT_FILE = "output/Dubai_Master_Leads.csv"
 SEEN_COMPANIES = set()
 
 def clean_phone_strict(text):
-    """Applies strict UAE phone validation."""
+    """Applies strict UAE phone validation (E.164, UAE numbers only)."""
     if not isinstance(text, str): return ""
     
-    valid_numbers = set()
+    valid_numbers = []
     # Split by comma if multiple numbers exist
-    parts = text.split(',')
-    
-    for p in parts:
-        # Remove non-digits
-        clean = re.sub(r'\D', '', p)
-        
-        # Normalize
-        if clean.startswith('971'): clean = '0' + clean[3:]
-        if clean.startswith('00971'): clean = '0' + clean[5:]
-        
-        # Validate
-        formatted = None
-        if len(clean) == 10 and clean.startswith(('050', '052', '054', '055', '056', '058')):
-            formatted = f"+971 {clean[1:3]} {clean[3:6]} {clean[6:]}"
-        elif len(clean) == 9 and clean.startswith(('02', '03', '04', '06', '07', '09')):
-            formatted = f"+971 {clean[1]} {clean[2:5]} {clean[5:]}"
-        elif clean.startswith('800') and len(clean) >= 7:
-            formatted = clean
-            
-        if formatted:
-            valid_numbers.add(formatted)
+    for p in text.split(','):
+        formatted = normalize_phone(p, 'AE')
+        if formatted and formatted.startswith('+971') and formatted not in valid_numbers:
+            valid_numbers.append(formatted)
             
-    return ", ".join(list(valid_numbers))
+    return ", ".join(valid_numbers)
 
 async def get_dubai_hq(page, company):
     """Finds Dubai HQ Location snippet using DDG."""
@@ -72,7 +60,7 @@ async def get_dubai_hq(page, company):
 async def run_master_compiler():
     print("🚀 Starting Master Compiler & HQ Locator...")
     
-    master_data = []
+    journal = CheckpointJournal(OUTPUT_FILE)
     
     # 1. Load Data
     try:
@@ -103,48 +91,47 @@ async def run_master_compiler():
     all_dfs = [df_media, df_creative, df_culture]
     combined = pd.concat(all_dfs, ignore_index=True)
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context()
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=False)
+            context = await browser.new_context()
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for index, row in combined.iterrows():
-            company = row.get('Company', 'Unknown')
-            if company in SEEN_COMPANIES: continue
-            SEEN_COMPANIES.add(company)
+            for index, row in combined.iterrows():
+                company = row.get('Company', 'Unknown')
+                if company in SEEN_COMPANIES: continue
+                SEEN_COMPANIES.add(company)
+                if company in journal: continue
             
-            print(f"[{company}] Processing...")
+                print(f"[{company}] Processing...")
             
-            # 1. Clean Phone
-            raw_phone = str(row.get('Phones', ''))
-            clean_phone = clean_phone_strict(raw_phone)
+                # 1. Clean Phone
+                raw_phone = str(row.get('Phones', ''))
+                clean_phone = clean_phone_strict(raw_phone)
             
-            # 2. Get HQ
-            hq = await get_dubai_hq(page, company)
-            print(f"    -> HQ: {hq}")
+                # 2. Get HQ
+                hq = await get_dubai_hq(page, company)
+                print(f"    -> HQ: {hq}")
             
-            # 3. Consolidate Row
-            new_row = {
-                "Company": company,
-                "Sector": row.get('Sector', 'Unknown'),
-                "Dubai_HQ": hq,
-                "Website": row.get('Website', ''),
-                "Clean_Phones": clean_phone,
-                "Emails": row.get('Emails', ''),
-                "Instagram": row.get('Scraped_Instagram', row.get('Instagram', '')),
-                # Preserve various link columns if they exist, else empty
-                "Link_Creative": row.get('Link_Creative_Dir', row.get('LinkedIn_Creative_Search', '')),
-                "Link_Brand": row.get('Link_Visual_Head', row.get('LinkedIn_Brand_Search', '')),
-                "Link_Marketing": row.get('LinkedIn_Marketing_Search', '')
-            }
-            master_data.append(new_row)
+                # 3. Consolidate Row
+                new_row = {
+                    "Company": company,
+                    "Sector": row.get('Sector', 'Unknown'),
+                    "Dubai_HQ": hq,
+                    "Website": row.get('Website', ''),
+                    "Clean_Phones": clean_phone,
+                    "Emails": row.get('Emails', ''),
+                    "Instagram": row.get('Scraped_Instagram', row.get('Instagram', '')),
+                    # Preserve various link columns if they exist, else empty
+                    "Link_Creative": row.get('Link_Creative_Dir', row.get('LinkedIn_Creative_Search', '')),
+                    "Link_Brand": row.get('Link_Visual_Head', row.get('LinkedIn_Brand_Search', '')),
+                    "Link_Marketing": row.get('LinkedIn_Marketing_Search', '')
+                }
+                journal.append(new_row)
             
-            # Incremental Save
-            pd.DataFrame(master_data).to_csv(OUTPUT_FILE, index=False)
-            
-        await browser.close()
-        
+            await browser.close()
+
     print(f"✅ Master Leads saved to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
 import asyncio
 import re
 import urllib.parse
-import pandas as pd
 import random
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from scrapers.interception import InterceptionPolicy
+from utils.checkpoint import CheckpointJournal
 
 TARGETS = [
     # Previously Existed
@@ -140,51 +145,51 @@ async def run_sole_hunter():
     # Remove duplicates
     unique_targets = list(set(TARGETS))
     print(f"🚀 Starting Sole DXB Hunter on {len(unique_targets)} targets...")
-    results = []
+    journal = CheckpointJournal(OUTPUT_FILE, key="Company Name")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
-        context = await browser.new_context(ignore_https_errors=True)
+    with journal:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=False, args=['--ignore-certificate-errors'])
+            context = await browser.new_context(ignore_https_errors=True)
         
-        # Block heavy resources
-        await context.route("**/*", lambda route: route.abort() 
-            if route.request.resource_type in ["image", "media", "font", "stylesheet"] 
-            else route.continue_())
+            # Block heavy resources and trackers
+            interception = InterceptionPolicy.from_settings().extend(resource_types=["stylesheet"])
+            await context.route("**/*", interception.handle_route_async)
             
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for company in unique_targets:
-            print(f"[{company}] Processing...")
+            for company in unique_targets:
+                if company in journal:
+                    continue
+                print(f"[{company}] Processing...")
             
-            # 1. Discovery
-            web, ig = await find_website_instagram(page, company)
-            print(f"    -> Web: {web} | IG: {ig}")
+                # 1. Discovery
+                web, ig = await find_website_instagram(page, company)
+                print(f"    -> Web: {web} | IG: {ig}")
             
-            # 2. Phone Scan
-            phone = ""
-            if web != "Not Found":
-                phone = await scrape_phone(page, web)
-                print(f"    -> Phone: {phone}")
+                # 2. Phone Scan
+                phone = ""
+                if web != "Not Found":
+                    phone = await scrape_phone(page, web)
+                    print(f"    -> Phone: {phone}")
             
-            # 3. Location (Smart)
-            loc = await find_location(page, company)
-            print(f"    -> Loc: {loc}")
+                # 3. Location (Smart)
+                loc = await find_location(page, company)
+                print(f"    -> Loc: {loc}")
             
-            results.append({
-                "Company Name": company,
-                "Website Link": web,
-                "Social Media Link": ig,
-                "Location": loc,
-                "Phone Number": phone
-            })
+                journal.append({
+                    "Company Name": company,
+                    "Website Link": web,
+                    "Social Media Link": ig,
+                    "Location": loc,
+                    "Phone Number": phone
+                })
+                await asyncio.sleep(random.uniform(1, 2))
             
-            # Incremental Save
-            pd.DataFrame(results).to_csv(OUTPUT_FILE, index=False)
-            await asyncio.sleep(random.uniform(1, 2))
-            
-        await browser.close()
-    
+            await browser.close()
+
+    print(f"Interception: {interception.stats.summary()}")
     print(f"✅ Data saved to {OUTPUT_FILE}")
 
 if __name__ == "__main__":
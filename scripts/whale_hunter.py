@@ -2,9 +2,13 @@ import asyncio
 import random
 import os
 import urllib.parse
-import pandas as pd
 from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
+try:
+    import _init_path
+except ImportError:
+    pass
+from utils.checkpoint import CheckpointJournal
 from duckduckgo_search import DDGS 
 
 # --- THE "WHALE" LIST ---
@@ -121,54 +125,54 @@ async def analyze_company_site(page, url):
     return data
 
 async def generate_whale_dataset():
-    results = []
     output_file = "dubai_whales_analyzed.csv"
+    journal = CheckpointJournal(output_file, key='Company_Name')
     
     print(f"🚀 Starting Playwright Deep Analysis (Smart Hybrid Mode) on {len(TARGET_COMPANIES)} Companies...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False) 
-        context = await browser.new_context()
-        page = await context.new_page()
-        await Stealth().apply_stealth_async(page)
+    with journal:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=False) 
+            context = await browser.new_context()
+            page = await context.new_page()
+            await Stealth().apply_stealth_async(page)
         
-        for i, company in enumerate(TARGET_COMPANIES):
-            print(f"[{i+1}/{len(TARGET_COMPANIES)}] Analyzing: {company}...")
+            for i, company in enumerate(TARGET_COMPANIES):
+                if company in journal:
+                    continue
+                print(f"[{i+1}/{len(TARGET_COMPANIES)}] Analyzing: {company}...")
             
-            # 1. Find Website (DDG -> Google w/ Pause)
-            website = await get_website_hybrid(page, company)
+                # 1. Find Website (DDG -> Google w/ Pause)
+                website = await get_website_hybrid(page, company)
             
-            # 2. Analyze
-            site_data = await analyze_company_site(page, website)
+                # 2. Analyze
+                site_data = await analyze_company_site(page, website)
             
-            # 3. Smart Links
-            encoded_name = urllib.parse.quote(company)
-            ceo_search = f"https://www.linkedin.com/search/results/people/?keywords=CEO%20{encoded_name}%20Dubai"
-            cto_search = f"https://www.linkedin.com/search/results/people/?keywords=CTO%20{encoded_name}%20Dubai"
+                # 3. Smart Links
+                encoded_name = urllib.parse.quote(company)
+                ceo_search = f"https://www.linkedin.com/search/results/people/?keywords=CEO%20{encoded_name}%20Dubai"
+                cto_search = f"https://www.linkedin.com/search/results/people/?keywords=CTO%20{encoded_name}%20Dubai"
             
-            # 4. Industry Tier
-            industry = "Corporate"
-            if company in TARGET_COMPANIES[:17]: industry = "Construction (High Priority)"
-            elif company in TARGET_COMPANIES[17:26]: industry = "Logistics (High Priority)"
-            elif company in TARGET_COMPANIES[26:36]: industry = "Retail (Med Priority)"
+                # 4. Industry Tier
+                industry = "Corporate"
+                if company in TARGET_COMPANIES[:17]: industry = "Construction (High Priority)"
+                elif company in TARGET_COMPANIES[17:26]: industry = "Logistics (High Priority)"
+                elif company in TARGET_COMPANIES[26:36]: industry = "Retail (Med Priority)"
             
-            row = {
-                "Company_Name": company,
-                "Industry_Tier": industry,
-                "Website": website,
-                "Research_CEO_Link": ceo_search,
-                "Research_CTO_Link": cto_search,
-                **site_data
-            }
-            results.append(row)
+                row = {
+                    "Company_Name": company,
+                    "Industry_Tier": industry,
+                    "Website": website,
+                    "Research_CEO_Link": ceo_search,
+                    "Research_CTO_Link": cto_search,
+                    **site_data
+                }
+                journal.append(row)
             
-            # INCREMENTAL SAVE
-            pd.DataFrame(results).to_csv(output_file, index=False)
+                await asyncio.sleep(random.uniform(1, 2))
             
-            await asyncio.sleep(random.uniform(1, 2))
-            
-        await browser.close()
-    
+            await browser.close()
+
     print(f"✅ Done! Data saved to '{output_file}'")
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+"""
+Append-only checkpoint journal for per-company scripts.
+
+The hunter scripts (scripts/sole_hunter.py, scripts/dubai_*.py, ...) process a
+list of companies one by one. Instead of rewriting the whole output CSV after
+every company, each finished record is appended as one JSON line to
+`<output>.journal.jsonl`, so the I/O per company stays constant however long the
+list is. On restart the journal is read back and companies already in it are
+skipped; only their keys are kept in memory. compact() streams the journal into
+the final CSV (through utils/csv_sink.py) and removes it.
+
+    with CheckpointJournal(OUTPUT_FILE, key='Company') as journal:
+        for company in TARGETS:
+            if company in journal:
+                continue
+            journal.append({'Company': company, ...})
+
+Leaving the `with` block compacts the journal, also when the run is interrupted
+(Ctrl+C, a crash): the CSV then holds the companies done so far and the journal
+is kept, so the next run resumes from it. A line cut short by a crash is
+ignored; that company is simply processed again.
+"""
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Set
+
+from utils.csv_sink import CsvSink
+
+
+def _jsonable(value: Any) -> Any:
+    """json.dumps fallback for numpy scalars and other non-JSON values (pandas rows)."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class CheckpointJournal:
+    """One JSON line per finished record, keyed by record[key].
+
+    Args:
+        output: final CSV written by compact()
+        key: record field identifying a company
+        journal: journal path, defaults to `<output>.journal.jsonl`
+    """
+
+    def __init__(self, output: str, key: str = 'Company', journal: Optional[str] = None):
+        self.output = Path(output)
+        self.key = key
+        self.path = Path(journal) if journal else self.output.with_name(self.output.name + '.journal.jsonl')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.done: Set[str] = set()
+        self._load()
+        self._truncate_partial_line()
+        self.resumed = len(self.done)
+        if self.resumed:
+            print(f"[INFO] Resuming from {self.path}: {self.resumed} records already done")
+        self._file = self.path.open('a', encoding='utf-8')
+
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with self.path.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Partial last line of a crashed run
+                    continue
+
+    def _load(self):
+        for record in self._records():
+            self.done.add(str(record.get(self.key)))
+
+    def _truncate_partial_line(self):
+        """Cut a crashed run's unterminated last line, so the next record starts on its own line."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with self.path.open('rb+') as f:
+            end = f.seek(0, 2)
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            # Scan back from the end for the last complete line
+            position = end
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                position = start
+            f.truncate(0)
+
+    def __contains__(self, key: Any) -> bool:
+        return str(key) in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def append(self, record: Dict[str, Any]):
+        """Journal one finished record (flushed, so it survives a crash of the script)."""
+        if self._file is None:
+            raise ValueError(f"{self.path} is closed")
+        self._file.write(json.dumps(record, ensure_ascii=False, default=_jsonable) + '\n')
+        self._file.flush()
+        self.done.add(str(record.get(self.key)))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def compact(self, fieldnames: Optional[Sequence[str]] = None, keep_journal: bool = False) -> int:
+        """Write the journaled records to the output CSV in journal order; returns the number of rows.
+
+        A key journaled twice is written once (first record). The journal is removed
+        afterwards (unless keep_journal), so the next run starts over.
+        """
+        self.close()
+        written: Set[str] = set()
+        with CsvSink(str(self.output), fieldnames=fieldnames) as sink:
+            for record in self._records():
+                key = str(record.get(self.key))
+                if key in written:
+                    continue
+                written.add(key)
+                # NaN from pandas rows is written as an empty cell, as DataFrame.to_csv did
+                sink.write({field: '' if isinstance(value, float) and math.isnan(value) else value
+                            for field, value in record.items()})
+        if not keep_journal:
+            self.path.unlink(missing_ok=True)
+        return sink.rows_written
+
+    def __enter__(self) -> 'CheckpointJournal':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Compact; an interrupted run keeps the journal to resume from."""
+        rows = self.compact(keep_journal=exc_type is not None)
+        if exc_type is not None:
+            print(f"[WARN] Interrupted: {rows} records so far in {self.output}; "
+                  f"the next run resumes from {self.path}")
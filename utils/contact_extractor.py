@@ -0,0 +1,296 @@
+"""
+Contact extraction shared by scrapers and lead scripts.
+
+Emails, phone numbers and social profiles come out of one compiled alternation,
+so a document is scanned once whatever is being looked for. Every match is typed
+and normalized:
+
+    email       lowercased address (asset names like logo@2x.png and placeholder
+                domains are dropped)
+    phone       E.164 (+971501234567); numbers without +/00 need a country
+    instagram   handle (tiktok and twitter too)
+    facebook    page name
+    linkedin    company/<name> or in/<name>
+
+    extract_contacts(html, default_country='UAE')
+        -> {'email': ['info@brand.ae'], 'phone': ['+97141234567'], 'instagram': ['brand'], ...}
+    normalize_phone('+33 (0)1 42 60 00 00')   -> '+33142600000'
+    normalize_phone('04 123 4567', 'AE')      -> '+97141234567'
+    extract_contacts_bulk(pages, default_country='France')   -> one dict per page, parsed across cores
+"""
+import re
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+# ISO code -> (calling code, national trunk prefix, national significant number).
+# Numbers written nationally must carry the trunk prefix, except those in
+# NATIONAL_WITHOUT_TRUNK (toll-free, or a trunk prefix that is optional).
+PHONE_RULES: Dict[str, tuple] = {
+    'AE': ('971', '0', r'5[024568]\d{7}|[2-79]\d{7}|800\d{2,9}'),
+    'FR': ('33', '0', r'[1-9]\d{8}'),
+    'IT': ('39', '', r'0\d{5,10}|3\d{8,9}'),
+    'GB': ('44', '0', r'[1-9]\d{8,9}'),
+    'DE': ('49', '0', r'[1-9]\d{5,13}'),
+    'ES': ('34', '', r'[5-9]\d{8}'),
+    'PT': ('351', '', r'[29]\d{8}'),
+    'NL': ('31', '0', r'[1-9]\d{8}'),
+    'BE': ('32', '0', r'[1-9]\d{7,8}'),
+    'CH': ('41', '0', r'[1-9]\d{8}'),
+    'AT': ('43', '0', r'[1-9]\d{3,12}'),
+    'DK': ('45', '', r'[2-9]\d{7}'),
+    'SE': ('46', '0', r'[1-9]\d{6,9}'),
+    'NO': ('47', '', r'[2-9]\d{7}'),
+    'FI': ('358', '0', r'[1-9]\d{4,11}'),
+    'IE': ('353', '0', r'[1-9]\d{6,9}'),
+    'PL': ('48', '', r'[1-9]\d{8}'),
+    'CZ': ('420', '', r'[2-9]\d{8}'),
+    'HU': ('36', '06', r'[1-9]\d{7,8}'),
+    'GR': ('30', '', r'[2-9]\d{9}'),
+    'UA': ('380', '0', r'[3-9]\d{8}'),
+    'TR': ('90', '0', r'[2-5]\d{9}'),
+    'US': ('1', '1', r'[2-9]\d{2}[2-9]\d{6}'),
+    'JP': ('81', '0', r'[1-9]\d{8,9}'),
+    'KR': ('82', '0', r'[1-9]\d{7,9}'),
+    'CN': ('86', '0', r'1[3-9]\d{9}|[2-9]\d{9,10}'),
+    'TW': ('886', '0', r'[2-9]\d{7,8}'),
+    'HK': ('852', '', r'[2-9]\d{7}'),
+    'SG': ('65', '', r'[3689]\d{7}'),
+    'TH': ('66', '0', r'[2-9]\d{7,8}'),
+    'IN': ('91', '0', r'[6-9]\d{9}|[1-5]\d{9}'),
+    'ID': ('62', '0', r'[2-9]\d{7,11}'),
+    'MY': ('60', '0', r'[1-9]\d{7,9}'),
+    'PH': ('63', '0', r'[2-9]\d{7,9}'),
+    'VN': ('84', '0', r'[2-9]\d{8,9}'),
+    'SA': ('966', '0', r'5\d{8}|1\d{7}|800\d{7}'),
+    'QA': ('974', '', r'[3-7]\d{7}'),
+    'KW': ('965', '', r'[12569]\d{7}'),
+    'AU': ('61', '0', r'[2-478]\d{8}'),
+}
+NATIONAL_WITHOUT_TRUNK = {'AE': r'800\d{2,9}', 'US': r'[2-9]\d{2}[2-9]\d{6}'}
+_NSN = {iso: re.compile(pattern) for iso, (_, _, pattern) in PHONE_RULES.items()}
+_NO_TRUNK = {iso: re.compile(pattern) for iso, pattern in NATIONAL_WITHOUT_TRUNK.items()}
+_BY_CALLING_CODE = {cc: iso for iso, (cc, _, _) in PHONE_RULES.items()}
+
+# Country names used across the scrapers/settings -> ISO code
+COUNTRY_CODES: Dict[str, str] = {
+    'uae': 'AE', 'united arab emirates': 'AE', 'dubai': 'AE', 'france': 'FR', 'italy': 'IT',
+    'united kingdom': 'GB', 'uk': 'GB', 'germany': 'DE', 'spain': 'ES', 'portugal': 'PT',
+    'netherlands': 'NL', 'belgium': 'BE', 'switzerland': 'CH', 'austria': 'AT', 'denmark': 'DK',
+    'sweden': 'SE', 'norway': 'NO', 'finland': 'FI', 'ireland': 'IE', 'poland': 'PL',
+    'czech republic': 'CZ', 'hungary': 'HU', 'greece': 'GR', 'ukraine': 'UA', 'turkey': 'TR',
+    'usa': 'US', 'united states': 'US', 'japan': 'JP', 'south korea': 'KR', 'china': 'CN',
+    'taiwan': 'TW', 'hong kong': 'HK', 'singapore': 'SG', 'thailand': 'TH', 'india': 'IN',
+    'indonesia': 'ID', 'malaysia': 'MY', 'philippines': 'PH', 'vietnam': 'VN',
+    'saudi arabia': 'SA', 'qatar': 'QA', 'kuwait': 'KW', 'australia': 'AU',
+}
+
+# Emails that are really asset names (logo@2x.png) or placeholders
+ASSET_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'avif', 'ico', 'bmp', 'tif', 'tiff',
+                    'css', 'js', 'mp4', 'woff', 'woff2'}
+PLACEHOLDER_DOMAINS = ('example.com', 'test.com', 'domain.com', 'email.com', 'yourdomain.com',
+                       'sentry.io', 'wixpress.com', 'sentry-next.wixpress.com')
+
+# Profile paths that are not profiles (share links, posts, tracking pixels)
+SOCIAL_NON_PROFILES = {
+    'instagram': {'p', 'reel', 'reels', 'explore', 'stories', 'accounts', 'tv', 'share', 'about', 'developer'},
+    'facebook': {'sharer', 'sharer.php', 'share.php', 'share', 'tr', 'plugins', 'dialog', 'login',
+                 'profile.php', 'events', 'groups', 'watch', 'hashtag', 'policies', 'help'},
+    'twitter': {'share', 'intent', 'home', 'hashtag', 'i', 'search', 'login', 'privacy', 'tos'},
+    'tiktok': {'embed', 'tag', 'discover', 'music', 'legal'},
+}
+LINKEDIN_SECTIONS = {'company', 'in', 'school', 'showcase'}
+# @words that are CSS at-rules / JSON-LD keys rather than Instagram mentions
+MENTION_STOPWORDS = {'media', 'import', 'font-face', 'font', 'keyframes', 'charset', 'supports', 'page',
+                     'namespace', 'layer', 'container', 'context', 'type', 'id', 'graph', 'vocab'}
+
+# Every branch starts at one of a few characters, so the scan jumps between
+# '@', '.', '+' and digits instead of trying each pattern at every position;
+# email local parts and social hosts are read backwards from the match.
+CONTACT_RE = re.compile(
+    r'[@.+\d]'
+    # info@brand.com / @brand: what follows the @
+    r'(?:(?<=@)(?P<at>[\w.-]+)'
+    # instagram.com/brand, linkedin.com/company/brand: the path after .com/
+    r'|(?<=\.)com/(?P<path>@?[\w.%-]+(?:/[\w.%-]+)?)'
+    # +971 4 123 4567, 0033 1 42 60 00 00, (212) 555-1234, 02.12.34.56.78
+    r'|(?<=[+\d])(?<![\w+.,/-].)(?P<phone>[\d \t().-]{5,21}\d)(?![\w@]))'
+)
+_LOCAL_PART_RE = re.compile(r'[\w.%+-]+$')
+_DOMAIN_RE = re.compile(r'[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+_MENTION_RE = re.compile(r'\w(?:[\w.]{0,28}\w)?')
+_SITE_RE = re.compile(r'(?<![\w.-])(?:https?://)?(?:[a-z]{2,3}\.|[a-z]{2}-[a-z]{2}\.)?'
+                      r'(instagram|facebook|linkedin|tiktok|twitter|x)$')
+_NON_DIGITS_RE = re.compile(r'\D')
+_URL_ESCAPE_RE = re.compile(r'^(?:%[0-9A-Fa-f]{2})+')
+_TWITTER_SITES = ('twitter', 'x')
+
+
+class Contact(NamedTuple):
+    """One typed match: kind, normalized value, the text it came from and where."""
+    kind: str
+    value: str
+    raw: str
+    start: int
+
+
+def country_code(country: Optional[str]) -> Optional[str]:
+    """ISO code for a country name or code ('France', 'UAE', 'fr'), or None."""
+    if not country:
+        return None
+    key = country.strip()
+    if key.upper() in PHONE_RULES:
+        return key.upper()
+    return COUNTRY_CODES.get(key.lower())
+
+
+def normalize_phone(raw: str, default_country: Optional[str] = None) -> Optional[str]:
+    """E.164 form of a phone number, or None if it is not a valid number.
+
+    Numbers without +/00 are read with default_country's rules (trunk prefix,
+    valid lengths and leading digits); without a country they are rejected.
+    """
+    if not raw:
+        return None
+    # +33 (0)1 ... carries the trunk prefix in brackets
+    digits = _NON_DIGITS_RE.sub('', raw.replace('(0)', ''))
+    international = raw.lstrip().startswith('+')
+    if not international and digits.startswith('00'):
+        digits, international = digits[2:], True
+    if international:
+        for n in (1, 2, 3):
+            iso = _BY_CALLING_CODE.get(digits[:n])
+            if iso:
+                return _national_to_e164(iso, digits[n:], international=True)
+        # Country without rules: only the E.164 length limits apply
+        return '+' + digits if 8 <= len(digits) <= 15 else None
+    iso = country_code(default_country)
+    if iso is None:
+        return None
+    cc = PHONE_RULES[iso][0]
+    # 971501234567 written without the +
+    if digits.startswith(cc) and _NSN[iso].fullmatch(digits[len(cc):]):
+        return '+' + digits
+    if iso in _NO_TRUNK and _NO_TRUNK[iso].fullmatch(digits):
+        return '+' + cc + digits
+    return _national_to_e164(iso, digits, international=False)
+
+
+def _national_to_e164(iso: str, national: str, international: bool) -> Optional[str]:
+    cc, trunk, _ = PHONE_RULES[iso]
+    pattern = _NSN[iso]
+    # After the country code the number stands as is; nationally it needs the trunk prefix
+    if (international or not trunk) and pattern.fullmatch(national):
+        return '+' + cc + national
+    # 04 123 4567, or the trunk prefix kept after the country code (+971 050 ...)
+    if trunk and national.startswith(trunk) and pattern.fullmatch(national[len(trunk):]):
+        return '+' + cc + national[len(trunk):]
+    return None
+
+
+def _email(local: str, domain: str) -> Optional[str]:
+    local = _URL_ESCAPE_RE.sub('', local).lstrip('.').lower()
+    domain = domain.lower()
+    if not local or domain.rsplit('.', 1)[-1] in ASSET_EXTENSIONS:
+        return None
+    if '.' in local and local.rsplit('.', 1)[-1] in ASSET_EXTENSIONS:
+        return None
+    if domain.endswith(PLACEHOLDER_DOMAINS):
+        return None
+    return f"{local}@{domain}"
+
+
+def _social(site: str, path: str) -> Optional[tuple]:
+    parts = path.rstrip('.').split('/')
+    first = parts[0].lower()
+    if site == 'linkedin':
+        if first in LINKEDIN_SECTIONS and len(parts) > 1 and parts[1]:
+            return 'linkedin', f"{first}/{parts[1].lower()}"
+        return None
+    kind = 'twitter' if site in _TWITTER_SITES else site
+    handle = first.lstrip('@')
+    if not handle or handle in SOCIAL_NON_PROFILES[kind]:
+        return None
+    return kind, handle
+
+
+def iter_contacts(text: str, default_country: Optional[str] = None, mentions: bool = False) -> Iterator[Contact]:
+    """Every valid contact in text, in order, from one scan.
+
+    mentions: also read bare @handles as Instagram (short listing texts; in raw
+    HTML they are mostly CSS/JSON keywords, so off by default).
+    """
+    if not text:
+        return
+    for m in CONTACT_RE.finditer(text):
+        start = m.start()
+        kind = m.lastgroup
+        if kind == 'phone':
+            raw = m.group(0)
+            # '12.5 13.2 ...' (SVG paths, CSS) is not a phone number
+            if '.' in raw and (' ' in raw or '\t' in raw):
+                continue
+            value = normalize_phone(raw, default_country)
+            if value:
+                yield Contact('phone', value, raw.rstrip(), start)
+        elif kind == 'at':
+            local = _LOCAL_PART_RE.search(text, max(0, start - 64), start)
+            if local:
+                domain = _DOMAIN_RE.match(m.group('at'))
+                value = _email(local.group(0), domain.group(0)) if domain else None
+                if value:
+                    yield Contact('email', value, text[local.start():start + 1 + domain.end()], local.start())
+            elif mentions and (start == 0 or text[start - 1] != '@'):
+                handle = _MENTION_RE.match(m.group('at'))
+                if handle and handle.group(0).lower() not in MENTION_STOPWORDS:
+                    yield Contact('instagram', handle.group(0).lower(), '@' + handle.group(0), start)
+        else:
+            site = _SITE_RE.search(text, max(0, start - 40), start)
+            if site:
+                found = _social(site.group(1), m.group('path'))
+                if found:
+                    yield Contact(found[0], found[1], text[site.start():m.end()], site.start())
+
+
+def extract_contacts(text: str, default_country: Optional[str] = None,
+                     mentions: bool = False) -> Dict[str, List[str]]:
+    """Distinct normalized values per kind, in order of first appearance."""
+    found: Dict[str, List[str]] = {}
+    seen = set()
+    for contact in iter_contacts(text, default_country, mentions):
+        key = (contact.kind, contact.value)
+        if key not in seen:
+            seen.add(key)
+            found.setdefault(contact.kind, []).append(contact.value)
+    return found
+
+
+def first_contact(text: str, kind: str, default_country: Optional[str] = None, mentions: bool = False) -> str:
+    """First value of one kind in text, or ''."""
+    for contact in iter_contacts(text, default_country, mentions):
+        if contact.kind == kind:
+            return contact.value
+    return ''
+
+
+def extract_contacts_bulk(docs: Iterable[str], default_country: Union[None, str, Sequence[Optional[str]]] = None,
+                          mentions: bool = False, workers: Optional[int] = None) -> List[Dict[str, List[str]]]:
+    """extract_contacts() over many documents, spread over a ParsePool.
+
+    default_country is one country for every document or one per document.
+    """
+    from utils.parse_pool import ParsePool
+
+    docs = list(docs)
+    pool = ParsePool(workers)
+    try:
+        if default_country is None or isinstance(default_country, str):
+            fn = partial(extract_contacts, default_country=default_country, mentions=mentions)
+            return list(pool.map(fn, docs, chunksize=max(1, len(docs) // (pool.workers * 4))))
+        fn = partial(_extract_with_country, mentions=mentions)
+        return list(pool.map(fn, docs, list(default_country), chunksize=max(1, len(docs) // (pool.workers * 4))))
+    finally:
+        pool.close()
+
+
+def _extract_with_country(text: str, country: Optional[str], mentions: bool = False) -> Dict[str, List[str]]:
+    return extract_contacts(text, country, mentions)
@@ -1,29 +1,23 @@
 import csv
-from typing import List, Dict
+from typing import List, Dict, Iterable
 from config.settings import CSV_ENCODING
+from utils.csv_sink import CsvSink
 
 
 class CSVExporter:
     def __init__(self, encoding: str = CSV_ENCODING):
         self.encoding = encoding
 
-    def export_to_csv(self, data: List[Dict], filename: str, mode: str = 'w'):
-        if not data:
-            return
-        keys = data[0].keys()
-        with open(filename, mode, encoding=self.encoding, newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            if mode == 'w':
-                writer.writeheader()
-            for row in data:
-                writer.writerow(row)
+    def export_to_csv(self, data: Iterable[Dict], filename: str, mode: str = 'w'):
+        # Columns are the union of every record's keys, not just the first one's
+        with CsvSink(filename, mode=mode, encoding=self.encoding) as sink:
+            sink.write_many(data)
+        return sink.rows_written
 
     def merge_csv_files(self, input_files: List[str], output_file: str):
-        # Minimal merge implementation: read each and append; dedupe to be added
-        combined = []
-        for fpath in input_files:
-            with open(fpath, 'r', encoding=self.encoding) as f:
-                reader = csv.DictReader(f)
-                for r in reader:
-                    combined.append(r)
-        self.export_to_csv(combined, output_file, mode='w')
+        # Minimal merge implementation: stream each file into one sink; dedupe to be added
+        with CsvSink(output_file, encoding=self.encoding) as sink:
+            for fpath in input_files:
+                with open(fpath, 'r', encoding=self.encoding) as f:
+                    sink.write_many(csv.DictReader(f))
+        return sink.rows_written
@@ -0,0 +1,147 @@
+"""
+Streaming CSV sink.
+
+Scrapers write records one at a time; rows are buffered and appended to the file
+every CSV_SINK_FLUSH_ROWS rows or CSV_SINK_FLUSH_SECONDS seconds, so memory stays
+bounded however long the crawl runs and what was flushed survives a crash.
+
+The schema is either fixed (fieldnames) or grows with the records: a record with
+new keys adds columns at the end. Rows already on disk are not touched while the
+sink is open; the header is rewritten once at close() when columns were added.
+Until then the full column list is kept in a small `<file>.columns` sidecar, so a
+crashed run's file is repaired (header rewritten) by the next sink that appends
+to it.
+
+    with CsvSink('data/processed/tradeshows.csv') as sink:
+        for record in records:
+            sink.write(record)
+"""
+import atexit
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from config import settings
+
+
+class CsvSink:
+    """Buffered, append-only CSV writer with a fixed or growing schema.
+
+    Args:
+        path: CSV file
+        fieldnames: fixed columns; None lets the columns grow with the records
+        mode: 'w' starts a new file, 'a' appends to it and keeps (and grows) its header
+        extra: with fixed fieldnames, 'ignore' drops unknown keys, 'raise' raises ValueError
+        flush_rows / flush_interval: buffered rows are written when either is reached
+        encoding: defaults to settings.CSV_ENCODING
+    """
+
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None, mode: str = 'w',
+                 extra: str = 'ignore', flush_rows: Optional[int] = None, flush_interval: Optional[float] = None,
+                 encoding: Optional[str] = None):
+        if mode not in ('w', 'a'):
+            raise ValueError(f"mode must be 'w' or 'a', not {mode!r}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sidecar = self.path.with_name(self.path.name + '.columns')
+        self.fixed = fieldnames is not None
+        self.extra = extra
+        self.flush_rows = flush_rows or getattr(settings, 'CSV_SINK_FLUSH_ROWS', 500)
+        self.flush_interval = flush_interval or getattr(settings, 'CSV_SINK_FLUSH_SECONDS', 5)
+        self.encoding = encoding or getattr(settings, 'CSV_ENCODING', 'utf-8-sig')
+        self.columns: List[str] = list(fieldnames or [])
+        self.rows_written = 0
+        self._header: Optional[List[str]] = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        if mode == 'a' and self.path.exists() and self.path.stat().st_size > 0:
+            self._header = self._read_header()
+            columns = json.loads(self.sidecar.read_text()) if self.sidecar.exists() else self._header
+            if not self.fixed:
+                self.columns = list(columns)
+            else:
+                # The file's columns stay where they are; new fixed fields go at the end
+                self.columns = list(dict.fromkeys(list(columns) + self.columns))
+            if self.columns != self._header:
+                self.sidecar.write_text(json.dumps(self.columns))
+            self._file = self.path.open('a', encoding=self.encoding, newline='')
+        else:
+            self._file = self.path.open('w', encoding=self.encoding, newline='')
+            if self.sidecar.exists():
+                self.sidecar.unlink()
+        self._writer = csv.writer(self._file)
+        atexit.register(self.close)
+
+    def _read_header(self) -> List[str]:
+        with self.path.open('r', encoding=self.encoding, newline='') as f:
+            return next(csv.reader(f), [])
+
+    def write(self, record: Dict[str, Any]):
+        """Buffer one record (flushed on the size/time threshold)."""
+        new = [key for key in record if key not in self.columns]
+        if new:
+            if self.fixed:
+                if self.extra == 'raise':
+                    raise ValueError(f"{self.path}: fields not in the schema: {', '.join(map(str, new))}")
+            else:
+                self.columns.extend(new)
+                if self._header is not None:
+                    # Rows from now on are wider than the header until close() rewrites it
+                    self.sidecar.write_text(json.dumps(self.columns))
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """Append buffered records to the file."""
+        if self._file is None:
+            return
+        if self._header is None and (self._buffer or self.fixed):
+            self._header = list(self.columns)
+            self._writer.writerow(self._header)
+        for record in self._buffer:
+            self._writer.writerow([record.get(column, '') for column in self.columns])
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush, and rewrite the header once if columns were added."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        atexit.unregister(self.close)
+        if self._header is not None and self._header != self.columns:
+            self._rewrite_header()
+        if self.sidecar.exists():
+            self.sidecar.unlink()
+
+    def _rewrite_header(self):
+        width = len(self.columns)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with self.path.open('r', encoding=self.encoding, newline='') as src, \
+                tmp.open('w', encoding=self.encoding, newline='') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            next(reader, None)
+            writer.writerow(self.columns)
+            for row in reader:
+                writer.writerow(row + [''] * (width - len(row)))
+        os.replace(tmp, self.path)
+        self._header = list(self.columns)
+
+    def __enter__(self) -> 'CsvSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,5 +1,6 @@
 import re
-from datetime import datetime
+
+from utils.date_engine import parse_date as _parse_date
 
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
@@ -18,11 +19,5 @@ def clean_text(text: str) -> str:
 
 
 def parse_date(date_str: str):
-    if not date_str:
-        return None
-    for fmt in ("%Y-%m-%d", "%d %B %Y", "%B %d, %Y", "%Y/%m/%d"):
-        try:
-            return datetime.strptime(date_str.strip(), fmt).date()
-        except Exception:
-            continue
-    return None
+    """Date in date_str (ISO, "3 September 2025", "September 3, 2025", ...) or None."""
+    return _parse_date(date_str)
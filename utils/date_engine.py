@@ -0,0 +1,187 @@
+"""
+Date and date-range extraction shared by all scrapers.
+
+Every supported layout is compiled once into a single alternation, and month
+names resolve through one lookup table. That table covers English full names and
+abbreviations, plus French, Italian, German and Spanish names. Matching is
+leftmost-first: the earliest date range in the text wins, not the first pattern
+in a priority list.
+
+    find_date_range('Pitti Uomo, Florence, June 17-20, 2025')   -> (date(2025, 6, 17), date(2025, 6, 20))
+    find_date_range('du 3 au 6 octobre 2025')                     -> (date(2025, 10, 3), date(2025, 10, 6))
+    find_date_range('June 20-24', default_year=2026)              -> (date(2026, 6, 20), date(2026, 6, 24))
+    parse_date('Wed. September 03 2025')                          -> date(2025, 9, 3)
+    find_date_ranges(df['text'])                                  -> DataFrame with start/end columns
+"""
+import re
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+DateRange = Tuple[Optional[date], Optional[date]]
+
+_MONTH_NAMES = {
+    1: ['january', 'jan', 'janvier', 'janv', 'gennaio', 'genn', 'januar', 'jän', 'enero', 'ene'],
+    2: ['february', 'feb', 'février', 'fevrier', 'févr', 'fevr', 'febbraio', 'febr', 'februar', 'febrero'],
+    3: ['march', 'mar', 'mars', 'marzo', 'märz', 'maerz', 'mrz'],
+    4: ['april', 'apr', 'avril', 'avr', 'aprile', 'abril', 'abr'],
+    5: ['may', 'mai', 'maggio', 'magg', 'mayo'],
+    6: ['june', 'jun', 'juin', 'giugno', 'giu', 'juni', 'junio'],
+    7: ['july', 'jul', 'juillet', 'juil', 'luglio', 'lug', 'juli', 'julio'],
+    8: ['august', 'aug', 'août', 'aout', 'agosto', 'ago'],
+    9: ['september', 'sept', 'sep', 'septembre', 'settembre', 'sett', 'set', 'septiembre', 'setiembre'],
+    10: ['october', 'oct', 'octobre', 'ottobre', 'ott', 'oktober', 'okt', 'octubre'],
+    11: ['november', 'nov', 'novembre', 'noviembre'],
+    12: ['december', 'dec', 'décembre', 'decembre', 'déc', 'dicembre', 'dic', 'dezember', 'dez', 'diciembre'],
+}
+
+# lowercase name or abbreviation -> month number
+MONTHS: Dict[str, int] = {name: num for num, names in _MONTH_NAMES.items() for name in names}
+
+# Any word; month_number() decides whether it is a month (much cheaper than an alternation of names)
+_MONTH = r'\b[^\W\d_]{3,10}+\.?'
+_DAY = r'\d{1,2}(?:st|nd|rd|th|er|\.)?'
+_YEAR = r'\d{4}'
+_TO = r'\s*(?:-|–|—|[Tt]o|until|au|al|bis)\s*'
+_OF = r'\s+(?:de\s+)?'  # "20 de septiembre de 2025"
+
+# One alternation; group names say which layout matched
+DATE_RANGE_RE = re.compile('|'.join([
+    # September 20 2025 to September 24 2025
+    rf'(?P<c_m1>{_MONTH})\s+(?P<c_d1>{_DAY}),?\s+(?P<c_y1>{_YEAR}){_TO}(?P<c_m2>{_MONTH})\s+(?P<c_d2>{_DAY}),?\s+(?P<c_y2>{_YEAR})',
+    # 2025-09-20 to 2025-09-24
+    rf'(?P<i_y1>{_YEAR})-(?P<i_m1>\d{{2}})-(?P<i_d1>\d{{2}}){_TO}(?P<i_y2>{_YEAR})-(?P<i_m2>\d{{2}})-(?P<i_d2>\d{{2}})',
+    # 20 September - 24 September 2025
+    rf'(?P<e_d1>{_DAY}){_OF}(?P<e_m1>{_MONTH}){_TO}(?P<e_d2>{_DAY}){_OF}(?P<e_m2>{_MONTH}){_OF}(?P<e_y>{_YEAR})',
+    # September 20-24, 2025 (year optional: default_year)
+    rf'(?P<a_m>{_MONTH})\s+(?P<a_d1>{_DAY}){_TO}(?P<a_d2>{_DAY})(?:,?\s*(?P<a_y>{_YEAR}))?',
+    # 20-24 September 2025 / du 20 au 24 septembre 2025
+    rf'(?P<b_d1>{_DAY}){_TO}(?P<b_d2>{_DAY}){_OF}(?P<b_m>{_MONTH})(?:{_OF}(?P<b_y>{_YEAR}))?',
+]))
+
+# Single dates
+DATE_RE = re.compile('|'.join([
+    # 2025-09-03 / 2025/09/03
+    rf'(?P<i_y>{_YEAR})[-/](?P<i_m>\d{{1,2}})[-/](?P<i_d>\d{{1,2}})',
+    # 3 September 2025 / 3 de septiembre de 2025
+    rf'(?P<e_d>{_DAY}){_OF}(?P<e_m>{_MONTH}),?{_OF}(?P<e_y>{_YEAR})',
+    # (Wed.) September 03 2025 / September 3, 2025
+    rf'(?P<a_m>{_MONTH})\s+(?P<a_d>{_DAY}),?\s+(?P<a_y>{_YEAR})',
+]))
+
+_DIGITS_RE = re.compile(r'\d+')
+_YEAR_RE = re.compile(r'\d{4}')
+
+
+def month_number(name: str) -> Optional[int]:
+    """Month number for an English/French/Italian/German/Spanish name or abbreviation."""
+    return MONTHS.get(name.strip().rstrip('.').lower())
+
+
+def _num(value: str) -> int:
+    return int(_DIGITS_RE.match(value).group(0))
+
+
+def _range_from_match(m, default_year: Optional[int]) -> DateRange:
+    g = m.groupdict()
+    if g['c_m1']:
+        return (date(_num(g['c_y1']), month_number(g['c_m1']), _num(g['c_d1'])),
+                date(_num(g['c_y2']), month_number(g['c_m2']), _num(g['c_d2'])))
+    if g['i_y1']:
+        return (date(int(g['i_y1']), int(g['i_m1']), int(g['i_d1'])),
+                date(int(g['i_y2']), int(g['i_m2']), int(g['i_d2'])))
+    if g['e_d1']:
+        year = int(g['e_y'])
+        return (date(year, month_number(g['e_m1']), _num(g['e_d1'])),
+                date(year, month_number(g['e_m2']), _num(g['e_d2'])))
+    if g['a_m']:
+        year = int(g['a_y']) if g['a_y'] else default_year
+        month = month_number(g['a_m'])
+        return date(year, month, _num(g['a_d1'])), date(year, month, _num(g['a_d2']))
+    year = int(g['b_y']) if g['b_y'] else default_year
+    month = month_number(g['b_m'])
+    return date(year, month, _num(g['b_d1'])), date(year, month, _num(g['b_d2']))
+
+
+def find_date_range(text: str, default_year: Optional[int] = None) -> DateRange:
+    """First valid (start, end) date range in free text, or (None, None).
+
+    Ranges without a year only count when default_year is given.
+    """
+    if not text or default_year is None and not _YEAR_RE.search(text):
+        return None, None
+    m = DATE_RANGE_RE.search(text)
+    while m is not None:
+        if default_year is not None or not (m.group('a_m') and not m.group('a_y') or m.group('b_m') and not m.group('b_y')):
+            try:
+                return _range_from_match(m, default_year)
+            except (ValueError, TypeError):
+                # Not a month name, or e.g. February 30
+                pass
+        m = DATE_RANGE_RE.search(text, m.start() + 1)
+    return None, None
+
+
+def parse_date(text: str) -> Optional[date]:
+    """First valid single date in text, or None."""
+    if not text or not _YEAR_RE.search(text):
+        return None
+    m = DATE_RE.search(text)
+    while m is not None:
+        g = m.groupdict()
+        try:
+            if g['i_y']:
+                return date(int(g['i_y']), int(g['i_m']), int(g['i_d']))
+            if g['e_d']:
+                return date(int(g['e_y']), month_number(g['e_m']), _num(g['e_d']))
+            return date(int(g['a_y']), month_number(g['a_m']), _num(g['a_d']))
+        except (ValueError, TypeError):
+            m = DATE_RE.search(text, m.start() + 1)
+    return None
+
+
+def find_date_ranges(texts: Iterable[str], default_year: Optional[int] = None):
+    """find_date_range() over a list, or over a pandas Series (returns a start/end DataFrame).
+
+    Repeated texts (boilerplate rows, the same page seen twice) are parsed once.
+    """
+    seen: Dict[str, DateRange] = {}
+
+    def one(text) -> DateRange:
+        if not isinstance(text, str):
+            return None, None
+        if text not in seen:
+            seen[text] = find_date_range(text, default_year)
+        return seen[text]
+
+    if pd is not None and isinstance(texts, pd.Series):
+        return pd.DataFrame([one(t) for t in texts], index=texts.index, columns=['start', 'end'])
+    return [one(t) for t in texts]
+
+
+def parse_dates(texts: Iterable[str]):
+    """parse_date() over a list, or over a pandas Series (returns a Series)."""
+    seen: Dict[str, Optional[date]] = {}
+
+    def one(text) -> Optional[date]:
+        if not isinstance(text, str):
+            return None
+        if text not in seen:
+            seen[text] = parse_date(text)
+        return seen[text]
+
+    if pd is not None and isinstance(texts, pd.Series):
+        return texts.map(one)
+    return [one(t) for t in texts]
+
+
+def iso_range(dates: DateRange) -> Tuple[Optional[str], Optional[str]]:
+    """(start, end) as YYYY-MM-DD strings, or (None, None)."""
+    start, end = dates
+    if start is None or end is None:
+        return None, None
+    return start.isoformat(), end.isoformat()
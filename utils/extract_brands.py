@@ -14,12 +14,17 @@ from pathlib import Path
 from datetime import datetime
 import hashlib
 
+from config import settings
+from utils.fuzzy_dedupe import FuzzyDeduper
+from utils.warehouse import Warehouse, fill_missing
+
 
 class BrandExtractor:
     """Extract and deduplicate brands from multiple sources"""
     
-    def __init__(self):
+    def __init__(self, warehouse=None):
         self.brands = {}  # key: normalized_name, value: brand dict
+        self.warehouse = warehouse or Warehouse()
         
     def normalize_name(self, name):
         """Normalize brand name for deduplication"""
@@ -127,20 +132,24 @@ class BrandExtractor:
         print(f"  ✓ Loaded {count} unique brands from master leads")
         return count
     
+    def fuzzy_merge(self):
+        """Fold brands whose names only match fuzzily ("Maison X Paris" / "Maison X"); returns brands removed"""
+        keys = list(self.brands)
+        # A brand is one brand whatever city its showroom is in
+        deduper = FuzzyDeduper(city_fields=())
+        groups = deduper.groups(deduper.cluster(self.brands[key] for key in keys))
+        for group in groups:
+            first = keys[group[0]]
+            for index in group[1:]:
+                self.brands[first] = fill_missing(self.brands[first], self.brands.pop(keys[index]))
+        return sum(len(group) - 1 for group in groups)
+
     def save_brands_csv(self, output_path='data/processed/brands.csv'):
-        """Save deduplicated brands to CSV"""
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        
-        # Sort by region, country, city, brand_name
-        sorted_brands = sorted(
-            self.brands.values(),
-            key=lambda x: (
-                x['region'],
-                x['country'],
-                x['city'],
-                x['brand_name'].lower()
-            )
-        )
+        """Upsert the deduplicated brands into the warehouse and export it to CSV"""
+        # A brand already stored keeps its values; new sources only fill its gaps
+        counts = self.warehouse.upsert('brands', self.brands.values(), merge=fill_missing)
+        print(f"\nWarehouse brands: {counts['inserted']} new, {counts['updated']} updated, "
+              f"{counts['unchanged']} unchanged")
         
         fieldnames = [
             'brand_id', 'brand_name', 'categories', 'city', 'country', 'region',
@@ -148,13 +157,12 @@ class BrandExtractor:
             'source', 'source_url', 'scraped_date'
         ]
         
-        with open(output_path, 'w', encoding='utf-8-sig', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(sorted_brands)
+        # Sort by region, country, city, brand_name
+        total = self.warehouse.export_csv('brands', output_path, fieldnames,
+                                          order_by=('region', '$.country', 'city', 'name'))
         
-        print(f"\n[OK] Saved {len(sorted_brands)} brands to {output_path}")
-        return len(sorted_brands)
+        print(f"\n[OK] Saved {total} brands to {output_path}")
+        return total
     
     def run(self):
         """Main extraction workflow"""
@@ -166,6 +174,8 @@ class BrandExtractor:
         total += self.load_from_designer_showrooms()
         total += self.load_from_master_leads()
         
+        if getattr(settings, 'FUZZY_DEDUPE', True):
+            print(f"  ✓ Fuzzy-merged {self.fuzzy_merge()} near-duplicate brands")
         print(f"\nTotal unique brands collected: {len(self.brands)}")
         
         # Breakdown by region
@@ -0,0 +1,251 @@
+"""
+Fuzzy deduplication of leads and brands.
+
+The warehouse key (utils/warehouse.py) only joins records whose normalized names
+match exactly, so "Maison X Paris" and "Maison X" stay two leads. Comparing every
+pair is O(n^2); FuzzyDeduper instead compares records only within small candidate
+blocks that share one of:
+
+- one of the two rarest name tokens (generic words like "showroom" and the
+  record's own city/country are dropped from names first)
+- the website domain (or the email domain when it is not a webmail host)
+- the last 9 digits of the phone number
+
+Every block key includes the city, as the exact key does: the same brand in two
+cities is two leads. Blocks larger than FUZZY_MAX_BLOCK are skipped because such
+keys are too common to mean anything. Pairs are scored by token-set similarity,
+i.e. the Jaccard similarity of the two name token sets with tokens weighted by
+IDF (rare words count more). A pair matches at FUZZY_NAME_THRESHOLD, or at
+FUZZY_LINK_THRESHOLD when it came from a domain or phone block. Matches are joined
+into clusters with union-find.
+
+Per record only token ids, a city id and its block keys are kept, in flat arrays
+(well under 100 bytes per record) plus one vocabulary entry per distinct name
+token. Clustering is one pass over the records plus a
+sort of the block keys. merged() is a second, streaming pass that folds each
+cluster with a merge function such as LeadMerger.merge_records.
+
+    deduper = FuzzyDeduper()
+    labels = deduper.cluster(records)
+    merged = list(deduper.merged(records, labels, merger.merge_records))
+
+Benchmark: python scripts/bench_fuzzy_dedupe.py --size 1000000
+"""
+import math
+import re
+import unicodedata
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+
+from config import settings
+from utils.warehouse import CITY_FIELDS, NAME_FIELDS, first_value, normalize_email, website_domain
+
+# Words that say nothing about which company a name is
+GENERIC_TOKENS = frozenset({
+    'the', 'and', 'by', 'of', 'de', 'di', 'du', 'da', 'des', 'la', 'le', 'les', 'et', 'il',
+    'showroom', 'showrooms', 'sales', 'department', 'contact', 'office', 'official',
+    'ltd', 'llc', 'inc', 'srl', 'spa', 'sas', 'sarl', 'gmbh', 'bv', 'co', 'company',
+    'instagram', 'facebook', 'twitter',
+})
+
+# Shared hosts: a domain match on these says nothing about the company
+SHARED_DOMAINS = frozenset({
+    'instagram.com', 'facebook.com', 'linktr.ee', 'twitter.com', 'x.com', 'tiktok.com',
+    'gmail.com', 'googlemail.com', 'hotmail.com', 'outlook.com', 'yahoo.com', 'icloud.com',
+    'live.com', 'msn.com', 'aol.com', 'qq.com', '163.com', '126.com', 'naver.com',
+})
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_PHONE_DIGITS = 9
+
+
+def name_tokens(name: str, drop: Iterable[str] = ()) -> List[str]:
+    """Lowercased, accent-free word tokens of a name without generic words or `drop`."""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii').lower()
+    dropped = GENERIC_TOKENS.union(drop)
+    return list(dict.fromkeys(t for t in _TOKEN.findall(text) if t not in dropped))
+
+
+def phone_digits(phone: str) -> str:
+    """Last 9 digits of the first number in a phone field; '' when it is too short to compare."""
+    first = re.split(r'[,;/]', phone or '', maxsplit=1)[0]
+    digits = re.sub(r'\D', '', first)
+    return digits[-_PHONE_DIGITS:] if len(digits) >= 8 else ''
+
+
+def contact_domain(record: Dict[str, Any]) -> str:
+    """Website domain, else the email's domain; '' for shared hosts (social sites, webmail)."""
+    domain = website_domain(first_value(record, ('website',)))
+    if not domain:
+        domain = normalize_email(first_value(record, ('email',))).rpartition('@')[2]
+    return '' if domain in SHARED_DOMAINS else domain
+
+
+class FuzzyDeduper:
+    """Blocked fuzzy matching of records into clusters.
+
+    Args:
+        threshold: name similarity for a match (defaults to FUZZY_NAME_THRESHOLD)
+        link_threshold: name similarity when the domain or phone match too (FUZZY_LINK_THRESHOLD)
+        max_block: candidate blocks larger than this are skipped (FUZZY_MAX_BLOCK)
+        name_fields / city_fields: where records carry their name and city; no city_fields
+            (e.g. for brands) matches across cities
+    """
+
+    def __init__(self, threshold: Optional[float] = None, link_threshold: Optional[float] = None,
+                 max_block: Optional[int] = None, name_fields: Sequence[str] = NAME_FIELDS,
+                 city_fields: Sequence[str] = CITY_FIELDS):
+        self.threshold = threshold or getattr(settings, 'FUZZY_NAME_THRESHOLD', 0.8)
+        self.link_threshold = link_threshold or getattr(settings, 'FUZZY_LINK_THRESHOLD', 0.5)
+        self.max_block = max_block or getattr(settings, 'FUZZY_MAX_BLOCK', 200)
+        self.name_fields = tuple(name_fields)
+        self.city_fields = tuple(city_fields)
+        self.stats: Dict[str, int] = {}
+
+    def cluster(self, records: Iterable[Dict[str, Any]], focus: Optional[Set[int]] = None) -> np.ndarray:
+        """Cluster label per record (in iteration order): the index of the cluster's first record.
+
+        With focus (record indices, e.g. the records changed since the last run; it may be
+        filled while records are iterated), only blocks holding a focus record are compared.
+        """
+        vocab: Dict[str, int] = {}
+        cities: Dict[str, int] = {'': 0}
+        df = array('i')
+        tokens = array('i')
+        offsets = array('q', [0])
+        city_ids = array('i')
+        link_keys = array('q')
+        link_records = array('i')
+
+        # Pass over the records: token ids, document frequencies and the domain/phone keys
+        for index, record in enumerate(records):
+            city = first_value(record, self.city_fields).lower() if self.city_fields else ''
+            city_id = cities.setdefault(city, len(cities))
+            drop = _TOKEN.findall(city) + _TOKEN.findall(first_value(record, ('country',)).lower())
+            for token in name_tokens(first_value(record, self.name_fields), drop):
+                token_id = vocab.get(token)
+                if token_id is None:
+                    token_id = vocab[token] = len(df)
+                    df.append(0)
+                df[token_id] += 1
+                tokens.append(token_id)
+            offsets.append(len(tokens))
+            city_ids.append(city_id)
+            if offsets[-1] == offsets[-2]:
+                continue
+            domain = contact_domain(record)
+            if domain:
+                link_keys.append(hash(('domain', domain, city_id)))
+                link_records.append(index)
+            phone = phone_digits(first_value(record, ('phone',)))
+            if phone:
+                link_keys.append(hash(('phone', phone, city_id)))
+                link_records.append(index)
+
+        count = len(city_ids)
+        weights = [math.log((count + 1) / n) for n in df]
+
+        # Name blocks: each record's two rarest tokens (ties broken by token id)
+        name_keys = array('q')
+        name_records = array('i')
+        for index in range(count):
+            own = tokens[offsets[index]:offsets[index + 1]]
+            for token_id in sorted(own, key=lambda t: (df[t], t))[:2]:
+                name_keys.append(hash((token_id, city_ids[index])))
+                name_records.append(index)
+
+        parent = array('q', range(count))
+        self.stats = {'records': count, 'tokens': len(vocab), 'blocks': 0, 'oversized_blocks': 0,
+                      'comparisons': 0, 'matches': 0}
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def token_set(i: int) -> set:
+            return set(tokens[offsets[i]:offsets[i + 1]])
+
+        for keys, members, threshold in ((name_keys, name_records, self.threshold),
+                                         (link_keys, link_records, self.link_threshold)):
+            for block in self._blocks(keys, members, focus):
+                sets = [token_set(i) for i in block]
+                for a in range(len(block)):
+                    for b in range(a + 1, len(block)):
+                        root_a, root_b = find(block[a]), find(block[b])
+                        if root_a == root_b:
+                            continue
+                        self.stats['comparisons'] += 1
+                        if self._similarity(sets[a], sets[b], weights) >= threshold:
+                            self.stats['matches'] += 1
+                            # The earlier record stays the root, so labels point at a cluster's first record
+                            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        labels = np.fromiter((find(i) for i in range(count)), dtype=np.int64, count=count)
+        sizes = np.bincount(labels, minlength=count)
+        self.stats['clusters'] = int((sizes > 1).sum())
+        self.stats['duplicates'] = int(count - (sizes > 0).sum())
+        return labels
+
+    def _blocks(self, keys: array, members: array, focus: Optional[Set[int]] = None) -> Iterator[List[int]]:
+        """Record indices per block key, for blocks of 2..max_block records (holding a focus record)."""
+        if not keys:
+            return
+        key_array = np.frombuffer(keys, dtype=np.int64)
+        member_array = np.frombuffer(members, dtype=np.int32)
+        order = np.argsort(key_array, kind='stable')
+        sorted_keys = key_array[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(sorted_keys)]
+        sizes = ends - starts
+        self.stats['oversized_blocks'] += int((sizes > self.max_block).sum())
+        for start, end in zip(starts[(sizes > 1) & (sizes <= self.max_block)].tolist(),
+                              ends[(sizes > 1) & (sizes <= self.max_block)].tolist()):
+            # A record is in a block once even if two of its keys collide
+            block = list(dict.fromkeys(member_array[order[start:end]].tolist()))
+            if focus is not None and focus.isdisjoint(block):
+                continue
+            self.stats['blocks'] += 1
+            yield block
+
+    @staticmethod
+    def _similarity(a: set, b: set, weights: List[float]) -> float:
+        """IDF-weighted Jaccard similarity of two token-id sets."""
+        if not a or not b:
+            return 0.0
+        shared = sum(weights[t] for t in a & b)
+        if not shared:
+            return 0.0
+        return shared / (sum(weights[t] for t in a | b))
+
+    @staticmethod
+    def merged(records: Iterable[Dict[str, Any]], labels: np.ndarray,
+               merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Records with each cluster folded into one by merge(first, next).
+
+        Takes the same records, in the same order, as cluster(). Singletons are yielded
+        in place and a cluster is yielded at its last record; only open clusters are held.
+        """
+        remaining = np.bincount(labels, minlength=len(labels))
+        open_clusters: Dict[int, Dict[str, Any]] = {}
+        for index, record in enumerate(records):
+            label = int(labels[index])
+            if remaining[label] == 1 and label == index:
+                yield record
+                continue
+            open_clusters[label] = merge(open_clusters[label], record) if label in open_clusters else record
+            remaining[label] -= 1
+            if remaining[label] == 0:
+                yield open_clusters.pop(label)
+
+    @staticmethod
+    def groups(labels: np.ndarray) -> List[List[int]]:
+        """Record indices of every cluster with more than one record."""
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+        ends = np.r_[starts[1:], len(sorted_labels)]
+        return [order[start:end].tolist() for start, end in zip(starts.tolist(), ends.tolist()) if end - start > 1]
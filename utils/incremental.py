@@ -1,27 +1,192 @@
+"""
+Store of processed URLs for incremental scraping.
+
+Entries live in an SQLite database (WAL mode) next to the legacy text file:
+data/raw/scraped_urls.txt is backed by data/raw/scraped_urls.sqlite3, and the
+text file is imported once when the database is first created. Each entry
+keeps the URL, the hash of its content, when it was last fetched and the HTTP
+status. URLs older than the TTL, or that last failed (status >= 400), count as
+not seen, so they are fetched again.
+
+Writes are buffered and committed in batches (every batch_size URLs or
+flush_interval seconds, and at exit). Each process opens its own connection,
+so parallel crawls can share one store.
+"""
+import atexit
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from config import settings
+
+Entry = Tuple[str, Optional[str], float, Optional[int]]
+
+# SQLite's default limit on bound parameters is 999 before 3.32
+_CHUNK = 500
 
 
 class IncrementalStore:
-    """Simple file-backed store to track processed URLs for incremental scraping."""
+    """SQLite-backed store to track processed URLs for incremental scraping.
 
-    def __init__(self, filepath: str):
+    Args:
+        filepath: legacy text file (one URL per line); the database sits beside it
+        ttl_hours: re-fetch URLs fetched longer ago, defaults to settings.INCREMENTAL_TTL_HOURS (None = never)
+        batch_size: buffered writes per commit
+        flush_interval: seconds before buffered writes are committed anyway
+    """
+
+    def __init__(self, filepath: str, ttl_hours: Optional[float] = None, batch_size: Optional[int] = None,
+                 flush_interval: float = 5.0):
         self.path = Path(filepath)
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self._seen: Set[str] = set()
-        if self.path.exists():
-            for line in self.path.read_text(encoding='utf-8').splitlines():
-                if line.strip():
-                    self._seen.add(line.strip())
+        self.db_path = self.path.with_suffix('.sqlite3')
+        ttl_hours = ttl_hours if ttl_hours is not None else getattr(settings, 'INCREMENTAL_TTL_HOURS', None)
+        self.ttl = ttl_hours * 3600 if ttl_hours else None
+        self.batch_size = batch_size or getattr(settings, 'INCREMENTAL_BATCH_SIZE', 500)
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Entry] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        created = not self.db_path.exists()
+        self._db = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            ' url TEXT PRIMARY KEY, content_hash TEXT, fetched_at REAL NOT NULL, status INTEGER) WITHOUT ROWID')
+        if created and self.path.exists():
+            self._import_text_file()
+        atexit.register(self.close)
+
+    def _import_text_file(self):
+        fetched_at = self.path.stat().st_mtime
+        with self.path.open(encoding='utf-8') as f:
+            rows = ((line.strip(), None, fetched_at, None) for line in f if line.strip())
+            self._write(rows, replace=False)
+
+    def _write(self, rows: Iterable[Entry], replace: bool = True):
+        sql = ('INSERT INTO urls VALUES (?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET'
+               ' content_hash = COALESCE(excluded.content_hash, urls.content_hash),'
+               ' fetched_at = excluded.fetched_at, status = excluded.status'
+               if replace else 'INSERT OR IGNORE INTO urls VALUES (?, ?, ?, ?)')
+        # IMMEDIATE takes the write lock up front; other writers wait (busy timeout) instead of failing
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            self._db.executemany(sql, rows)
+            self._db.execute('COMMIT')
+        except Exception:
+            self._db.execute('ROLLBACK')
+            raise
+
+    def _seen_condition(self) -> Tuple[str, tuple]:
+        if self.ttl is None:
+            return '(status IS NULL OR status < 400)', ()
+        return '(status IS NULL OR status < 400) AND fetched_at >= ?', (time.time() - self.ttl,)
+
+    def _counts_as_seen(self, entry: Entry) -> bool:
+        status, fetched_at = entry[3], entry[2]
+        if status is not None and status >= 400:
+            return False
+        return self.ttl is None or fetched_at >= time.time() - self.ttl
 
     def has(self, url: str) -> bool:
-        return url in self._seen
+        """True if url was fetched successfully within the TTL."""
+        with self._lock:
+            if url in self._pending:
+                return self._counts_as_seen(self._pending[url])
+            condition, params = self._seen_condition()
+            row = self._db.execute(f'SELECT 1 FROM urls WHERE url = ? AND {condition}', (url,) + params).fetchone()
+        return row is not None
+
+    def has_many(self, urls: Iterable[str]) -> Set[str]:
+        """The subset of urls that has() would return True for, in a few indexed queries."""
+        urls = list(dict.fromkeys(urls))
+        seen: Set[str] = set()
+        with self._lock:
+            lookup = []
+            for url in urls:
+                if url in self._pending:
+                    if self._counts_as_seen(self._pending[url]):
+                        seen.add(url)
+                else:
+                    lookup.append(url)
+            condition, params = self._seen_condition()
+            for i in range(0, len(lookup), _CHUNK):
+                chunk = lookup[i:i + _CHUNK]
+                marks = ','.join('?' * len(chunk))
+                rows = self._db.execute(f'SELECT url FROM urls WHERE url IN ({marks}) AND {condition}',
+                                        tuple(chunk) + params)
+                seen.update(row[0] for row in rows)
+        return seen
+
+    def add(self, url: str, content_hash: Optional[str] = None, status: Optional[int] = 200):
+        """Record that url was fetched now (buffered; see flush())."""
+        self.add_many([(url, content_hash, status)])
+
+    def add_many(self, entries: Iterable[Union[str, Tuple[str, Optional[str], Optional[int]]]]):
+        """Record many fetches: URLs, or (url, content_hash, status) tuples."""
+        now = time.time()
+        with self._lock:
+            for entry in entries:
+                url, content_hash, status = (entry, None, 200) if isinstance(entry, str) else entry
+                previous = self._pending.get(url)
+                if content_hash is None and previous is not None:
+                    content_hash = previous[1]
+                self._pending[url] = (url, content_hash, now, status)
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def get(self, url: str) -> Optional[Dict[str, object]]:
+        """Stored entry for url (url, content_hash, fetched_at, status), or None."""
+        with self._lock:
+            row = self._pending.get(url) or self._db.execute(
+                'SELECT url, content_hash, fetched_at, status FROM urls WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('url', 'content_hash', 'fetched_at', 'status'), row))
+
+    def changed(self, url: str, content_hash: str) -> bool:
+        """True if content_hash differs from the hash stored for url (or none is stored)."""
+        entry = self.get(url)
+        return entry is None or entry['content_hash'] != content_hash
+
+    def flush(self):
+        """Commit buffered writes."""
+        with self._lock:
+            if self._pending:
+                self._write(list(self._pending.values()))
+                self._pending.clear()
+            self._last_flush = time.monotonic()
+
+    def all(self) -> Set[str]:
+        self.flush()
+        with self._lock:
+            return {row[0] for row in self._db.execute('SELECT url FROM urls')}
+
+    def stale(self, limit: Optional[int] = None) -> List[str]:
+        """URLs due for a re-fetch: past the TTL or last failed, oldest first."""
+        self.flush()
+        condition, params = self._seen_condition()
+        sql = f'SELECT url FROM urls WHERE NOT ({condition}) ORDER BY fetched_at'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, params)]
 
-    def add(self, url: str):
-        if url not in self._seen:
-            self._seen.add(url)
-            with self.path.open('a', encoding='utf-8') as f:
-                f.write(url + "\n")
+    def __len__(self) -> int:
+        self.flush()
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM urls').fetchone()[0]
 
-    def all(self):
-        return set(self._seen)
+    def close(self):
+        if self._db is None:
+            return
+        self.flush()
+        with self._lock:
+            self._db.close()
+            self._db = None
+        atexit.unregister(self.close)
@@ -1,23 +1,53 @@
 """
 Master leads merger and deduplicator.
-Merges showrooms, designer_showrooms, and any other lead sources into master_leads.csv.
-Normalizes company names, emails, websites for deduplication.
+Merges showrooms, designer_showrooms, and any other lead sources into the leads
+table of the warehouse (utils/warehouse.py), keyed by the dedupe key, and exports
+it to master_leads.csv. Normalizes company names, emails, websites for deduplication.
+
+Scrapers upsert their leads as they finish (upsert()); run() folds in the source
+CSVs and rewrites the export. Only new or changed leads are written to the table.
+Leads the exact key keeps apart ("Maison X Paris" / "Maison X") are then folded
+together by fuzzy_merge() (utils/fuzzy_dedupe.py).
+
+Runs are incremental: each source file's high-water mark is kept in the warehouse,
+so only rows appended or changed since the last run are read and merged, and only
+blocks around the changed leads are fuzzy-matched. Every run writes the leads it
+inserted, updated or removed to master_leads_delta.csv; master_leads.csv is only
+re-exported when something changed. `python -m utils.merge_leads --full` re-reads
+every source.
 """
+import argparse
 import csv
+import hashlib
+import io
 import re
 from pathlib import Path
-from typing import List, Dict, Set, Tuple
+from typing import Any, List, Dict, Optional, Set, Tuple
 from datetime import datetime
 
+from config import settings
+from utils.csv_sink import CsvSink
+from utils.fuzzy_dedupe import FuzzyDeduper
+from utils.warehouse import Warehouse, content_hash
+
+FIELDNAMES = [
+    'lead_type', 'company_name', 'description', 'email', 'phone',
+    'website', 'instagram', 'facebook', 'city', 'country', 'region',
+    'source', 'source_url', 'scraped_date', 'merged_at'
+]
+
 
 class LeadMerger:
-    def __init__(self):
+    def __init__(self, warehouse: Optional[Warehouse] = None):
         self.data_dir = Path('data/processed')
         self.output_file = self.data_dir / 'master_leads.csv'
+        self.delta_file = self.data_dir / 'master_leads_delta.csv'
+        self.warehouse = warehouse or Warehouse()
         
         # Source files
         self.sources = {
-            'showrooms': self.data_dir / 'master_leads.csv',  # Original showrooms data
+            # Before the warehouse, showrooms were appended here; imported once into an empty leads table
+            'showrooms': self.data_dir / 'master_leads.csv',
             'designer_showrooms': self.data_dir / 'designer_showrooms.csv',
         }
         
@@ -63,6 +93,46 @@ class LeadMerger:
         contact = website if website else email
         return (name, city, contact)
     
+    @staticmethod
+    def showroom_lead(row: Dict[str, Any]) -> Dict[str, str]:
+        """Map a multi-label showroom record (ShowroomsScraper) to the lead schema"""
+        return {
+            'lead_type': 'Multi-Label Showroom',
+            'company_name': row.get('company_name', ''),
+            'description': row.get('description', ''),
+            'email': row.get('email', ''),
+            'phone': row.get('phone', ''),
+            'website': row.get('website', ''),
+            'instagram': row.get('instagram', ''),
+            'facebook': row.get('facebook', ''),
+            'city': row.get('city', ''),
+            'country': row.get('country', ''),
+            'region': row.get('region', ''),
+            'source': 'showrooms',
+            'source_url': row.get('source_url') or row.get('source_page', ''),
+            'scraped_date': row.get('scraped_date', '')
+        }
+
+    @staticmethod
+    def designer_showroom_lead(row: Dict[str, Any]) -> Dict[str, str]:
+        """Map a designer showroom record (DesignerShowroomsScraper) to the lead schema"""
+        return {
+            'lead_type': 'Designer Showroom',
+            'company_name': row.get('brand_name', ''),
+            'description': row.get('description', '') or row.get('categories', ''),
+            'email': row.get('email', ''),
+            'phone': row.get('phone', ''),
+            'website': '',  # Designer showrooms don't have website field
+            'instagram': row.get('instagram', ''),
+            'facebook': row.get('facebook', ''),
+            'city': row.get('primary_city', ''),
+            'country': row.get('country', ''),
+            'region': row.get('region', ''),
+            'source': 'designer_showrooms',
+            'source_url': row.get('source_url', ''),
+            'scraped_date': row.get('scraped_date', '')
+        }
+
     def load_showrooms(self) -> List[Dict[str, str]]:
         """Load original showrooms (master_leads.csv)"""
         records = []
@@ -74,23 +144,10 @@ class LeadMerger:
         with file_path.open('r', encoding='utf-8-sig', newline='') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                # Map to standard schema
-                records.append({
-                    'lead_type': 'Multi-Label Showroom',
-                    'company_name': row.get('company_name', ''),
-                    'description': row.get('description', ''),
-                    'email': row.get('email', ''),
-                    'phone': row.get('phone', ''),
-                    'website': row.get('website', ''),
-                    'instagram': row.get('instagram', ''),
-                    'facebook': row.get('facebook', ''),
-                    'city': row.get('city', ''),
-                    'country': row.get('country', ''),
-                    'region': row.get('region', ''),
-                    'source': 'showrooms',
-                    'source_url': row.get('source_url', ''),
-                    'scraped_date': row.get('scraped_date', '')
-                })
+                # Map to standard schema; a merged file already carries lead types and sources
+                records.append({**self.showroom_lead(row),
+                                'lead_type': row.get('lead_type') or 'Multi-Label Showroom',
+                                'source': row.get('source') or 'showrooms'})
         
         print(f"Loaded {len(records)} showrooms")
         return records
@@ -107,26 +164,51 @@ class LeadMerger:
             reader = csv.DictReader(f)
             for row in reader:
                 # Map to standard schema
-                records.append({
-                    'lead_type': 'Designer Showroom',
-                    'company_name': row.get('brand_name', ''),
-                    'description': row.get('description', '') or row.get('categories', ''),
-                    'email': row.get('email', ''),
-                    'phone': row.get('phone', ''),
-                    'website': '',  # Designer showrooms don't have website field
-                    'instagram': row.get('instagram', ''),
-                    'facebook': row.get('facebook', ''),
-                    'city': row.get('primary_city', ''),
-                    'country': row.get('country', ''),
-                    'region': row.get('region', ''),
-                    'source': 'designer_showrooms',
-                    'source_url': row.get('source_url', ''),
-                    'scraped_date': row.get('scraped_date', '')
-                })
+                records.append(self.designer_showroom_lead(row))
         
         print(f"Loaded {len(records)} designer showrooms")
         return records
     
+    def read_new_rows(self, source: str, full: bool = False) -> Tuple[List[Dict[str, str]], Optional[Dict], List[str]]:
+        """Rows of a source CSV not merged yet, with the mark and row hashes to store once they are.
+
+        A file unchanged since its high-water mark is not read. A file that only grew is
+        read from the mark on. A rewritten file is read whole, and rows whose content
+        (scrape dates aside) was merged before are dropped. full ignores the mark.
+        """
+        path = self.sources[source]
+        if not path.exists():
+            print(f"{source} file not found: {path}")
+            return [], None, []
+        stat = path.stat()
+        mark = {} if full else self.warehouse.source_mark(source)
+        if mark.get('size') == stat.st_size and mark.get('mtime_ns') == stat.st_mtime_ns:
+            return [], None, []
+        with path.open('rb') as f:
+            header = next(csv.reader([f.readline().decode('utf-8-sig')]), [])
+            offset = mark.get('offset', 0)
+            appended = 0 < offset <= stat.st_size and self._tail_hash(f, offset) == mark.get('tail')
+            f.seek(offset if appended else 0)
+            data = f.read(stat.st_size - f.tell()).decode('utf-8-sig')
+            new_mark = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'offset': stat.st_size,
+                        'tail': self._tail_hash(f, stat.st_size)}
+        reader = csv.DictReader(io.StringIO(data, newline=''), fieldnames=header if appended else None)
+        rows = list(reader)
+        hashes = [content_hash(row) for row in rows]
+        if not appended and not full:
+            # Rewritten (e.g. a new scrape): keep only rows whose content is new
+            seen = self.warehouse.seen_row_hashes(source, hashes)
+            rows, hashes = [r for r, h in zip(rows, hashes) if h not in seen], [h for h in hashes if h not in seen]
+        print(f"{source}: {len(rows)} new or changed rows ({'appended' if appended else 'whole file'})")
+        return rows, new_mark, hashes
+
+    @staticmethod
+    def _tail_hash(f, offset: int) -> str:
+        """Hash of the (up to) 1 KB before offset, telling an appended file from a rewritten one."""
+        start = max(0, offset - 1024)
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
+
     def merge_records(self, rec1: Dict[str, str], rec2: Dict[str, str]) -> Dict[str, str]:
         """Merge two duplicate records, preferring non-empty values"""
         merged = rec1.copy()
@@ -150,16 +232,88 @@ class LeadMerger:
                 if key in ['description', 'phone', 'email', 'website', 'instagram', 'facebook']:
                     merged[key] = val2
         
-        # Merge lead_type if different
-        if rec1.get('lead_type') != rec2.get('lead_type'):
-            types = [rec1.get('lead_type', ''), rec2.get('lead_type', '')]
-            merged['lead_type'] = ' / '.join([t for t in types if t])
-        
-        # Merge sources
-        sources = [rec1.get('source', ''), rec2.get('source', '')]
-        merged['source'] = ' + '.join([s for s in sources if s and s not in merged.get('source', '')])
+        # Merge lead_type and sources, each listed once (merging a record into itself changes nothing)
+        merged['lead_type'] = self._join_unique(rec1.get('lead_type'), rec2.get('lead_type'), ' / ')
+        merged['source'] = self._join_unique(rec1.get('source'), rec2.get('source'), ' + ')
         
         return merged
+
+    @staticmethod
+    def _join_unique(value1: Optional[str], value2: Optional[str], sep: str) -> str:
+        parts = [p.strip() for v in (value1, value2) if v for p in v.split(sep.strip())]
+        return sep.join(dict.fromkeys(p for p in parts if p))
+
+    def warehouse_key(self, record: Dict[str, str]) -> str:
+        """Dedupe key as the leads table's key; '' for records without a name"""
+        key = self.get_dedupe_key(record)
+        return '|'.join(key) if key[0] else ''
+
+    def upsert(self, records: List[Dict[str, str]], on_change=None) -> Dict[str, int]:
+        """Merge lead-schema records into the warehouse; duplicates go through merge_records()
+
+        on_change(outcome, key, lead) is called for every lead inserted or updated.
+        """
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        def merge(stored, new):
+            # merged_at tells when a lead last changed; it is not compared, so unchanged leads keep theirs
+            return {**self.merge_records(stored, new), 'merged_at': new.get('merged_at') or stored.get('merged_at')}
+
+        return self.warehouse.upsert('leads', ({**rec, 'merged_at': timestamp} for rec in records),
+                                     key=self.warehouse_key, merge=merge, on_change=on_change)
+
+    def fuzzy_merge(self, changed: Optional[Set[str]] = None, on_change=None) -> int:
+        """Fold leads that only match fuzzily into one through merge_records(); returns leads removed.
+
+        Each cluster is kept under the key of its first lead (in key order). With changed
+        (lead keys), only candidates of those leads are compared. on_change is called
+        as in upsert(), and with 'removed' for every lead folded into another.
+        """
+        if changed is not None and not changed:
+            return 0
+        deduper = FuzzyDeduper()
+        focus: Optional[Set[int]] = None if changed is None else set()
+
+        def records():
+            for index, (key, record) in enumerate(self.warehouse.rows('leads', order_by=('key',), with_keys=True)):
+                if focus is not None and key in changed:
+                    focus.add(index)
+                yield record
+
+        labels = deduper.cluster(records(), focus)
+        groups = deduper.groups(labels)
+        if not groups:
+            return 0
+        wanted = {index for group in groups for index in group}
+        # Second pass: only the leads in a cluster are held in memory
+        leads = {index: item for index, item in enumerate(self.warehouse.rows('leads', order_by=('key',),
+                                                                                with_keys=True))
+                 if index in wanted}
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        keys: Dict[int, str] = {}
+        merged = []
+        removed = []
+        for group in groups:
+            key, record = leads[group[0]]
+            for index in group[1:]:
+                other_key, other = leads[index]
+                record = self.merge_records(record, other)
+                removed.append(other_key)
+                if on_change:
+                    on_change('removed', other_key, other)
+            record['merged_at'] = timestamp
+            keys[id(record)] = key
+            merged.append(record)
+        self.warehouse.upsert('leads', merged, key=lambda record: keys[id(record)],
+                              merge=lambda stored, new: new, on_change=on_change)
+        self.warehouse.delete('leads', removed)
+        return len(removed)
+
+    def export(self) -> int:
+        """Write the leads table to master_leads.csv"""
+        return self.warehouse.export_csv(
+            'leads', str(self.output_file), FIELDNAMES,
+            order_by=('region', '$.country', 'city', '$.company_name'))
     
     def deduplicate(self, records: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Deduplicate records based on normalized key"""
@@ -183,78 +337,73 @@ class LeadMerger:
         print(f"Removed {duplicates} duplicate records")
         return list(seen.values())
     
-    def run(self):
-        """Main merge and dedupe workflow"""
+    def run(self, full: bool = False):
+        """Main merge and dedupe workflow; only new or changed source rows unless full"""
         print("=" * 80)
         print("Master Leads Merger & Deduplicator")
         print("=" * 80)
         
         all_records = []
         
-        # Load all sources
-        all_records.extend(self.load_showrooms())
-        all_records.extend(self.load_designer_showrooms())
-        
-        print(f"\nTotal records before deduplication: {len(all_records)}")
+        # Load the sources; master_leads.csv is the export of the table once it has leads
+        if self.warehouse.count('leads') == 0:
+            all_records.extend(self.load_showrooms())
+        rows, mark, hashes = self.read_new_rows('designer_showrooms', full)
+        all_records.extend(self.designer_showroom_lead(row) for row in rows)
         
-        # Deduplicate
-        deduped = self.deduplicate(all_records)
+        print(f"\nSource records to merge: {len(all_records)}")
         
-        print(f"Total records after deduplication: {len(deduped)}")
+        # Every lead this run inserts, updates or folds away goes to the delta file
+        with CsvSink(str(self.delta_file), fieldnames=['change', 'key'] + FIELDNAMES) as delta:
+            changed: Set[str] = set()
+
+            def on_change(outcome, key, lead):
+                changed.add(key)
+                delta.write({**lead, 'change': outcome, 'key': key})
+
+            # Deduplicate against the warehouse: only new or changed leads are written
+            counts = self.upsert(all_records, on_change=on_change)
+            print(f"Inserted {counts['inserted']}, updated {counts['updated']}, "
+                  f"unchanged {counts['unchanged']}, skipped {counts['skipped']} (no name)")
+            removed = 0
+            if getattr(settings, 'FUZZY_DEDUPE', True):
+                removed = self.fuzzy_merge(None if full else set(changed), on_change=on_change)
+                print(f"Fuzzy-merged {removed} near-duplicate leads")
+        print(f"Delta: {delta.rows_written} changes in {self.delta_file}")
         
-        # Sort by region, country, city, company name
-        deduped.sort(key=lambda x: (
-            x.get('region', ''),
-            x.get('country', ''),
-            x.get('city', ''),
-            x.get('company_name', '')
-        ))
+        # The rows are in the warehouse now; the next run starts after them
+        if mark:
+            self.warehouse.add_row_hashes('designer_showrooms', hashes)
+            self.warehouse.set_source_mark('designer_showrooms', mark)
         
-        # Add merged_at timestamp
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        for rec in deduped:
-            rec['merged_at'] = timestamp
+        total = self.warehouse.count('leads')
+        print(f"Total leads after deduplication: {total}")
         
-        # Save to CSV
-        if deduped:
-            fieldnames = [
-                'lead_type', 'company_name', 'description', 'email', 'phone',
-                'website', 'instagram', 'facebook', 'city', 'country', 'region',
-                'source', 'source_url', 'scraped_date', 'merged_at'
-            ]
-            
-            self.output_file.parent.mkdir(parents=True, exist_ok=True)
-            with self.output_file.open('w', encoding='utf-8-sig', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for rec in deduped:
-                    writer.writerow(rec)
-            
-            print(f"\n[OK] Saved {len(deduped)} merged leads to {self.output_file}")
+        if not total:
+            print("\nNo records to save")
+        elif not (changed or full) and self.output_file.exists():
+            print(f"\n[OK] No changes; {self.output_file} is up to date")
+        else:
+            self.export()
+            print(f"\n[OK] Saved {total} merged leads to {self.output_file}")
             
             # Print summary by source
             print("\nBreakdown by source:")
-            source_counts = {}
-            for rec in deduped:
-                src = rec.get('source', 'unknown')
-                source_counts[src] = source_counts.get(src, 0) + 1
-            
-            for src, count in sorted(source_counts.items()):
-                print(f"  {src}: {count}")
+            for src, count in self.warehouse.counts_by('leads', '$.source').items():
+                print(f"  {src or 'unknown'}: {count}")
             
             # Print summary by region
             print("\nBreakdown by region:")
-            region_counts = {}
-            for rec in deduped:
-                rgn = rec.get('region', 'unknown')
-                region_counts[rgn] = region_counts.get(rgn, 0) + 1
-            
-            for rgn, count in sorted(region_counts.items()):
-                print(f"  {rgn}: {count}")
-        else:
-            print("\nNo records to save")
+            for rgn, count in self.warehouse.counts_by('leads', 'region').items():
+                print(f"  {rgn or 'unknown'}: {count}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Merge and deduplicate the lead sources')
+    parser.add_argument('--full', action='store_true', help='re-read every source row, not only new or changed ones')
+    args = parser.parse_args(argv)
+    LeadMerger().run(full=args.full)
 
 
 if __name__ == '__main__':
-    merger = LeadMerger()
-    merger.run()
+    main()
@@ -0,0 +1,56 @@
+"""
+Process pool for the parse stage of scrapers.
+
+Scrapers fetch raw snapshots (HTML or extracted rows) and hand them to pure,
+picklable parse functions (module-level functions or classmethods). ParsePool
+runs those across cores and yields results in input order as they complete.
+With one worker it parses inline.
+"""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from config import settings
+
+
+class ParsePool:
+    """Ordered map/submit over a lazily started ProcessPoolExecutor.
+
+    Args:
+        workers: worker processes, defaults to settings.PARSE_WORKERS or the core count
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or getattr(settings, 'PARSE_WORKERS', 0) or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def inline(self) -> bool:
+        return self.workers <= 1
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """Run fn(*args) in a worker; the returned Future also works with asyncio.wrap_future()."""
+        if self.inline:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._pool().submit(fn, *args)
+
+    def map(self, fn: Callable[..., Any], *iterables: Iterable, chunksize: int = 16) -> Iterator[Any]:
+        """Like map(), streamed back in input order."""
+        if self.inline:
+            return map(fn, *iterables)
+        return self._pool().map(fn, *iterables, chunksize=chunksize)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,198 @@
+"""
+Adaptive per-host rate limiting.
+
+Each host gets a token bucket whose rate adapts to how the host responds (AIMD):
+every healthy response adds RATE_LIMIT_INCREASE requests/second up to
+RATE_LIMIT_MAX_RPS, while a 429, a 5xx, a network error or a response slower
+than RATE_LIMIT_SLOW_MS multiplies the rate by RATE_LIMIT_DECREASE (down to
+RATE_LIMIT_MIN_RPS). A Retry-After header (seconds or HTTP date) pauses the
+host until then. So crawls run as fast as each host allows instead of sleeping
+a worst-case constant between requests.
+
+    limiter = shared_limiter()
+    limiter.acquire(host)               # or: await limiter.acquire_async(host)
+    response = requests.get(url)
+    limiter.record(host, response.status_code, latency_ms, response.headers.get('Retry-After'))
+
+Callers reserve a slot and then sleep outside the lock, so concurrent threads
+and coroutines on one host queue up behind each other at the current rate.
+"""
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from config import settings
+
+
+def host_of(url: str) -> str:
+    """Bucket key for url (its netloc); a bare host is returned as is."""
+    return urlparse(url).netloc or url
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket for one host. Not thread-safe on its own; HostRateLimiter locks it."""
+
+    def __init__(self, rate: float, burst: float, min_rate: float, max_rate: float):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.counts = {'requests': 0, 'throttled': 0, 'errors': 0, 'slow': 0, 'waited_s': 0.0}
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        # A negative balance is the queue of callers that reserved ahead of us
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        wait = max(wait, self.blocked_until - now)
+        self.counts['requests'] += 1
+        self.counts['waited_s'] += wait
+        return wait
+
+    def increase(self, step: float):
+        self.rate = min(self.max_rate, self.rate + step)
+
+    def decrease(self, factor: float):
+        self.rate = max(self.min_rate, self.rate * factor)
+        # Drop saved-up burst so the slower rate takes effect at once
+        self.tokens = min(self.tokens, 0.0)
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class HostRateLimiter:
+    """Token buckets per host, adjusted additively up and multiplicatively down.
+
+    Args:
+        initial_rps: starting rate of a new host, defaults to settings.RATE_LIMIT_INITIAL_RPS
+        min_rps / max_rps: bounds of the adaptive rate
+        burst: requests a host may take back to back after being idle
+        increase: requests/second added per healthy response
+        decrease: factor applied to the rate on 429/5xx/errors/slow responses
+        slow_ms: responses slower than this count as a sign of overload
+        host_max_rps: per-host ceilings that override max_rps (settings.RATE_LIMIT_HOSTS)
+    """
+
+    def __init__(self, initial_rps: Optional[float] = None, min_rps: Optional[float] = None,
+                 max_rps: Optional[float] = None, burst: Optional[float] = None,
+                 increase: Optional[float] = None, decrease: Optional[float] = None,
+                 slow_ms: Optional[float] = None, host_max_rps: Optional[Dict[str, float]] = None):
+        self.initial_rps = initial_rps or getattr(settings, 'RATE_LIMIT_INITIAL_RPS', 1.0)
+        self.min_rps = min_rps or getattr(settings, 'RATE_LIMIT_MIN_RPS', 0.1)
+        self.max_rps = max_rps or getattr(settings, 'RATE_LIMIT_MAX_RPS', 8.0)
+        self.burst = burst or getattr(settings, 'RATE_LIMIT_BURST', 2)
+        self.increase = increase or getattr(settings, 'RATE_LIMIT_INCREASE', 0.25)
+        self.decrease = decrease or getattr(settings, 'RATE_LIMIT_DECREASE', 0.5)
+        self.slow_ms = slow_ms or getattr(settings, 'RATE_LIMIT_SLOW_MS', 5000)
+        self.host_max_rps = dict(host_max_rps if host_max_rps is not None
+                                 else getattr(settings, 'RATE_LIMIT_HOSTS', {}))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            return self._bucket(host)
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            max_rate = self.host_max_rps.get(host, self.max_rps)
+            self._buckets[host] = TokenBucket(min(self.initial_rps, max_rate), self.burst,
+                                              min(self.min_rps, max_rate), max_rate)
+        return self._buckets[host]
+
+    def reserve(self, host: str) -> float:
+        """Reserve the next request slot on host; returns the seconds to wait for it."""
+        with self._lock:
+            return self._bucket(host).reserve()
+
+    def acquire(self, host: str):
+        """Block until a request to host is allowed."""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, host: str):
+        """Async version of acquire(): waits without blocking the event loop."""
+        wait = self.reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, host: str, status: Optional[int] = None, latency_ms: Optional[float] = None,
+               retry_after: Optional[str] = None, error: bool = False):
+        """Feed back one response (or error=True for a failed request) to adapt host's rate."""
+        pause = parse_retry_after(retry_after)
+        with self._lock:
+            bucket = self._bucket(host)
+            if pause:
+                bucket.block(pause)
+            if status == 429 or (status is not None and status >= 500) or error:
+                bucket.counts['throttled' if status == 429 else 'errors'] += 1
+                bucket.decrease(self.decrease)
+            elif latency_ms is not None and latency_ms > self.slow_ms:
+                bucket.counts['slow'] += 1
+                bucket.decrease(self.decrease)
+            else:
+                bucket.increase(self.increase)
+
+    def share(self, parts: int):
+        """Keep 1/parts of every host's rate, for one of `parts` processes crawling the same hosts."""
+        if parts <= 1:
+            return
+        with self._lock:
+            self.initial_rps /= parts
+            self.min_rps /= parts
+            self.max_rps /= parts
+            self.burst = max(1, self.burst / parts)
+            self.host_max_rps = {host: rps / parts for host, rps in self.host_max_rps.items()}
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Current rate and counters per host."""
+        with self._lock:
+            return {host: {'rps': round(b.rate, 2), **b.counts} for host, b in self._buckets.items()}
+
+    def report(self) -> str:
+        lines = []
+        for host, s in sorted(self.stats().items()):
+            lines.append(f"  {host}: {s['rps']} req/s after {s['requests']} requests "
+                         f"({s['throttled']} throttled, {s['errors']} errors, {s['slow']} slow, "
+                         f"{s['waited_s']:.1f}s waited)")
+        return '\n'.join(lines)
+
+
+_shared: Optional[HostRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def shared_limiter() -> HostRateLimiter:
+    """The process-wide limiter, so scrapers hitting the same host share its bucket."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostRateLimiter()
+        return _shared
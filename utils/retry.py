@@ -0,0 +1,420 @@
+"""
+Retries with error classification, jittered backoff and per-host circuit breakers.
+
+Failures are classified before deciding what to do with them:
+
+    timeout       request or navigation timed out                   retried, counts against the host
+    network       connection refused/reset, DNS, TLS (net::ERR_*)   retried, counts against the host
+    server        HTTP 5xx                                          retried, counts against the host
+    blocked       bot-protection / captcha page                     retried once, counts against the host
+    throttled     HTTP 429                                          retried after Retry-After
+    navigation    page crashed, frame detached, context closed      retried
+    client        other HTTP 4xx                                    not retried
+    circuit_open  host's breaker is open                            not retried (load shed)
+    error         anything else (parse errors, bugs)                not retried
+
+Backoff doubles from RETRY_DELAY up to RETRY_MAX_DELAY with equal jitter (half
+fixed, half random) so parallel workers do not retry in lockstep. Each host has
+a circuit breaker: BREAKER_FAILURES consecutive host failures open it for
+BREAKER_COOLDOWN seconds, during which calls fail at once with CircuitOpenError
+instead of waiting out another timeout. Then a single probe is let through; if
+it fails the cooldown doubles (up to BREAKER_MAX_COOLDOWN).
+
+    retrier = Retrier(breakers=shared_breakers())
+    html = retrier.call(url, fetch, url)            # or: await retrier.call_async(url, afetch, url)
+    print(retrier.metrics.summary())
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from config import settings
+from utils.rate_limiter import host_of, parse_retry_after
+
+TIMEOUT = 'timeout'
+NETWORK = 'network'
+SERVER = 'server'
+BLOCKED = 'blocked'
+THROTTLED = 'throttled'
+NAVIGATION = 'navigation'
+CLIENT = 'client'
+CIRCUIT_OPEN = 'circuit_open'
+ERROR = 'error'
+
+# Kinds that say the host itself is unhealthy and feed its circuit breaker
+HOST_FAILURES = {TIMEOUT, NETWORK, SERVER, BLOCKED}
+# Kinds worth another attempt, with the attempt cap for each (None = RETRY_ATTEMPTS)
+RETRYABLE: Dict[str, Optional[int]] = {
+    TIMEOUT: None, NETWORK: None, SERVER: None, THROTTLED: None, NAVIGATION: None, BLOCKED: 2,
+}
+
+# Markers of bot-protection interstitials (Cloudflare, Akamai, Imperva, PerimeterX, DataDome)
+BLOCK_MARKERS = (
+    '<title>just a moment...</title>', '<title>attention required! | cloudflare</title>',
+    'cf-browser-verification', '_cf_chl_opt', '_incapsula_resource', 'incapsula incident id',
+    'px-captcha', 'captcha-delivery.com', '<title>access denied</title>', 'please verify you are a human',
+)
+# Block pages are small; only the head of a document is searched
+BLOCK_SCAN_CHARS = 20000
+
+NAVIGATION_MARKERS = ('page crashed', 'frame was detached', 'execution context was destroyed',
+                      'target page, context or browser has been closed', 'navigation interrupted',
+                      'interrupted by another navigation')
+
+
+class HttpStatusError(RuntimeError):
+    """A response whose status the caller cannot use."""
+
+    def __init__(self, status: int, url: str = '', retry_after: Optional[str] = None):
+        super().__init__(f'HTTP {status}' + (f' for {url}' if url else ''))
+        self.status = status
+        self.url = url
+        self.retry_after = retry_after
+
+
+class BlockedError(RuntimeError):
+    """The host answered with a bot-protection or captcha page."""
+
+    def __init__(self, url: str = '', status: Optional[int] = None):
+        super().__init__('Blocked by bot protection' + (f' on {url}' if url else '')
+                         + (f' (HTTP {status})' if status else ''))
+        self.url = url
+        self.status = status
+
+
+class CircuitOpenError(RuntimeError):
+    """The host's circuit breaker is open; the request was not sent."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f'Circuit open for {host}, retry in {retry_in:.0f}s')
+        self.host = host
+        self.retry_in = retry_in
+
+
+def detect_block(text: Optional[str]) -> bool:
+    """True if the HTML looks like a bot-protection page."""
+    if not text:
+        return False
+    head = text[:BLOCK_SCAN_CHARS].lower()
+    return any(marker in head for marker in BLOCK_MARKERS)
+
+
+def raise_for_response(status: Optional[int], url: str = '', body: Optional[str] = None,
+                       retry_after: Optional[str] = None, client_errors: bool = True):
+    """Raise BlockedError / HttpStatusError for responses that cannot be used.
+
+    client_errors=False lets 4xx other than 429 through (navigate() returns those
+    pages to the scraper as it always has).
+    """
+    if body is not None and detect_block(body):
+        raise BlockedError(url, status)
+    if status is None or status < 400:
+        return
+    if status == 429 or status >= 500 or client_errors:
+        raise HttpStatusError(status, url, retry_after)
+
+
+def classify(exc: BaseException) -> str:
+    """Failure kind of exc (see the module docstring)."""
+    if isinstance(exc, CircuitOpenError):
+        return CIRCUIT_OPEN
+    if isinstance(exc, BlockedError):
+        return BLOCKED
+    if isinstance(exc, HttpStatusError):
+        if exc.status == 429:
+            return THROTTLED
+        return SERVER if exc.status >= 500 else CLIENT
+    if isinstance(exc, (TimeoutError, requests.Timeout)) or type(exc).__name__ == 'TimeoutError':
+        return TIMEOUT
+    message = str(exc)
+    if isinstance(exc, (ConnectionError, requests.ConnectionError)) or 'net::ERR_' in message \
+            or 'NS_ERROR_' in message:
+        return NETWORK
+    if type(exc).__module__.startswith('playwright') and \
+            any(marker in message.lower() for marker in NAVIGATION_MARKERS):
+        return NAVIGATION
+    return ERROR
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for failures another attempt (now or on a later run) may get past."""
+    return classify(exc) in RETRYABLE or isinstance(exc, CircuitOpenError)
+
+
+class CircuitBreaker:
+    """Breaker for one host: closed -> open after `threshold` failures -> half-open probe."""
+
+    def __init__(self, threshold: int, cooldown: float, max_cooldown: float):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probing = False
+        self.probe_deadline = 0.0
+        self.opens = 0
+        self.shed = 0
+
+    def allow(self) -> float:
+        """0 if a request may go out now, else the seconds until the next probe."""
+        if self.state == 'closed':
+            return 0.0
+        now = time.monotonic()
+        if self.state == 'open' and now >= self.opened_until:
+            self.state = 'half_open'
+        # A probe that never reported back is replaced after one cooldown
+        if self.state == 'half_open' and (not self.probing or now >= self.probe_deadline):
+            self.probing = True
+            self.probe_deadline = now + self.cooldown
+            return 0.0
+        self.shed += 1
+        return max(self.opened_until - now, 1.0)
+
+    def success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.probing = False
+        self.cooldown = self.base_cooldown
+
+    def failure(self):
+        self.failures += 1
+        if self.state == 'half_open':
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == 'closed' and self.failures >= self.threshold:
+            self._open()
+
+    def _open(self):
+        self.state = 'open'
+        self.probing = False
+        self.opened_until = time.monotonic() + self.cooldown
+        self.opens += 1
+
+
+class BreakerBoard:
+    """Circuit breakers per host.
+
+    Args:
+        threshold: consecutive host failures that open a breaker, defaults to settings.BREAKER_FAILURES
+        cooldown: seconds a breaker stays open before a probe, defaults to settings.BREAKER_COOLDOWN
+        max_cooldown: cap for the cooldown, which doubles after each failed probe
+    """
+
+    def __init__(self, threshold: Optional[int] = None, cooldown: Optional[float] = None,
+                 max_cooldown: Optional[float] = None):
+        self.threshold = threshold or getattr(settings, 'BREAKER_FAILURES', 5)
+        self.cooldown = cooldown or getattr(settings, 'BREAKER_COOLDOWN', 30)
+        self.max_cooldown = max_cooldown or getattr(settings, 'BREAKER_MAX_COOLDOWN', 600)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.threshold, self.cooldown, self.max_cooldown)
+        return self._breakers[host]
+
+    def check(self, host: str):
+        """Raise CircuitOpenError if host's breaker is open (a half-open breaker admits one probe)."""
+        with self._lock:
+            wait = self._breaker(host).allow()
+        if wait:
+            raise CircuitOpenError(host, wait)
+
+    def success(self, host: str):
+        with self._lock:
+            self._breaker(host).success()
+
+    def failure(self, host: str, kind: str = TIMEOUT):
+        """Record a failed request; only host-level kinds (timeouts, network, 5xx, blocks) count.
+
+        Other failures (a 404, a 429) mean the host answered, so they close the breaker.
+        """
+        with self._lock:
+            if kind in HOST_FAILURES:
+                self._breaker(host).failure()
+            else:
+                self._breaker(host).success()
+
+    def states(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {host: {'state': b.state, 'failures': b.failures, 'opens': b.opens, 'shed': b.shed}
+                    for host, b in self._breakers.items() if b.opens}
+
+
+class RetryMetrics:
+    """Counters per failure kind: failed attempts, retries, give-ups and time lost to them.
+
+    Time lost is the duration of failed attempts plus backoff, summed over concurrent calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.succeeded_after_retry = 0
+        self.failed = {}
+        self.retries = {}
+        self.gave_up = {}
+        self.wasted_s = {}
+        self._lock = threading.Lock()
+
+    def _add(self, counter: Dict[str, float], kind: str, value: float = 1):
+        counter[kind] = counter.get(kind, 0) + value
+
+    def record_failure(self, kind: str, elapsed_s: float):
+        with self._lock:
+            self._add(self.failed, kind)
+            self._add(self.wasted_s, kind, elapsed_s)
+
+    def record_retry(self, kind: str, delay_s: float):
+        with self._lock:
+            self._add(self.retries, kind)
+            self._add(self.wasted_s, kind, delay_s)
+
+    def record_give_up(self, kind: str):
+        with self._lock:
+            self._add(self.gave_up, kind)
+
+    def record_call(self, attempts: int):
+        with self._lock:
+            self.calls += 1
+            if attempts > 1:
+                self.succeeded_after_retry += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'succeeded_after_retry': self.succeeded_after_retry,
+                'failed': dict(self.failed),
+                'retries': dict(self.retries),
+                'gave_up': dict(self.gave_up),
+                'wasted_s': {k: round(v, 2) for k, v in self.wasted_s.items()},
+            }
+
+    def summary(self) -> str:
+        data = self.as_dict()
+        kinds = sorted(set(data['failed']) | set(data['gave_up']))
+        parts = [f"{kind}: {data['failed'].get(kind, 0)} failed, {data['retries'].get(kind, 0)} retried, "
+                 f"{data['gave_up'].get(kind, 0)} gave up, {data['wasted_s'].get(kind, 0):.1f}s lost"
+                 for kind in kinds]
+        head = f"{data['calls']} calls ok ({data['succeeded_after_retry']} after a retry)"
+        return '; '.join([head] + parts)
+
+    def export(self, path: Optional[str] = None, **labels):
+        """Append the counters as one JSON line (default settings.RETRY_METRICS_FILE)."""
+        path = Path(path or getattr(settings, 'RETRY_METRICS_FILE', 'logs/retry_metrics.jsonl'))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {'time': datetime.now().isoformat(timespec='seconds'), **labels, **self.as_dict()}
+        with path.open('a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+class Retrier:
+    """Runs a callable with classified retries and jittered exponential backoff.
+
+    Args:
+        attempts: attempts per call for retryable kinds, defaults to settings.RETRY_ATTEMPTS
+        base_delay: first backoff in seconds, defaults to settings.RETRY_DELAY
+        max_delay: backoff cap, defaults to settings.RETRY_MAX_DELAY
+        breakers: when given, calls are gated by and fed to these breakers; leave it
+            out when the network layer (BaseScraper.navigate/fetch_html) does that itself
+        metrics: RetryMetrics to count into (a new one by default)
+    """
+
+    def __init__(self, attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None, breakers: Optional[BreakerBoard] = None,
+                 metrics: Optional[RetryMetrics] = None):
+        self.attempts = attempts or getattr(settings, 'RETRY_ATTEMPTS', 3)
+        self.base_delay = base_delay if base_delay is not None else getattr(settings, 'RETRY_DELAY', 5)
+        self.max_delay = max_delay or getattr(settings, 'RETRY_MAX_DELAY', 60)
+        self.breakers = breakers
+        self.metrics = metrics or RetryMetrics()
+
+    def backoff(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """Delay before attempt + 1: doubling with equal jitter, at least the server's Retry-After."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        retry_after = parse_retry_after(getattr(exc, 'retry_after', None))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _after_failure(self, host: str, exc: BaseException, attempt: int, elapsed: float) -> Optional[float]:
+        """Record a failed attempt; return the delay before the next one, or None to give up."""
+        kind = classify(exc)
+        self.metrics.record_failure(kind, elapsed)
+        if self.breakers is not None and kind != CIRCUIT_OPEN:
+            self.breakers.failure(host, kind)
+        limit = min(RETRYABLE[kind] or self.attempts, self.attempts) if kind in RETRYABLE else 1
+        if attempt >= limit:
+            self.metrics.record_give_up(kind)
+            return None
+        delay = self.backoff(attempt, exc)
+        self.metrics.record_retry(kind, delay)
+        return delay
+
+    def _succeeded(self, host: str, attempt: int):
+        if self.breakers is not None:
+            self.breakers.success(host)
+        self.metrics.record_call(attempt)
+
+    def call(self, url: Optional[str], fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """fn(*args, **kwargs) with retries; url (or host) picks the circuit breaker."""
+        host = host_of(url) if url else ''
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.monotonic()
+            try:
+                if self.breakers is not None:
+                    self.breakers.check(host)
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(host, e, attempt, time.monotonic() - start)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._succeeded(host, attempt)
+            return result
+
+    async def call_async(self, url: Optional[str], fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Async version of call(): fn returns an awaitable and backoff does not block the loop."""
+        host = host_of(url) if url else ''
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.monotonic()
+            try:
+                if self.breakers is not None:
+                    self.breakers.check(host)
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(host, e, attempt, time.monotonic() - start)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded(host, attempt)
+            return result
+
+
+_shared: Optional[BreakerBoard] = None
+_shared_lock = threading.Lock()
+
+
+def shared_breakers() -> BreakerBoard:
+    """The process-wide breakers, so every scraper stops hitting a host that is down."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BreakerBoard()
+        return _shared
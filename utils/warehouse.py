@@ -0,0 +1,452 @@
+"""
+Lead warehouse: one SQLite table per entity (leads, brands, tradeshows, exhibitors, events).
+
+Every row is stored under a key built from its normalized fields (see KEYS), with
+the full record as JSON next to indexed columns for the normalized name, email,
+website domain, city and region. upsert() looks up the stored rows for a batch
+by key, merges, and writes only the rows whose content changed. Scrape timestamps
+are left out of the comparison. A nightly run therefore costs in proportion to
+what changed, not to the size of the data. The CSV files in data/processed/ are
+exports of these tables (export_csv(), or export() for .xlsx as well); the fields
+stored per entity are kept in entity_columns, so an export reads the rows once.
+
+For incremental merges, source_mark()/set_source_mark() keep a high-water mark per
+source file and seen_row_hashes()/add_row_hashes() the content hashes of the
+source rows already folded in (see LeadMerger.read_new_rows).
+
+Usage:
+    python -m utils.warehouse stats
+    python -m utils.warehouse export tradeshows data/processed/tradeshows.xlsx
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from urllib.parse import urlparse
+
+from config import settings
+
+try:
+    import pandas as pd
+except Exception:
+    pd = None
+
+ENTITIES = ('leads', 'brands', 'tradeshows', 'exhibitors', 'events')
+
+# Fields a record may carry its name / city in (scrapers differ)
+NAME_FIELDS = ('company_name', 'brand_name', 'event_name', 'name')
+CITY_FIELDS = ('city', 'primary_city', 'tradeshow_city')
+
+# Key parts per entity: 'name', 'city' and 'contact' (website domain, else email) are
+# normalized; other parts are record fields, compared case-insensitively
+KEYS = {
+    'leads': ('name', 'city', 'contact'),
+    'brands': ('name',),
+    'tradeshows': ('name', 'city', 'source_url'),
+    'exhibitors': ('name', 'source_tradeshow'),
+    'events': ('name', 'city', 'start_date'),
+}
+
+# Not part of a row's content: a re-scrape that only moves these does not rewrite the row
+VOLATILE_FIELDS = ('scraped_date', 'scraped_at', 'merged_at')
+
+MISSING = ('', 'n/a', 'none', 'nan')
+
+# SQLite's default limit on bound parameters is 999 before 3.32
+_CHUNK = 500
+
+Merge = Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]
+
+
+def first_value(record: Dict[str, Any], fields: Sequence[str]) -> str:
+    """First of fields that has a value (not empty or N/A), stripped."""
+    for field in fields:
+        value = str(record.get(field) or '').strip()
+        if value.lower() not in MISSING:
+            return value
+    return ''
+
+
+def normalize_name(name: str) -> str:
+    """Lowercased name without showroom/department/social suffixes and trailing punctuation."""
+    n = re.sub(r'\s+', ' ', (name or '').lower().strip())
+    if n in MISSING:
+        return ''
+    n = re.sub(r'\s+(showroom|sales department|sales contact|instagram|facebook|twitter)$', '', n)
+    return re.sub(r'[,\.\-\s]+$', '', n).strip()
+
+
+def normalize_email(email: str) -> str:
+    e = (email or '').lower().strip()
+    return '' if e in MISSING else e
+
+
+def website_domain(website: str) -> str:
+    """Host of a website without scheme or www., e.g. 'brand.com' for 'https://www.brand.com/about'."""
+    w = (website or '').lower().strip()
+    if w in MISSING:
+        return ''
+    host = urlparse(w if '//' in w else '//' + w).netloc
+    return re.sub(r'^www\.', '', host.split(':')[0])
+
+
+def index_fields(record: Dict[str, Any]) -> Dict[str, str]:
+    """The indexed columns of a record."""
+    domain = website_domain(first_value(record, ('website',)))
+    email = normalize_email(first_value(record, ('email',)))
+    return {
+        'name': normalize_name(first_value(record, NAME_FIELDS)),
+        'email': email,
+        'domain': domain,
+        'city': first_value(record, CITY_FIELDS).lower(),
+        'region': first_value(record, ('region',)),
+        'contact': domain or email,
+    }
+
+
+def entity_key(entity: str, record: Dict[str, Any]) -> str:
+    """Storage key of record in entity's table; '' when it has no name."""
+    fields = index_fields(record)
+    if not fields['name']:
+        return ''
+    return '|'.join(fields[part] if part in fields else first_value(record, (part,)).lower()
+                    for part in KEYS[entity])
+
+
+def fill_missing(stored: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge that keeps stored values and only fills fields that are empty or N/A."""
+    return {**new, **{k: v for k, v in stored.items() if str(v or '').strip().lower() not in MISSING}}
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    content = {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class Warehouse:
+    """SQLite (WAL) store of scraped entities with indexed, change-only upserts.
+
+    Args:
+        path: database file, defaults to settings.WAREHOUSE_DB
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or getattr(settings, 'WAREHOUSE_DB', 'data/warehouse.sqlite3'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        for entity in ENTITIES:
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {entity} ('
+                ' key TEXT PRIMARY KEY, name TEXT NOT NULL, email TEXT, domain TEXT, city TEXT, region TEXT,'
+                ' data TEXT NOT NULL, content_hash TEXT NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)')
+            for column in ('name', 'email', 'domain', 'city', 'region'):
+                self._db.execute(f'CREATE INDEX IF NOT EXISTS {entity}_{column} ON {entity} ({column})')
+        # Every field stored per entity, in order of first storage (the default CSV columns)
+        has_columns = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entity_columns'").fetchone()
+        self._db.execute('CREATE TABLE IF NOT EXISTS entity_columns ('
+                         ' entity TEXT NOT NULL, name TEXT NOT NULL, PRIMARY KEY (entity, name))')
+        if not has_columns:
+            self._backfill_columns()
+        self._db.execute('CREATE TABLE IF NOT EXISTS source_marks ('
+                         ' source TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS source_rows ('
+                         ' source TEXT NOT NULL, row_hash TEXT NOT NULL, PRIMARY KEY (source, row_hash)) WITHOUT ROWID')
+
+    def _backfill_columns(self):
+        # Databases from before entity_columns: one scan of the stored records, on first open
+        for entity in ENTITIES:
+            fields = dict.fromkeys(field for (data,) in self._db.execute(f'SELECT data FROM {entity} ORDER BY rowid')
+                                   for field in json.loads(data))
+            self._db.executemany('INSERT OR IGNORE INTO entity_columns VALUES (?, ?)',
+                                 ((entity, field) for field in fields))
+
+    @staticmethod
+    def _table(entity: str) -> str:
+        if entity not in ENTITIES:
+            raise ValueError(f'Unknown entity {entity!r}; expected one of {", ".join(ENTITIES)}')
+        return entity
+
+    def upsert(self, entity: str, records: Iterable[Dict[str, Any]], key: Optional[Callable[[Dict], str]] = None,
+               merge: Optional[Merge] = None,
+               on_change: Optional[Callable[[str, str, Dict[str, Any]], None]] = None) -> Dict[str, int]:
+        """Insert new records and update changed ones; returns counts per outcome.
+
+        Records with the same key are combined with merge(stored, new), which defaults
+        to the new values overriding the stored ones field by field. key defaults to
+        entity_key(). Records without a key are skipped. on_change('inserted' or
+        'updated', key, record) is called for every row written.
+        """
+        table = self._table(entity)
+        key = key or (lambda record: entity_key(entity, record))
+        merge = merge or (lambda stored, new: {**stored, **new})
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        batch: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            k = key(record)
+            if not k.strip('|'):
+                counts['skipped'] += 1
+                continue
+            batch[k] = merge(batch[k], record) if k in batch else dict(record)
+        keys = list(batch)
+        now = time.time()
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            marks = ','.join('?' * len(chunk))
+            with self._lock:
+                stored = {k: (json.loads(data), digest) for k, data, digest in self._db.execute(
+                    f'SELECT key, data, content_hash FROM {table} WHERE key IN ({marks})', chunk)}
+            rows = []
+            fields: Dict[str, None] = {}
+            for k in chunk:
+                record = batch[k]
+                if k in stored:
+                    record = merge(stored[k][0], record)
+                digest = content_hash(record)
+                if k in stored and stored[k][1] == digest:
+                    counts['unchanged'] += 1
+                    continue
+                outcome = 'updated' if k in stored else 'inserted'
+                counts[outcome] += 1
+                if on_change:
+                    on_change(outcome, k, record)
+                fields.update(dict.fromkeys(record))
+                indexed = index_fields(record)
+                rows.append((k, indexed['name'], indexed['email'], indexed['domain'], indexed['city'],
+                             indexed['region'], json.dumps(record, default=str), digest, now, now))
+            if rows:
+                self._write(table, rows, fields)
+        return counts
+
+    def _write(self, table: str, rows: List[tuple], fields: Iterable[str] = ()):
+        with self._lock:
+            # IMMEDIATE takes the write lock up front; other writers wait (busy timeout) instead of failing
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany(
+                    f'INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET'
+                    ' name = excluded.name, email = excluded.email, domain = excluded.domain, city = excluded.city,'
+                    ' region = excluded.region, data = excluded.data, content_hash = excluded.content_hash,'
+                    ' updated_at = excluded.updated_at', rows)
+                self._db.executemany('INSERT OR IGNORE INTO entity_columns VALUES (?, ?)',
+                                     ((table, field) for field in fields))
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def rows(self, entity: str, order_by: Sequence[str] = ('region', 'city', 'name'),
+             where: str = '', params: Sequence[Any] = (), with_keys: bool = False) -> Iterator[Any]:
+        """Stored records, streamed in order; (key, record) pairs with with_keys.
+
+        order_by takes columns or record fields ('$.country').
+        """
+        table = self._table(entity)
+        order = ', '.join(f"json_extract(data, '{c}')" if c.startswith('$.') else c for c in order_by)
+        sql = f'SELECT key, data FROM {table}' + (f' WHERE {where}' if where else '') + (f' ORDER BY {order}' if order else '')
+        with self._lock:
+            cursor = self._db.execute(sql, tuple(params))
+        while True:
+            # Fetched in batches so memory stays flat and other threads can use the connection in between
+            with self._lock:
+                batch = cursor.fetchmany(_CHUNK)
+            if not batch:
+                return
+            for key, data in batch:
+                yield (key, json.loads(data)) if with_keys else json.loads(data)
+
+    def get(self, entity: str, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored records by key, for those of keys that are stored."""
+        table = self._table(entity)
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), _CHUNK):
+            chunk = keys[i:i + _CHUNK]
+            with self._lock:
+                found.update((k, json.loads(data)) for k, data in self._db.execute(
+                    f'SELECT key, data FROM {table} WHERE key IN ({",".join("?" * len(chunk))})', chunk))
+        return found
+
+    def max_number(self, entity: str, field: str, prefix: str) -> int:
+        """Highest n among the prefix + n values of a record field ('$.event_id', 'TS'); 0 if none."""
+        table = self._table(entity)
+        with self._lock:
+            row = self._db.execute(
+                f'SELECT MAX(CAST(substr(json_extract(data, ?), ?) AS INTEGER)) FROM {table}'
+                ' WHERE json_extract(data, ?) GLOB ?', (field, len(prefix) + 1, field, prefix + '[0-9]*')).fetchone()
+        return row[0] or 0
+
+    def find(self, entity: str, **columns: str) -> List[Dict[str, Any]]:
+        """Records matching indexed columns, e.g. find('leads', email='info@brand.com', city='paris')."""
+        normalizers = {'name': normalize_name, 'email': normalize_email, 'domain': website_domain,
+                       'city': lambda v: (v or '').lower().strip(), 'region': lambda v: (v or '').strip()}
+        unknown = set(columns) - set(normalizers)
+        if unknown:
+            raise ValueError(f'Not indexed: {", ".join(sorted(unknown))}')
+        where = ' AND '.join(f'{column} = ?' for column in columns)
+        return list(self.rows(entity, order_by=(), where=where,
+                              params=[normalizers[c](v) for c, v in columns.items()]))
+
+    def delete(self, entity: str, keys: Iterable[str]) -> int:
+        """Remove rows by key; returns how many were removed."""
+        table = self._table(entity)
+        keys = list(keys)
+        removed = 0
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                for i in range(0, len(keys), _CHUNK):
+                    chunk = keys[i:i + _CHUNK]
+                    removed += self._db.execute(
+                        f'DELETE FROM {table} WHERE key IN ({",".join("?" * len(chunk))})', chunk).rowcount
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        return removed
+
+    def import_csv(self, entity: str, path: str, merge: Optional[Merge] = None) -> int:
+        """Load a CSV written before the warehouse into entity's table, if that table is empty.
+
+        The scrapers' CSVs are exports of the tables now and are rewritten from them, so
+        the first run after upgrading imports them to keep their history; later calls
+        return at once. Returns the number of rows imported.
+        """
+        path = Path(path)
+        # Checked once per entity: later calls cost one indexed lookup, not a table scan
+        source = f'legacy_csv:{entity}'
+        if self.source_mark(source):
+            return 0
+        imported = 0
+        with self._lock:
+            empty = self._db.execute(f'SELECT 1 FROM {self._table(entity)} LIMIT 1').fetchone() is None
+        if empty and path.exists():
+            with path.open('r', encoding=getattr(settings, 'CSV_ENCODING', 'utf-8-sig'), newline='') as f:
+                imported = self.upsert(entity, csv.DictReader(f), merge=merge)['inserted']
+            if imported:
+                print(f"[INFO] Imported {imported} {entity} from {path} into the warehouse")
+        self.set_source_mark(source, {'path': str(path), 'imported': imported})
+        return imported
+
+    def source_mark(self, source: str) -> Dict[str, Any]:
+        """High-water mark stored for a source file ({} before its first merge)."""
+        with self._lock:
+            row = self._db.execute('SELECT data FROM source_marks WHERE source = ?', (source,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_source_mark(self, source: str, mark: Dict[str, Any]):
+        with self._lock:
+            self._db.execute('INSERT INTO source_marks VALUES (?, ?, ?) ON CONFLICT(source) DO UPDATE SET'
+                             ' data = excluded.data, updated_at = excluded.updated_at',
+                             (source, json.dumps(mark), time.time()))
+
+    def seen_row_hashes(self, source: str, hashes: Sequence[str]) -> set:
+        """The hashes among `hashes` already recorded for source."""
+        seen = set()
+        for i in range(0, len(hashes), _CHUNK):
+            chunk = list(hashes[i:i + _CHUNK])
+            with self._lock:
+                seen.update(h for (h,) in self._db.execute(
+                    f'SELECT row_hash FROM source_rows WHERE source = ? AND row_hash IN ({",".join("?" * len(chunk))})',
+                    [source] + chunk))
+        return seen
+
+    def add_row_hashes(self, source: str, hashes: Iterable[str]):
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.executemany('INSERT OR IGNORE INTO source_rows VALUES (?, ?)',
+                                     ((source, h) for h in hashes))
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def columns(self, entity: str) -> List[str]:
+        """Every field stored in entity's records, in order of first storage."""
+        table = self._table(entity)
+        with self._lock:
+            return [name for (name,) in self._db.execute(
+                'SELECT name FROM entity_columns WHERE entity = ? ORDER BY rowid', (table,))]
+
+    def count(self, entity: str) -> int:
+        with self._lock:
+            return self._db.execute(f'SELECT COUNT(*) FROM {self._table(entity)}').fetchone()[0]
+
+    def counts_by(self, entity: str, column: str) -> Dict[str, int]:
+        """Rows per value of an indexed column or record field ('$.source')."""
+        table = self._table(entity)
+        expr = f"json_extract(data, '{column}')" if column.startswith('$.') else column
+        with self._lock:
+            return dict(self._db.execute(f'SELECT {expr}, COUNT(*) FROM {table} GROUP BY 1 ORDER BY 1').fetchall())
+
+    def export_csv(self, entity: str, path: str, columns: Optional[Sequence[str]] = None,
+                   order_by: Sequence[str] = ('region', 'city', 'name')) -> int:
+        """Write entity's table to a CSV (atomically replaced); returns the row count.
+
+        columns defaults to every field stored (see columns()); the rows are read in one pass.
+        """
+        if columns is None:
+            columns = self.columns(entity)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        count = 0
+        with tmp.open('w', encoding=getattr(settings, 'CSV_ENCODING', 'utf-8-sig'), newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(columns), extrasaction='ignore')
+            writer.writeheader()
+            for record in self.rows(entity, order_by=order_by):
+                writer.writerow(record)
+                count += 1
+        os.replace(tmp, path)
+        return count
+
+    def export(self, entity: str, path: str, columns: Optional[Sequence[str]] = None,
+               order_by: Sequence[str] = ('region', 'city', 'name')) -> int:
+        """export_csv(), or an Excel sheet when path ends in .xlsx (needs pandas and openpyxl)."""
+        if Path(path).suffix.lower() != '.xlsx':
+            return self.export_csv(entity, path, columns, order_by)
+        if pd is None:
+            raise RuntimeError('Excel export needs pandas')
+        df = pd.DataFrame(list(self.rows(entity, order_by=order_by)), columns=list(columns) if columns else None)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        df.to_excel(path, index=False, sheet_name=entity)
+        return len(df)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Inspect or export the lead warehouse')
+    parser.add_argument('command', choices=['stats', 'export'])
+    parser.add_argument('entity', nargs='?', choices=ENTITIES)
+    parser.add_argument('path', nargs='?', help='export target (.csv or .xlsx)')
+    args = parser.parse_args(argv)
+    warehouse = Warehouse()
+    if args.command == 'stats':
+        for entity in ([args.entity] if args.entity else ENTITIES):
+            regions = ', '.join(f'{region or "?"}={n}' for region, n in warehouse.counts_by(entity, 'region').items())
+            print(f'{entity}: {warehouse.count(entity)} rows' + (f' ({regions})' if regions else ''))
+    else:
+        if not (args.entity and args.path):
+            parser.error('export needs an entity and a path')
+        print(f'{args.entity}: {warehouse.export(args.entity, args.path)} rows written to {args.path}')
+    warehouse.close()
+
+
+if __name__ == '__main__':
+    main()